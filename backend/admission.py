@@ -0,0 +1,129 @@
+# backend/admission.py
+"""
+Server-wide admission control for CPU-heavy endpoints.
+
+At most `max_in_flight` requests run at once; the rest wait in a bounded
+queue. Each waiting request has a deadline: if the expected wait (from the
+queue depth and an EWMA of service time) already exceeds it, or it is not
+admitted in time, the request is rejected immediately with 503 and a
+Retry-After hint instead of adding to the backlog. Admission happens on the
+event loop, before the handler is dispatched to the threadpool, so waiting
+requests do not hold worker threads.
+"""
+import asyncio
+import math
+import time
+from typing import Any, Dict
+
+import orjson
+
+class AdmissionController:
+    def __init__(self, max_in_flight: int, max_queue: int, queue_timeout_s: float, alpha: float = 0.2):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout_s = queue_timeout_s
+        self.alpha = alpha
+        self.in_flight = 0
+        self.queued = 0
+        self.service_ewma_s: float | None = None
+        self.stats = {"admitted": 0, "rejected_queue_full": 0, "rejected_deadline": 0, "timed_out": 0}
+        self._semaphore: asyncio.Semaphore | None = None
+
+    def _sem(self) -> asyncio.Semaphore:
+        # Created lazily so it binds to the server's event loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        return self._semaphore
+
+    def expected_wait_s(self) -> float:
+        """Rough wait for a newly queued request: queue ahead of it drained at max_in_flight at a time."""
+        if self.service_ewma_s is None:
+            return 0.0
+        return (self.queued + 1) / self.max_in_flight * self.service_ewma_s
+
+    def retry_after_s(self) -> int:
+        return max(1, math.ceil(self.expected_wait_s()))
+
+    async def acquire(self) -> str | None:
+        """Wait for a slot. Returns None once admitted, else the rejection reason."""
+        if self._sem().locked():
+            # No free slot: only queue if there is room and the wait can fit the deadline
+            if self.queued >= self.max_queue:
+                self.stats["rejected_queue_full"] += 1
+                return "queue_full"
+            if self.expected_wait_s() > self.queue_timeout_s:
+                self.stats["rejected_deadline"] += 1
+                return "deadline"
+        self.queued += 1
+        try:
+            await asyncio.wait_for(self._sem().acquire(), timeout=self.queue_timeout_s)
+        except asyncio.TimeoutError:
+            self.stats["timed_out"] += 1
+            return "timeout"
+        finally:
+            self.queued -= 1
+        self.in_flight += 1
+        self.stats["admitted"] += 1
+        return None
+
+    def release(self, service_s: float) -> None:
+        self.in_flight -= 1
+        self._sem().release()
+        prev = self.service_ewma_s
+        self.service_ewma_s = service_s if prev is None else self.alpha * service_s + (1 - self.alpha) * prev
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "service_ms_ewma": round(self.service_ewma_s * 1000, 2) if self.service_ewma_s is not None else None,
+            **self.stats,
+        }
+
+class AdmissionMiddleware:
+    """ASGI middleware applying an AdmissionController to requests under the given path prefixes."""
+
+    def __init__(
+        self,
+        app,
+        controller: AdmissionController,
+        path_prefixes: tuple[str, ...],
+        detail: str = "Server is busy scoring other requests. Please retry shortly.",
+    ):
+        self.app = app
+        self.controller = controller
+        self.path_prefixes = path_prefixes
+        self.detail = detail
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] == "OPTIONS"
+            or not scope["path"].startswith(self.path_prefixes)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        rejection = await self.controller.acquire()
+        if rejection is not None:
+            await self._reject(send)
+            return
+        started_at = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(time.perf_counter() - started_at)
+
+    async def _reject(self, send) -> None:
+        body = orjson.dumps({"detail": self.detail})
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(self.controller.retry_after_s()).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
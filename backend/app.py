@@ -1,17 +1,46 @@
 # backend/app.py
-import os, json, joblib
+import os, json, joblib, hashlib
+import asyncio
 import logging
+import time
+from datetime import datetime, timedelta, timezone
 import pandas as pd
 import numpy as np
 import shap
 from fastapi import FastAPI, HTTPException, Depends, Header, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
-from schemas import ScoreRequest, ScoreResponse, SaveApplicationRequest, SaveApplicationResponse
+import ratelimit_storage  # noqa: F401  registers the "mmap" rate limit storage scheme
+from schemas import (
+    ScoreRequest, ScoreResponse, SaveApplicationRequest, SaveApplicationResponse,
+    SensitivityRequest, SensitivityResponse, CounterfactualRequest, CounterfactualResponse,
+    BulkSaveApplicationsRequest, BulkSaveApplicationsResponse,
+    BulkDeleteApplicationsRequest, BulkDeleteApplicationsResponse,
+    BulkGetApplicationsRequest, BulkGetApplicationsResponse,
+)
+from shadow import ShadowScorer
+from decision_log import DecisionLog
+from drift import DriftMonitor
+from tree_engine import CompiledModel
+from loss_simulation import LossSimulator
+from admission import AdmissionController, AdmissionMiddleware
+from idempotency import IdempotencyStore, REPLAY, IN_PROGRESS, MISMATCH
+import rollups
+from events import EventHub, format_event
+from resilience import CircuitBreaker, CircuitOpenError, ResilientExecutor, SpillLog
+from explain import (
+    ORIGINAL_FEATURES, TIER_EXACT, TIER_SKIPPED, EXPLANATION_TIERS,
+    TierLatencyTracker, raw_contributions, aggregate_contributions, build_explanation,
+    shap_dict, encode_compact, decode_compact, vector_from_explanation,
+    IMPORTANCE_COLUMNS, summarize_importance,
+)
 from supabase import create_client, Client
 from typing import Dict, Any, List
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
 # Load environment variables from .env.local file
@@ -29,11 +58,16 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-app = FastAPI()
+# orjson for every response; hot endpoints return ORJSONResponse directly to also
+# skip FastAPI's jsonable_encoder / response_model pass over server-built data
+app = FastAPI(default_response_class=ORJSONResponse)
 
 # --- Rate Limiting ---
 # Initialize rate limiter (uses IP address for identification)
-limiter = Limiter(key_func=get_remote_address)
+# RATE_LIMIT_STORAGE_URI: "memory://" (per worker process, default) or e.g.
+# "mmap:///dev/shm/credit-risk-ratelimit" to share counters between all workers on the host
+RATE_LIMIT_STORAGE_URI = os.getenv("RATE_LIMIT_STORAGE_URI", "memory://")
+limiter = Limiter(key_func=get_remote_address, storage_uri=RATE_LIMIT_STORAGE_URI)
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
@@ -41,6 +75,34 @@ app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 SCORE_RATE_LIMIT = os.getenv("SCORE_RATE_LIMIT", "30/minute")
 PORTFOLIO_RATE_LIMIT = os.getenv("PORTFOLIO_RATE_LIMIT", "60/minute")
 
+# --- Admission control for scoring ---
+# At most SCORE_MAX_IN_FLIGHT /score* requests run at once; up to SCORE_MAX_QUEUE wait at most
+# SCORE_QUEUE_TIMEOUT_MS for a slot, otherwise they get 503 + Retry-After. Added before CORS
+# so rejections still carry CORS headers.
+SCORE_MAX_IN_FLIGHT = int(os.getenv("SCORE_MAX_IN_FLIGHT", str(os.cpu_count() or 2)))
+SCORE_MAX_QUEUE = int(os.getenv("SCORE_MAX_QUEUE", "64"))
+SCORE_QUEUE_TIMEOUT_MS = float(os.getenv("SCORE_QUEUE_TIMEOUT_MS", "2000"))
+score_admission = AdmissionController(SCORE_MAX_IN_FLIGHT, SCORE_MAX_QUEUE, SCORE_QUEUE_TIMEOUT_MS / 1000)
+app.add_middleware(AdmissionMiddleware, controller=score_admission, path_prefixes=("/score",))
+
+# Loss simulations get their own controller so they cannot occupy the threadpool and CPU
+# that /score needs: LOSS_SIM_MAX_IN_FLIGHT at once, a short queue, then 503 + Retry-After
+LOSS_SIM_MAX_IN_FLIGHT = int(os.getenv("LOSS_SIM_MAX_IN_FLIGHT", "1"))
+LOSS_SIM_MAX_QUEUE = int(os.getenv("LOSS_SIM_MAX_QUEUE", "4"))
+LOSS_SIM_QUEUE_TIMEOUT_MS = float(os.getenv("LOSS_SIM_QUEUE_TIMEOUT_MS", "5000"))
+simulation_admission = AdmissionController(LOSS_SIM_MAX_IN_FLIGHT, LOSS_SIM_MAX_QUEUE, LOSS_SIM_QUEUE_TIMEOUT_MS / 1000)
+app.add_middleware(
+    AdmissionMiddleware,
+    controller=simulation_admission,
+    path_prefixes=("/portfolio/loss-simulation",),
+    detail="Server is busy running other loss simulations. Please retry shortly.",
+)
+
+# Priority lane: cheap reads run in their own small pool instead of the shared threadpool,
+# so they stay responsive while scoring saturates it
+PRIORITY_WORKERS = int(os.getenv("PRIORITY_WORKERS", "4"))
+priority_pool = ThreadPoolExecutor(max_workers=PRIORITY_WORKERS, thread_name_prefix="priority")
+
 # --- CORS: allow local dev + configurable prod origins ---
 ALLOWED_ORIGINS = os.getenv("ALLOWED_ORIGINS").split(",")
 ALLOWED_ORIGINS = [o.strip() for o in ALLOWED_ORIGINS if o.strip()]
@@ -51,8 +113,13 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
+# Compress JSON bodies above GZIP_MIN_SIZE bytes when the client sends Accept-Encoding: gzip
+GZIP_MIN_SIZE = int(os.getenv("GZIP_MIN_SIZE", "1000"))
+app.add_middleware(GZipMiddleware, minimum_size=GZIP_MIN_SIZE)
+
 # --- API key guard ---
 API_KEY = os.getenv("API_KEY")
 if not API_KEY:
@@ -64,6 +131,37 @@ def require_key(x_api_key: str | None = Header(default=None)):
 
 THRESHOLD = 0.15  # approval cutoff on PD
 
+# --- Idempotency keys (/score, /applications/save) ---
+# Completed responses are replayed from a bounded in-process store for repeated keys. With
+# IDEMPOTENCY_DB_COLUMN=true the key is also saved in applications.idempotency_key (unique per
+# user, see supabase-schema.sql) so a duplicate insert from another worker or a retried insert
+# that had in fact succeeded is refused by the database.
+IDEMPOTENCY_MAX_ENTRIES = int(os.getenv("IDEMPOTENCY_MAX_ENTRIES", "10000"))
+IDEMPOTENCY_TTL_S = float(os.getenv("IDEMPOTENCY_TTL_S", "86400"))
+IDEMPOTENCY_DB_COLUMN = os.getenv("IDEMPOTENCY_DB_COLUMN", "false").lower() == "true"
+idempotency_store = IdempotencyStore(IDEMPOTENCY_MAX_ENTRIES, IDEMPOTENCY_TTL_S)
+WHATIF_MAX_GRID = int(os.getenv("WHATIF_MAX_GRID", "2500"))  # max grid points per sensitivity request
+
+# --- Counterfactual search ---
+COUNTERFACTUAL_MAX_EVALUATIONS = int(os.getenv("COUNTERFACTUAL_MAX_EVALUATIONS", "20000"))  # hard cap per request
+COUNTERFACTUAL_BATCH_SIZE = int(os.getenv("COUNTERFACTUAL_BATCH_SIZE", "1024"))
+COUNTERFACTUAL_MIN_LOAN = 1000  # smallest loan amount a counterfactual may propose
+TERM_CHANGE_COST = 0.25  # distance charged for switching term (numeric changes cost their fractional reduction)
+
+# --- Explanation tiers ---
+# EXPLANATION_MODE: "exact" (TreeSHAP), "approx" (Saabas path attribution) or
+# "auto" (most accurate tier that fits EXPLANATION_BUDGET_MS, else skipped)
+EXPLANATION_MODE = os.getenv("EXPLANATION_MODE", TIER_EXACT).lower()
+if EXPLANATION_MODE not in (*EXPLANATION_TIERS, "auto"):
+    raise ValueError(f"EXPLANATION_MODE must be one of {(*EXPLANATION_TIERS, 'auto')}, got '{EXPLANATION_MODE}'")
+EXPLANATION_BUDGET_MS = float(os.getenv("EXPLANATION_BUDGET_MS", "50"))
+# EXPLANATION_STORAGE: "compact" stores explanations as float32 x 11 (explanation_compact)
+# plus model_version; "json" keeps the legacy verbose JSONB `explanation` column
+EXPLANATION_STORAGE = os.getenv("EXPLANATION_STORAGE", "compact").lower()
+if EXPLANATION_STORAGE not in ("compact", "json"):
+    raise ValueError(f"EXPLANATION_STORAGE must be 'compact' or 'json', got '{EXPLANATION_STORAGE}'")
+explanation_latency = TierLatencyTracker()
+
 # ---- Supabase client ----
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
@@ -78,6 +176,76 @@ if not SUPABASE_JWT_SECRET:
 else:
     logger.info("SUPABASE_JWT_SECRET is configured. JWT verification is enabled.")
 
+# Worker pool for concurrent / fire-and-forget Supabase calls (the client is synchronous)
+SUPABASE_IO_WORKERS = int(os.getenv("SUPABASE_IO_WORKERS", "16"))
+supabase_io_pool = ThreadPoolExecutor(max_workers=SUPABASE_IO_WORKERS, thread_name_prefix="supabase-io")
+
+# Serve /portfolio stats + first page with one RPC (requires get_portfolio_page in supabase-schema.sql)
+PORTFOLIO_COMBINED_RPC = os.getenv("PORTFOLIO_COMBINED_RPC", "false").lower() == "true"
+
+# Live portfolio updates (GET /portfolio/stream, server-sent events)
+SSE_BUFFER_SIZE = int(os.getenv("SSE_BUFFER_SIZE", "100"))  # events buffered per subscriber before a resync
+SSE_MAX_STREAMS_PER_USER = int(os.getenv("SSE_MAX_STREAMS_PER_USER", "5"))
+SSE_HEARTBEAT_S = float(os.getenv("SSE_HEARTBEAT_S", "15"))
+portfolio_events = EventHub(SSE_BUFFER_SIZE, SSE_MAX_STREAMS_PER_USER)
+
+# Largest series /portfolio/trends returns (buckets at the requested granularity)
+TRENDS_MAX_BUCKETS = int(os.getenv("TRENDS_MAX_BUCKETS", "2000"))
+TRENDS_DEFAULT_SPAN = {"hour": timedelta(hours=48), "day": timedelta(days=30), "month": timedelta(days=365)}
+
+# Monte Carlo loss simulation (GET /portfolio/loss-simulation). Runs of at least
+# LOSS_SIM_PARALLEL_MIN_SCENARIOS are split across LOSS_SIM_WORKERS processes (0 = in-process only)
+LOSS_SIM_WORKERS = int(os.getenv("LOSS_SIM_WORKERS", "0"))
+LOSS_SIM_PARALLEL_MIN_SCENARIOS = int(os.getenv("LOSS_SIM_PARALLEL_MIN_SCENARIOS", "200000"))
+LOSS_SIM_MEMORY_MB = float(os.getenv("LOSS_SIM_MEMORY_MB", "8"))  # draw buffers per simulation block
+LOSS_SIM_MAX_SCENARIOS = int(os.getenv("LOSS_SIM_MAX_SCENARIOS", "200000"))
+# Work cap: scenarios x approved loans per request (one default draw per cell)
+LOSS_SIM_MAX_CELLS = int(os.getenv("LOSS_SIM_MAX_CELLS", "200000000"))
+loss_simulator = LossSimulator(LOSS_SIM_WORKERS, LOSS_SIM_PARALLEL_MIN_SCENARIOS, LOSS_SIM_MEMORY_MB)
+app.add_event_handler("shutdown", loss_simulator.close)
+
+# --- Supabase resilience ---
+# Every call gets SUPABASE_CALL_TIMEOUT_S per attempt, jittered exponential backoff on
+# transient errors and an overall SUPABASE_CALL_DEADLINE_S. Once SUPABASE_BREAKER_FAILURE_RATE
+# of the last SUPABASE_BREAKER_WINDOW calls fail, calls fail fast for SUPABASE_BREAKER_OPEN_S.
+SUPABASE_CALL_TIMEOUT_S = float(os.getenv("SUPABASE_CALL_TIMEOUT_S", "5"))
+SUPABASE_CALL_DEADLINE_S = float(os.getenv("SUPABASE_CALL_DEADLINE_S", "8"))
+SUPABASE_MAX_RETRIES = int(os.getenv("SUPABASE_MAX_RETRIES", "2"))
+SUPABASE_RETRY_BASE_MS = float(os.getenv("SUPABASE_RETRY_BASE_MS", "100"))
+SUPABASE_BREAKER_FAILURE_RATE = float(os.getenv("SUPABASE_BREAKER_FAILURE_RATE", "0.5"))
+SUPABASE_BREAKER_WINDOW = int(os.getenv("SUPABASE_BREAKER_WINDOW", "20"))
+SUPABASE_BREAKER_OPEN_S = float(os.getenv("SUPABASE_BREAKER_OPEN_S", "30"))
+# Optional JSONL file for /score rows that could not be saved while the database was down
+SUPABASE_SPILL_PATH = os.getenv("SUPABASE_SPILL_PATH")
+
+supabase_executor = ResilientExecutor(
+    CircuitBreaker(
+        failure_rate=SUPABASE_BREAKER_FAILURE_RATE,
+        window=SUPABASE_BREAKER_WINDOW,
+        min_calls=max(1, SUPABASE_BREAKER_WINDOW // 2),
+        open_seconds=SUPABASE_BREAKER_OPEN_S,
+    ),
+    max_retries=SUPABASE_MAX_RETRIES,
+    base_delay_s=SUPABASE_RETRY_BASE_MS / 1000,
+    deadline_s=SUPABASE_CALL_DEADLINE_S,
+)
+spill_log = SpillLog(SUPABASE_SPILL_PATH) if SUPABASE_SPILL_PATH else None
+
+def _execute(query, retry: bool = True):
+    """
+    Run a Supabase query builder through the shared retry / circuit breaker layer.
+    Pass retry=False for writes that are not idempotent: a timed-out attempt may
+    still have been applied, and retrying it would write the row again.
+    """
+    return supabase_executor.execute(query, retry=retry)
+
+def _database_unavailable(e: CircuitOpenError) -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail="Database service is temporarily unavailable. Please try again later.",
+        headers={"Retry-After": str(int(e.retry_after + 0.999))},
+    )
+
 def get_supabase_client(user_jwt: str | None = None) -> Client | None:
     """Create a Supabase client with optional user JWT for RLS enforcement"""
     if not SUPABASE_URL or not SUPABASE_KEY:
@@ -89,12 +257,14 @@ def get_supabase_client(user_jwt: str | None = None) -> Client | None:
         options = ClientOptions(
             headers={
                 "Authorization": f"Bearer {user_jwt}"
-            }
+            },
+            postgrest_client_timeout=SUPABASE_CALL_TIMEOUT_S
         )
         return create_client(SUPABASE_URL, SUPABASE_KEY, options)
     else:
         # Fallback to basic client (operations will fail if RLS requires auth)
-        return create_client(SUPABASE_URL, SUPABASE_KEY)
+        from supabase.lib.client_options import ClientOptions
+        return create_client(SUPABASE_URL, SUPABASE_KEY, ClientOptions(postgrest_client_timeout=SUPABASE_CALL_TIMEOUT_S))
 
 # JWT verification function
 def verify_supabase_jwt(token: str) -> dict | None:
@@ -169,19 +339,69 @@ MODEL_PATH = "models/model.pkl"
 META_PATH = "models/feature_meta.json"
 
 model = None
+model_version: str | None = None  # short content hash of model.pkl
+# INFERENCE_ENGINE: "native" scores with the NumPy tree engine compiled from the
+# booster at startup (same margins as XGBoost); "xgboost" uses pipeline.predict_proba
+INFERENCE_ENGINE = os.getenv("INFERENCE_ENGINE", "native").lower()
+# Larger batches go to XGBoost's multi-threaded C++ predictor, which wins once
+# per-call overhead is amortized (see notebooks/validate_tree_engine.py)
+INFERENCE_NATIVE_MAX_ROWS = int(os.getenv("INFERENCE_NATIVE_MAX_ROWS", "512"))
+compiled_model: CompiledModel | None = None
 feature_order: list[str] | None = None
 shap_explainer = None
 background_data = None  # Sample of training data for SHAP
 
+# ---- Shadow (challenger) scoring ----
+# Set CHALLENGER_MODEL_PATH to score every request with a second model off the request path
+CHALLENGER_MODEL_PATH = os.getenv("CHALLENGER_MODEL_PATH")
+SHADOW_LOG_PATH = os.getenv("SHADOW_LOG_PATH", "shadow_scores.jsonl")
+SHADOW_QUEUE_SIZE = int(os.getenv("SHADOW_QUEUE_SIZE", "1000"))
+SHADOW_BATCH_SIZE = int(os.getenv("SHADOW_BATCH_SIZE", "64"))
+shadow_scorer: ShadowScorer | None = None
+
+# ---- Decision log ----
+# Set DECISION_LOG_DIR to append every /score decision to rotating Arrow/Parquet
+# segments off the request path (needs pyarrow). Read back with decision_log.read_decisions
+DECISION_LOG_DIR = os.getenv("DECISION_LOG_DIR")
+DECISION_LOG_FORMAT = os.getenv("DECISION_LOG_FORMAT", "arrow")  # arrow | parquet
+DECISION_LOG_QUEUE_SIZE = int(os.getenv("DECISION_LOG_QUEUE_SIZE", "10000"))
+DECISION_LOG_BATCH_SIZE = int(os.getenv("DECISION_LOG_BATCH_SIZE", "512"))
+DECISION_LOG_SEGMENT_ROWS = int(os.getenv("DECISION_LOG_SEGMENT_ROWS", "100000"))
+DECISION_LOG_SEGMENT_S = float(os.getenv("DECISION_LOG_SEGMENT_S", "3600"))
+decision_log: DecisionLog | None = None
+
+# ---- Drift monitoring ----
+# Reference profile is exported by notebooks/train_credit_model.py
+REFERENCE_PROFILE_PATH = "models/reference_profile.json"
+# Scored rows needed before /monitoring/drift reports scores (default: 5 per bin of the finest histogram)
+DRIFT_MIN_ROWS = int(os.getenv("DRIFT_MIN_ROWS", "0")) or None
+drift_monitor: DriftMonitor | None = None
+
 def _load_artifacts():
-    global model, feature_order, shap_explainer, background_data
+    global model, model_version, feature_order, shap_explainer, compiled_model
     if not os.path.exists(MODEL_PATH):
         return False
     model = joblib.load(MODEL_PATH)
+    with open(MODEL_PATH, "rb") as f:
+        model_version = hashlib.sha256(f.read()).hexdigest()[:12]
     with open(META_PATH) as f:
         meta = json.load(f)
     feature_order = meta["feature_order"]
     
+    # Compile the booster for fast inference; only used if it reproduces XGBoost's margins
+    compiled_model = None
+    if INFERENCE_ENGINE == "native":
+        try:
+            candidate = CompiledModel.from_pipeline(model)
+            mismatches = candidate.verify(model)
+            if mismatches:
+                logger.warning(f"Compiled tree engine disagrees with XGBoost on {mismatches} rows; using predict_proba")
+            else:
+                compiled_model = candidate
+                logger.info(f"Compiled tree engine ready: {candidate.ensemble.n_trees} trees, depth {candidate.ensemble.max_depth}")
+        except Exception as e:
+            logger.warning(f"Failed to compile tree engine: {str(e)}. Using predict_proba.")
+    
     # Initialize SHAP explainer with background data
     # For XGBoost, we can use TreeExplainer which is fast
     try:
@@ -197,6 +417,64 @@ def _load_artifacts():
 
 _loaded = _load_artifacts()
 
+def _start_shadow_scorer():
+    global shadow_scorer
+    if not CHALLENGER_MODEL_PATH:
+        return
+    try:
+        shadow_scorer = ShadowScorer(
+            CHALLENGER_MODEL_PATH,
+            SHADOW_LOG_PATH,
+            threshold=THRESHOLD,
+            feature_order=feature_order,
+            champion_version=model_version,
+            queue_size=SHADOW_QUEUE_SIZE,
+            batch_size=SHADOW_BATCH_SIZE,
+        )
+        shadow_scorer.start()
+        app.add_event_handler("shutdown", shadow_scorer.stop)
+    except Exception as e:
+        logger.warning(f"Failed to start shadow scoring: {str(e)}. Only the champion model will be used.")
+        shadow_scorer = None
+
+if _loaded:
+    _start_shadow_scorer()
+
+def _start_decision_log():
+    global decision_log
+    if not DECISION_LOG_DIR:
+        return
+    try:
+        decision_log = DecisionLog(
+            DECISION_LOG_DIR,
+            fmt=DECISION_LOG_FORMAT,
+            queue_size=DECISION_LOG_QUEUE_SIZE,
+            batch_size=DECISION_LOG_BATCH_SIZE,
+            segment_rows=DECISION_LOG_SEGMENT_ROWS,
+            segment_seconds=DECISION_LOG_SEGMENT_S,
+        )
+        decision_log.start()
+        app.add_event_handler("shutdown", decision_log.stop)
+    except Exception as e:
+        logger.warning(f"Failed to start decision log: {str(e)}. Decisions will only be recorded in Supabase.")
+        decision_log = None
+
+if _loaded:
+    _start_decision_log()
+
+def _load_drift_monitor():
+    global drift_monitor
+    if not os.path.exists(REFERENCE_PROFILE_PATH):
+        logger.info("No reference profile found; drift monitoring is disabled")
+        return
+    try:
+        drift_monitor = DriftMonitor.from_file(REFERENCE_PROFILE_PATH, min_rows=DRIFT_MIN_ROWS)
+    except Exception as e:
+        logger.warning(f"Failed to load reference profile: {str(e)}. Drift monitoring is disabled.")
+        drift_monitor = None
+
+_load_drift_monitor()
+
 def _risk_grade(pd_val: float) -> str:
     if pd_val < 0.05:  return "A"
     if pd_val < 0.10:  return "B"
@@ -206,18 +484,49 @@ def _risk_grade(pd_val: float) -> str:
     if pd_val < 0.60:  return "F"
     return "G"
 
-def _compute_shap_explanation(df: pd.DataFrame, pd_value: float) -> Dict[str, Any] | None:
+RISK_GRADE_BOUNDS = np.array([0.05, 0.10, 0.20, 0.30, 0.40, 0.60])
+RISK_GRADE_LABELS = np.array(list("ABCDEFG"))
+
+def _risk_grades(pd_vals: np.ndarray) -> np.ndarray:
+    """Vectorized _risk_grade for an array of PDs."""
+    return RISK_GRADE_LABELS[np.searchsorted(RISK_GRADE_BOUNDS, pd_vals, side="right")]
+
+def _compute_shap_explanation(df: pd.DataFrame, pd_value: float, tier: str = TIER_EXACT) -> Dict[str, Any] | None:
     """
     Compute SHAP values for a given prediction and return top contributing features.
     
     Args:
         df: DataFrame with single row (raw input features before preprocessing)
         pd_value: Predicted probability of default
+        tier: Explanation tier (exact TreeSHAP or Saabas approximation)
         
     Returns:
         Dictionary with explanation data or None if SHAP is unavailable
     """
-    if shap_explainer is None or model is None:
+    explanations = _compute_shap_explanations(df, np.array([pd_value]), tier)
+    return explanations[0] if explanations else None
+
+def _compute_shap_explanations(df: pd.DataFrame, pd_values: np.ndarray, tier: str = TIER_EXACT) -> List[Dict[str, Any]] | None:
+    """
+    Batched version of _compute_shap_explanation.
+    
+    Returns:
+        List of explanation dicts (one per row) or None if SHAP is unavailable
+    """
+    aggregated = _aggregated_shap_values(df, tier)
+    if aggregated is None:
+        return None
+    return [build_explanation(shap_dict(row), float(pd_value)) for row, pd_value in zip(aggregated, pd_values)]
+
+def _aggregated_shap_values(df: pd.DataFrame, tier: str = TIER_EXACT) -> np.ndarray | None:
+    """
+    SHAP values summed back onto the 11 original features (ORIGINAL_FEATURES order),
+    with one preprocessing pass and one attribution call for all rows of df.
+    
+    Returns:
+        Array of shape (n_rows, 11) or None if SHAP is unavailable
+    """
+    if model is None or (tier == TIER_EXACT and shap_explainer is None):
         return None
     
     try:
@@ -225,126 +534,84 @@ def _compute_shap_explanation(df: pd.DataFrame, pd_value: float) -> Dict[str, An
         preprocessor = model.named_steps['pre']
         transformed_df = preprocessor.transform(df)
         
-        # Compute SHAP values on transformed features
-        shap_values = shap_explainer.shap_values(transformed_df)
-        
-        # For binary classification, get values for positive class (default=1)
-        if isinstance(shap_values, list):
-            shap_values = shap_values[1]  # Get values for positive class
-        
-        shap_values = np.array(shap_values)
-        if shap_values.ndim > 1:
-            shap_values = shap_values[0]  # Get single row
-        
-        # Get original feature names and map SHAP values back
-        original_features = ['loan_amnt', 'annual_inc', 'dti', 'emp_length', 'revol_util', 'fico',
-                            'grade', 'term', 'purpose', 'home_ownership', 'state']
-        
-        shap_aggregated = {}
-        
-        # Process numeric features (first 6)
-        numeric_features = ['loan_amnt', 'annual_inc', 'dti', 'emp_length', 'revol_util', 'fico']
-        num_transformer = preprocessor.named_transformers_['num']
-        num_feature_indices = list(range(len(numeric_features)))
-        
-        for i, feat_name in enumerate(numeric_features):
-            if i < len(shap_values):
-                shap_aggregated[feat_name] = float(shap_values[i])
-        
-        # Process categorical features (one-hot encoded)
-        # We need to aggregate one-hot encoded SHAP values back to original features
-        cat_start_idx = len(numeric_features)
-        cat_transformer = preprocessor.named_transformers_['cat']
-        
-        # Get actual one-hot feature names
-        try:
-            if hasattr(cat_transformer, 'get_feature_names_out'):
-                cat_feature_names = cat_transformer.get_feature_names_out(['grade', 'term', 'purpose', 'home_ownership', 'state'])
-            else:
-                # Fallback: determine number of categorical features
-                n_cat_features = len(shap_values) - len(numeric_features)
-                cat_feature_names = [f"cat_{i}" for i in range(n_cat_features)]
-        except:
-            n_cat_features = len(shap_values) - len(numeric_features)
-            cat_feature_names = [f"cat_{i}" for i in range(n_cat_features)]
-        
-        # Aggregate categorical SHAP values
-        cat_features_map = {
-            'grade': [],
-            'term': [],
-            'purpose': [],
-            'home_ownership': [],
-            'state': []
-        }
-        
-        # Map one-hot encoded names to original features
-        for idx, feat_name in enumerate(cat_feature_names):
-            global_idx = cat_start_idx + idx
-            if global_idx < len(shap_values):
-                value = float(shap_values[global_idx])
-                if feat_name.startswith('grade_'):
-                    cat_features_map['grade'].append(value)
-                elif feat_name.startswith('term_'):
-                    cat_features_map['term'].append(value)
-                elif feat_name.startswith('purpose_'):
-                    cat_features_map['purpose'].append(value)
-                elif feat_name.startswith('home_ownership_'):
-                    cat_features_map['home_ownership'].append(value)
-                elif feat_name.startswith('state_'):
-                    cat_features_map['state'].append(value)
-        
-        # Aggregate by summing SHAP values for each categorical feature
-        for cat_feat, values in cat_features_map.items():
-            if values:
-                shap_aggregated[cat_feat] = float(sum(values))
-            else:
-                shap_aggregated[cat_feat] = 0.0
-        
-        # Create feature contributions list
-        feature_contributions = [
-            {
-                "feature": feat.replace('_', ' ').title(),  # Format feature name
-                "shap_value": float(shap_val),
-                "impact": "positive" if shap_val > 0 else "negative",
-                "contribution_pct": abs(shap_val) / (abs(pd_value) + 1e-10) * 100 if pd_value > 0 else 0.0
-            }
-            for feat, shap_val in shap_aggregated.items()
-        ]
-        
-        # Sort by absolute SHAP value, descending
-        feature_contributions.sort(key=lambda x: abs(x["shap_value"]), reverse=True)
-        
-        # Return all features (we have 11 total, manageable to show all)
-        top_features = feature_contributions
-        
-        # Normalize contribution percentages based on total absolute contribution
-        total_abs_contribution = sum(abs(f["shap_value"]) for f in top_features)
-        if total_abs_contribution > 0:
-            for feat in top_features:
-                feat["contribution_pct"] = (abs(feat["shap_value"]) / total_abs_contribution) * 100
-        
-        # Create human-readable summary (use top 3 for summary)
-        top_3 = top_features[:3]
-        increasing_factors = [f["feature"] for f in top_3 if f["impact"] == "positive"][:2]
-        decreasing_factors = [f["feature"] for f in top_3 if f["impact"] == "negative"][:2]
-        
-        summary_parts = []
-        if increasing_factors:
-            summary_parts.append(f"High {' and '.join(increasing_factors)} increase risk")
-        if decreasing_factors:
-            summary_parts.append(f"Low {' and '.join(decreasing_factors)} decrease risk")
-        
-        summary = ". ".join(summary_parts) if summary_parts else "Risk factors analyzed"
-        
-        return {
-            "top_features": top_features,
-            "summary": summary
-        }
+        # Compute attributions on transformed features, then sum one-hot columns
+        # back onto the original features
+        shap_values = raw_contributions(model, shap_explainer, transformed_df, tier)
+        return aggregate_contributions(preprocessor, shap_values)
         
     except Exception as e:
         logger.error(f"Error computing SHAP explanation: {type(e).__name__}: {str(e)}", exc_info=True)
         return None
 
+def _explain_within_budget(df: pd.DataFrame, started_at: float) -> tuple[np.ndarray | None, str]:
+    """
+    Pick an explanation tier according to EXPLANATION_MODE and compute the
+    aggregated SHAP vector for the single row in df.
+    
+    In "auto" mode the most accurate tier whose expected latency fits in what is
+    left of EXPLANATION_BUDGET_MS (measured from started_at) is used; if none
+    fits, the explanation is skipped.
+    
+    Returns:
+        tuple: (aggregated SHAP vector or None, tier_used)
+    """
+    if EXPLANATION_MODE == "auto":
+        remaining_ms = EXPLANATION_BUDGET_MS - (time.perf_counter() - started_at) * 1000
+        tier = explanation_latency.choose(remaining_ms)
+    else:
+        tier = EXPLANATION_MODE
+    
+    if tier == TIER_SKIPPED:
+        return None, TIER_SKIPPED
+    
+    tier_start = time.perf_counter()
+    aggregated = _aggregated_shap_values(df, tier)
+    explanation_latency.record(tier, (time.perf_counter() - tier_start) * 1000)
+    return (aggregated[0] if aggregated is not None else None), tier
+
+def _expand_explanations(rows: List[Dict[str, Any]], explanation_format: str = "full") -> List[Dict[str, Any]]:
+    """
+    Normalize stored explanations on application rows read from the database.
+    
+    Rows may carry a legacy JSONB `explanation` or a compact `explanation_compact`
+    (float32 x 11). With explanation_format="full" every row gets the display
+    structure in `explanation`; with "compact" every row gets `explanation_shap`
+    (11 floats in ORIGINAL_FEATURES order) instead, to be rebuilt by the client.
+    """
+    for row in rows:
+        if "explanation_compact" not in row and "explanation" not in row:
+            continue
+        vector = decode_compact(row.pop("explanation_compact", None))
+        legacy = row.pop("explanation", None)
+        if explanation_format == "compact":
+            if vector is None:
+                vector = vector_from_explanation(legacy)
+            row["explanation_shap"] = [round(float(v), 6) for v in vector] if vector is not None else None
+        elif vector is not None and row.get("pd") is not None:
+            row["explanation"] = build_explanation(shap_dict(vector), float(row["pd"]))
+        else:
+            row["explanation"] = legacy
+    return rows
+
+def _warm_up_explanation_tiers():
+    """Seed per-tier latency estimates so "auto" mode has numbers before the first request."""
+    warm_df = pd.DataFrame([{
+        "loan_amnt": 10000, "annual_inc": 60000.0, "dti": 15.0, "emp_length": 5,
+        "grade": "B", "term": "36 months", "purpose": "debt_consolidation",
+        "home_ownership": "RENT", "state": "CA", "revol_util": 40.0, "fico": 700,
+    }])[feature_order]
+    for tier in EXPLANATION_TIERS:
+        # First call pays one-off allocation costs; only time the later ones
+        _compute_shap_explanation(warm_df, 0.1, tier)
+        for _ in range(5):
+            tier_start = time.perf_counter()
+            if _compute_shap_explanation(warm_df, 0.1, tier) is not None:
+                explanation_latency.record(tier, (time.perf_counter() - tier_start) * 1000)
+    logger.info(f"Explanation tier latency estimates (ms): {explanation_latency.snapshot()}")
+
+if _loaded:
+    _warm_up_explanation_tiers()
+
 def _compute_portfolio_stats(supabase: Client, user_id: str | None = None) -> dict:
     """
     Compute portfolio statistics using SQL aggregation (fast and efficient).
@@ -356,10 +623,10 @@ def _compute_portfolio_stats(supabase: Client, user_id: str | None = None) -> di
     try:
         # Call PostgreSQL function for SQL-based aggregation
         # This is much faster than fetching all rows and computing in Python
-        result = supabase.rpc(
+        result = _execute(supabase.rpc(
             "compute_portfolio_stats",
             {"p_user_id": user_id}
-        ).execute()
+        ))
         
         if result.data:
             stats = result.data[0]
@@ -386,7 +653,7 @@ def _compute_portfolio_stats(supabase: Client, user_id: str | None = None) -> di
     count_query = supabase.table("applications").select("id", count="exact")
     if user_id:
         count_query = count_query.eq("user_id", user_id)
-    count_result = count_query.execute()
+    count_result = _execute(count_query)
     total_applications = count_result.count or 0
     
     if total_applications == 0:
@@ -402,7 +669,7 @@ def _compute_portfolio_stats(supabase: Client, user_id: str | None = None) -> di
     stats_query = supabase.table("applications").select("pd, risk_grade, decision")
     if user_id:
         stats_query = stats_query.eq("user_id", user_id)
-    stats_result = stats_query.execute()
+    stats_result = _execute(stats_query)
     applications = stats_result.data
     
     # Calculate metrics
@@ -440,7 +707,7 @@ def _get_or_compute_portfolio_stats(supabase: Client, user_id: str | None = None
     if user_id:
         try:
             # Get the stats row, ordered by computed_at to ensure we get the latest
-            cached_result = supabase.table("portfolio_stats").select("*").eq("user_id", user_id).order("computed_at", desc=True).limit(1).execute()
+            cached_result = _execute(supabase.table("portfolio_stats").select("*").eq("user_id", user_id).order("computed_at", desc=True).limit(1))
             if cached_result.data and len(cached_result.data) > 0:
                 stats_row = cached_result.data[0]
                 logger.debug(f"Using portfolio stats from database for user {user_id}")
@@ -449,7 +716,8 @@ def _get_or_compute_portfolio_stats(supabase: Client, user_id: str | None = None
                     "avg_pd": float(stats_row["avg_pd"]),
                     "approval_rate": float(stats_row["approval_rate"]),
                     "default_rate": float(stats_row["default_rate"]),
-                    "grade_distribution": stats_row["grade_distribution"]
+                    "grade_distribution": stats_row["grade_distribution"],
+                    "version": _stats_version(stats_row)
                 }
         except Exception as e:
             logger.debug(f"Failed to fetch portfolio stats from database: {str(e)}")
@@ -461,34 +729,210 @@ def _get_or_compute_portfolio_stats(supabase: Client, user_id: str | None = None
     
     # For user_id=None case, we don't cache (no user context)
     # For user_id with no stats, the trigger will create them on next application insert
-    # But we can also proactively create them here as a fallback using the database function
+    # But we also proactively create them here, off the request path
     if user_id:
-        try:
-            # Use the database RPC function to upsert stats (handles both insert and update)
-            supabase.rpc("upsert_portfolio_stats", {"p_user_id": user_id}).execute()
-            logger.debug(f"Created/updated portfolio stats for user {user_id} via RPC")
-        except Exception as e:
-            logger.debug(f"Failed to update portfolio stats via RPC (non-critical): {str(e)}")
-            # Fallback: try manual insert/update
-            try:
-                stats_for_cache = {
-                    "user_id": user_id,
-                    "total_applications": stats["total_applications"],
-                    "avg_pd": stats["avg_pd"],
-                    "approval_rate": stats["approval_rate"],
-                    "default_rate": stats["default_rate"],
-                    "grade_distribution": stats["grade_distribution"],
-                    "threshold": THRESHOLD
-                }
-                update_result = supabase.table("portfolio_stats").update(stats_for_cache).eq("user_id", user_id).execute()
-                if not update_result.data or len(update_result.data) == 0:
-                    supabase.table("portfolio_stats").insert(stats_for_cache).execute()
-                logger.debug(f"Created/updated portfolio stats for user {user_id} via fallback")
-            except Exception as e2:
-                logger.debug(f"Fallback portfolio stats update also failed: {str(e2)}")
+        supabase_io_pool.submit(_store_portfolio_stats, supabase, user_id, stats)
     
     return stats
 
+def _store_portfolio_stats(supabase: Client, user_id: str, stats: dict):
+    """Persist freshly computed stats (runs in the background, failures are non-critical)."""
+    try:
+        # Use the database RPC function to upsert stats (handles both insert and update)
+        _execute(supabase.rpc("upsert_portfolio_stats", {"p_user_id": user_id}))
+        logger.debug(f"Created/updated portfolio stats for user {user_id} via RPC")
+    except Exception as e:
+        logger.debug(f"Failed to update portfolio stats via RPC (non-critical): {str(e)}")
+        # Fallback: try manual insert/update
+        try:
+            stats_for_cache = {
+                "user_id": user_id,
+                "total_applications": stats["total_applications"],
+                "avg_pd": stats["avg_pd"],
+                "approval_rate": stats["approval_rate"],
+                "default_rate": stats["default_rate"],
+                "grade_distribution": stats["grade_distribution"],
+                "threshold": THRESHOLD
+            }
+            update_result = _execute(supabase.table("portfolio_stats").update(stats_for_cache).eq("user_id", user_id))
+            if not update_result.data or len(update_result.data) == 0:
+                _execute(supabase.table("portfolio_stats").insert(stats_for_cache))
+            logger.debug(f"Created/updated portfolio stats for user {user_id} via fallback")
+        except Exception as e2:
+            logger.debug(f"Fallback portfolio stats update also failed: {str(e2)}")
+
+def _fetch_recent_applications(supabase: Client, user_id: str | None, columns: List[str], limit: int | None, offset: int) -> List[Dict[str, Any]]:
+    """Applications list for /portfolio, newest first, optionally paginated."""
+    query = supabase.table("applications").select(", ".join(columns)).order("created_at", desc=True)
+    if user_id:
+        query = query.eq("user_id", user_id)
+    if limit is not None:
+        query = query.range(offset, offset + limit - 1)
+    return _execute(query).data
+
+def _fetch_portfolio_combined(supabase: Client, user_id: str, columns: List[str], limit: int | None, offset: int) -> tuple[dict, List[Dict[str, Any]]] | None:
+    """
+    Stats and one page of applications in a single round-trip via the
+    get_portfolio_page RPC. Returns None if the RPC is unavailable.
+    """
+    try:
+        result = _execute(supabase.rpc("get_portfolio_page", {
+            "p_user_id": user_id,
+            "p_columns": columns,
+            "p_limit": limit,
+            "p_offset": offset,
+        }))
+        payload = result.data[0] if isinstance(result.data, list) else result.data
+        stats_row = payload["stats"]
+        grade_dist = stats_row.get("grade_distribution") or {}
+        for grade in "ABCDEFG":
+            grade_dist.setdefault(grade, 0)
+        stats = {
+            "total_applications": stats_row.get("total_applications", 0),
+            "avg_pd": float(stats_row.get("avg_pd", 0.0)),
+            "approval_rate": float(stats_row.get("approval_rate", 0.0)),
+            "default_rate": float(stats_row.get("default_rate", 0.0)),
+            "grade_distribution": grade_dist,
+            "version": _stats_version(stats_row)
+        }
+        return stats, payload.get("applications") or []
+    except Exception as e:
+        logger.warning(f"Combined portfolio RPC failed, falling back to separate queries: {str(e)}")
+        return None
+
+# ---- Portfolio versioning (ETag / conditional GET) ----
+# A user's portfolio version comes only from shared state: the portfolio_stats row's
+# version (bumped by statement-level triggers on every insert and delete into
+# applications, see supabase-schema.sql), computed_at and count. Every worker derives
+# the same ETag for the same data.
+
+# Application summary fields pushed to /portfolio/stream subscribers
+EVENT_APPLICATION_FIELDS = ["id", "created_at", "loan_amnt", "annual_inc", "pd", "risk_grade", "decision"]
+
+def _publish_applications_changed(user_id: str, rows: List[Dict[str, Any]], deleted: bool = False):
+    """Push new/deleted application summaries and the resulting stat deltas to the user's streams."""
+    if not rows:
+        return
+    sign = -1 if deleted else 1
+    grade_delta = dict.fromkeys("ABCDEFG", 0)
+    for row in rows:
+        if row.get("risk_grade") in grade_delta:
+            grade_delta[row["risk_grade"]] += sign
+    portfolio_events.publish(user_id, "applications_deleted" if deleted else "applications_created", {
+        "applications": [{field: row.get(field) for field in EVENT_APPLICATION_FIELDS} for row in rows],
+        "delta": {
+            "total_applications": sign * len(rows),
+            "pd_sum": sign * sum(float(row.get("pd") or 0.0) for row in rows),
+            "approvals": sign * sum(1 for row in rows if row.get("decision") == "approve"),
+            "grade_distribution": grade_delta
+        }
+    })
+
+def _stats_version(stats_row: dict) -> str | None:
+    """Version string of a stats row; None (no ETag) until the version column migration has run."""
+    if stats_row.get("version") is None:
+        return None
+    return f"{stats_row['version']}:{stats_row.get('computed_at')}:{stats_row.get('total_applications')}"
+
+def _portfolio_version(supabase: Client, user_id: str | None) -> str | None:
+    """Current portfolio version from the stats row (one small query, no applications scan)."""
+    if not user_id:
+        return None
+    try:
+        result = _execute(supabase.table("portfolio_stats").select("version, computed_at, total_applications").eq("user_id", user_id).limit(1))
+        if result.data:
+            return _stats_version(result.data[0])
+    except Exception as e:
+        logger.debug(f"Failed to fetch portfolio version: {str(e)}")
+    return None
+
+def _portfolio_etag(user_id: str | None, version: str | None, *variant) -> str | None:
+    """Weak ETag for a user's portfolio view; None if the version is unknown."""
+    if not user_id or version is None:
+        return None
+    digest = hashlib.sha1(f"{user_id}|{version}|{variant!r}".encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+def _etag_matches(if_none_match: str | None, etag: str | None) -> bool:
+    """Weak comparison of an If-None-Match header against etag."""
+    if not if_none_match or not etag:
+        return False
+    candidates = [c.strip() for c in if_none_match.split(",")]
+    return "*" in candidates or any(c.removeprefix("W/") == etag.removeprefix("W/") for c in candidates)
+
+def _conditional_json(request: Request, payload: Any, etag: str | None):
+    """
+    Return 304 if the client's copy is current, otherwise the payload (tagged with
+    etag if there is one) serialized directly with orjson.
+    """
+    if etag is None:
+        return ORJSONResponse(payload)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return ORJSONResponse(payload, headers=headers)
+
+# ---- Field projection for application reads ----
+# Columns a client may request via `fields=`; "explanation" is virtual and maps to
+# both the legacy JSONB column and the compact vector
+APPLICATION_FIELDS = [
+    "id", "created_at", "user_id", "loan_amnt", "annual_inc", "dti", "emp_length", "grade", "term",
+    "purpose", "home_ownership", "state", "revol_util", "fico", "pd", "risk_grade", "decision",
+    "model_version", "explanation",
+]
+PORTFOLIO_DEFAULT_FIELDS = ["id", "created_at", "loan_amnt", "annual_inc", "pd", "risk_grade", "decision", "explanation"]
+
+def _parse_fields(fields: str | None, default: List[str]) -> List[str]:
+    """Validate a comma-separated `fields` parameter against APPLICATION_FIELDS."""
+    if fields is None or not fields.strip():
+        return list(default)
+    requested = list(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    unknown = [f for f in requested if f not in APPLICATION_FIELDS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown field(s): {', '.join(unknown)}. Allowed fields: {', '.join(APPLICATION_FIELDS)}."
+        )
+    # id is always returned so rows can be addressed
+    if "id" not in requested:
+        requested.insert(0, "id")
+    return requested
+
+def _select_clause(fields: List[str]) -> str:
+    """PostgREST select string for the given projected fields."""
+    return ", ".join(_select_columns(fields))
+
+def _select_columns(fields: List[str]) -> List[str]:
+    """Database columns needed for the given projected fields."""
+    columns = []
+    for field in fields:
+        if field == "explanation":
+            columns += ["explanation", "explanation_compact"]
+            if "pd" not in fields:
+                columns.append("pd")  # needed to rebuild the explanation
+        else:
+            columns.append(field)
+    return list(dict.fromkeys(columns))
+
+def _project_rows(rows: List[Dict[str, Any]], fields: List[str], explanation_format: str = "full") -> List[Dict[str, Any]]:
+    """Rebuild explanations if requested and drop helper columns that were not asked for."""
+    if "explanation" in fields:
+        rows = _expand_explanations(rows, explanation_format)
+        if "pd" not in fields:
+            for row in rows:
+                row.pop("pd", None)
+    return rows
+
+def _predict_pd(df: pd.DataFrame, records: List[Dict[str, Any]] | None = None) -> np.ndarray:
+    """
+    PD for each row of df: small batches with the compiled tree engine when
+    available, else the sklearn pipeline. records (the same rows as dicts)
+    skips DataFrame access, which dominates single-row latency.
+    """
+    if compiled_model is not None and len(df) <= INFERENCE_NATIVE_MAX_ROWS:
+        return compiled_model.predict_pd_records(records) if records is not None else compiled_model.predict_pd(df)
+    return model.predict_proba(df)[:, 1]
+
 def _to_dataframe(req: ScoreRequest) -> pd.DataFrame:
     row = {
         "loan_amnt": req.loan_amnt,
@@ -515,18 +959,85 @@ def _to_dataframe(req: ScoreRequest) -> pd.DataFrame:
         df = df[feature_order]
     return df
 
+def _is_unique_violation(e: Exception) -> bool:
+    message = str(e).lower()
+    return "23505" in message or "duplicate key" in message
+
+def _run_idempotent(request: Request, endpoint: str, req, authorization: str | None, idempotency_key: str | None, handler):
+    """
+    Run handler() (which returns a Response) at most once per Idempotency-Key.
+    Keys are scoped to the caller (user, or client IP when anonymous) and the endpoint;
+    a repeat with the same payload gets the stored response back.
+    """
+    if idempotency_key is None:
+        return handler()
+    if not 0 < len(idempotency_key) <= 255:
+        raise HTTPException(status_code=400, detail="Idempotency-Key must be between 1 and 255 characters.")
+    
+    user_id, is_valid_token = get_user_id_from_token(authorization) if authorization else (None, False)
+    caller = f"user:{user_id}" if is_valid_token and user_id else f"ip:{get_remote_address(request)}"
+    scope_key = f"{endpoint}|{caller}|{idempotency_key}"
+    fingerprint = hashlib.sha256(req.model_dump_json().encode()).hexdigest()
+    
+    state, stored = idempotency_store.begin(scope_key, fingerprint)
+    if state == REPLAY:
+        status_code, body = stored
+        return Response(content=body, status_code=status_code, media_type="application/json", headers={"Idempotent-Replayed": "true"})
+    if state == MISMATCH:
+        raise HTTPException(status_code=422, detail="This Idempotency-Key was already used with a different request.")
+    if state == IN_PROGRESS:
+        raise HTTPException(
+            status_code=409,
+            detail="A request with this Idempotency-Key is still being processed. Please retry shortly.",
+            headers={"Retry-After": "1"}
+        )
+    
+    try:
+        response = handler()
+    except BaseException:
+        idempotency_store.abandon(scope_key)
+        raise
+    idempotency_store.complete(scope_key, fingerprint, response.status_code, bytes(response.body))
+    return response
+
 @app.get("/health")
-def health():
+async def health():
+    # Runs on the event loop: never waits for a threadpool slot
     return {
         "status": "ok", 
         "model_loaded": _loaded, 
+        "inference_engine": "native" if compiled_model is not None else "xgboost",
         "supabase_connected": SUPABASE_URL is not None and SUPABASE_KEY is not None,
-        "allowed_origins": ALLOWED_ORIGINS
+        "allowed_origins": ALLOWED_ORIGINS,
+        "explanation_mode": EXPLANATION_MODE,
+        "explanation_latency_ms": explanation_latency.snapshot(),
+        "shadow": shadow_scorer.snapshot() if shadow_scorer else None,
+        "decision_log": decision_log.snapshot() if decision_log else None,
+        "supabase": {
+            **supabase_executor.snapshot(),
+            "spilled": spill_log.spilled if spill_log else None
+        },
+        "score_admission": score_admission.snapshot(),
+        "simulation_admission": simulation_admission.snapshot(),
+        "idempotency": idempotency_store.snapshot(),
+        "portfolio_streams": portfolio_events.snapshot(),
+        "loss_simulation": loss_simulator.snapshot()
     }
 
 @app.post("/score", response_model=ScoreResponse, dependencies=[Depends(require_key)])
 @limiter.limit(SCORE_RATE_LIMIT)
-def score(request: Request, req: ScoreRequest, authorization: str | None = Header(default=None)):
+def score(
+    request: Request,
+    req: ScoreRequest,
+    authorization: str | None = Header(default=None),
+    idempotency_key: str | None = Header(default=None)
+):
+    return _run_idempotent(
+        request, "score", req, authorization, idempotency_key,
+        lambda: _score(req, authorization, idempotency_key)
+    )
+
+def _score(req: ScoreRequest, authorization: str | None, idempotency_key: str | None):
     if model is None:
         logger.error("Scoring endpoint called but model is not loaded")
         raise HTTPException(
@@ -544,9 +1055,11 @@ def score(request: Request, req: ScoreRequest, authorization: str | None = Heade
         # Extract user_id early for cache invalidation
         user_id, is_valid_token = get_user_id_from_token(authorization)
     
+    started_at = time.perf_counter()
     df = _to_dataframe(req)
+    features = req.model_dump()
     try:
-        pd_hat = float(model.predict_proba(df)[:, 1][0])
+        pd_hat = float(_predict_pd(df, [features])[0])
     except Exception as e:
         logger.error(f"ML model inference failed: {type(e).__name__}: {str(e)}", exc_info=True)
         raise HTTPException(
@@ -556,24 +1069,23 @@ def score(request: Request, req: ScoreRequest, authorization: str | None = Heade
     risk = _risk_grade(pd_hat)
     decision = "approve" if pd_hat < THRESHOLD else "review"
     
-    # Compute SHAP explanation
-    explanation_data = _compute_shap_explanation(df, pd_hat)
-    explanation = None
-    if explanation_data:
-        from schemas import Explanation, FeatureContribution
-        try:
-            feature_contribs = [
-                FeatureContribution(**feat) for feat in explanation_data["top_features"]
-            ]
-            explanation = Explanation(
-                top_features=feature_contribs,
-                summary=explanation_data["summary"]
-            )
-        except Exception as e:
-            logger.warning(f"Failed to create explanation object: {str(e)}")
-            explanation = None
+    # Hand off to the challenger (non-blocking; dropped if the shadow queue is full)
+    if shadow_scorer is not None:
+        shadow_scorer.submit(features, pd_hat, decision)
+    
+    # Update drift sketches (constant memory, O(1) per row)
+    if drift_monitor is not None:
+        drift_monitor.update(features, pd_hat)
+    
+    # Compute SHAP explanation (tier depends on EXPLANATION_MODE and latency budget)
+    shap_vector, explanation_tier = _explain_within_budget(df, started_at)
+    # build_explanation already produces the Explanation shape; it is returned as-is
+    explanation_data = build_explanation(shap_dict(shap_vector), pd_hat) if shap_vector is not None else None
+    latency_ms = (time.perf_counter() - started_at) * 1000
     
     # Save to Supabase if connected
+    application_id = None
+    saved_successfully = False
     supabase = get_supabase_client(user_jwt)
     if supabase:
         application_data = {
@@ -591,79 +1103,63 @@ def score(request: Request, req: ScoreRequest, authorization: str | None = Heade
             "pd": float(pd_hat),
             "risk_grade": risk,
             "decision": decision,
-            "explanation": explanation_data  # Store explanation as JSONB
+            "model_version": model_version
         }
+        if EXPLANATION_STORAGE == "compact":
+            # 11 float32 SHAP values; the display structure is rebuilt on read
+            application_data["explanation_compact"] = encode_compact(shap_vector) if shap_vector is not None else None
+        else:
+            application_data["explanation"] = explanation_data  # Store explanation as JSONB
         
         # Add user_id if JWT is available and valid
         if is_valid_token and user_id:
             application_data["user_id"] = user_id
+            if IDEMPOTENCY_DB_COLUMN and idempotency_key:
+                application_data["idempotency_key"] = idempotency_key
         elif user_jwt and not is_valid_token:
             logger.warning("Invalid or unverifiable JWT token provided for application scoring")
         
-        # Attempt to save with retry logic for transient errors
-        max_retries = 2
-        saved_successfully = False
-        
-        for attempt in range(max_retries + 1):
-            try:
-                result = supabase.table("applications").insert(application_data).execute()
-                
-                # Verify insert was successful
-                if hasattr(result, 'data') and result.data:
-                    saved_successfully = True
-                    if attempt > 0:
-                        logger.info(f"Successfully saved application after {attempt} retries")
-                    
-                    # Portfolio stats are automatically updated via database trigger
-                    # (trigger_update_portfolio_stats_on_insert) when application is inserted.
-                    # No manual cache invalidation needed - stats are kept fresh automatically.
-                    if is_valid_token and user_id:
-                        logger.debug(f"Application saved for user {user_id}; portfolio stats will be updated automatically by trigger")
-                    
-                    break
-                elif hasattr(result, 'data') and not result.data:
-                    # Insert returned no data - could be RLS policy issue
-                    logger.warning(
-                        f"Database insert returned no data (attempt {attempt + 1}/{max_retries + 1}). "
-                        "This may indicate RLS policy rejection or missing user_id."
-                    )
-                    if attempt == max_retries:
-                        raise ValueError("Insert operation returned no data after retries")
-                    continue
-                else:
-                    # Unexpected result structure
-                    logger.warning(
-                        f"Unexpected result structure from insert (attempt {attempt + 1}/{max_retries + 1}): "
-                        f"{type(result)}"
-                    )
-                    if attempt == max_retries:
-                        raise ValueError("Insert operation returned unexpected result structure")
-                    continue
-                    
-            except Exception as e:
-                error_type = type(e).__name__
-                error_msg = str(e)
-                
-                # Determine if this is a transient error (worth retrying)
-                is_transient = any(indicator in error_msg.lower() for indicator in [
-                    'timeout', 'connection', 'network', 'temporary', '503', '502', '504'
-                ])
-                
-                if attempt < max_retries and is_transient:
-                    logger.warning(
-                        f"Transient error during database insert (attempt {attempt + 1}/{max_retries + 1}): "
-                        f"{error_type}: {error_msg}. Retrying..."
-                    )
-                    continue
-                else:
-                    # Log the failure (critical or max retries reached)
-                    logger.error(
-                        f"Failed to save application to database after {attempt + 1} attempts: "
-                        f"{error_type}: {error_msg}. "
-                        f"Scoring completed successfully but data was not persisted.",
-                        exc_info=True
-                    )
-                    break
+        # Transient errors are retried with backoff by _execute only when the row carries an
+        # idempotency key (a retried duplicate then hits the unique index); while the
+        # circuit is open the row goes to the local spill file (if configured) instead
+        try:
+            result = _execute(
+                supabase.table("applications").insert(application_data),
+                retry="idempotency_key" in application_data
+            )
+            
+            # Verify insert was successful
+            if result.data:
+                saved_successfully = True
+                application_id = result.data[0].get("id")
+                # Portfolio stats are automatically updated via database trigger
+                # (trigger_update_portfolio_stats_on_insert) when application is inserted.
+                # No manual cache invalidation needed - stats are kept fresh automatically.
+                if is_valid_token and user_id:
+                    _publish_applications_changed(user_id, result.data)
+                    logger.debug(f"Application saved for user {user_id}; portfolio stats will be updated automatically by trigger")
+            else:
+                # Insert returned no data - could be RLS policy issue
+                logger.warning(
+                    "Database insert returned no data. "
+                    "This may indicate RLS policy rejection or missing user_id."
+                )
+        except CircuitOpenError:
+            if spill_log is not None and spill_log.append("applications", application_data):
+                logger.warning("Database circuit open; application spilled to local log")
+            else:
+                logger.warning("Database circuit open; application was not persisted")
+        except Exception as e:
+            if IDEMPOTENCY_DB_COLUMN and "idempotency_key" in application_data and _is_unique_violation(e):
+                # Saved by an earlier request (or an earlier attempt) with the same key
+                saved_successfully = True
+                logger.info(f"Application with this Idempotency-Key already saved for user {user_id}")
+            else:
+                logger.error(
+                    f"Failed to save application to database: {type(e).__name__}: {str(e)}. "
+                    f"Scoring completed successfully but data was not persisted.",
+                    exc_info=True
+                )
         
         if not saved_successfully:
             logger.error(
@@ -671,16 +1167,286 @@ def score(request: Request, req: ScoreRequest, authorization: str | None = Heade
                 "This may indicate database connectivity issues or RLS policy violations."
             )
     
-    return ScoreResponse(pd=pd_hat, risk_grade=risk, decision=decision, top_features=None, explanation=explanation)
+    # Local columnar record of the decision (non-blocking; dropped if the queue is full).
+    # Rows with persisted=False are the ones a recovery job can replay into Supabase
+    if decision_log is not None:
+        decision_log.submit({
+            **features,
+            "ts": datetime.now(timezone.utc),
+            "pd": pd_hat,
+            "risk_grade": risk,
+            "decision": decision,
+            "model_version": model_version,
+            "latency_ms": latency_ms,
+            "user_id": user_id if is_valid_token else None,
+            "application_id": application_id,
+            "persisted": saved_successfully
+        })
+    
+    # Built server-side and shaped like ScoreResponse: serialize directly with orjson,
+    # skipping response_model re-validation
+    return ORJSONResponse({
+        "pd": pd_hat,
+        "risk_grade": risk,
+        "decision": decision,
+        "top_features": None,
+        "explanation": explanation_data,
+        "explanation_tier": explanation_tier if explanation_data is not None or explanation_tier == TIER_SKIPPED else None
+    })
+
+@app.post("/score/sensitivity", response_model=SensitivityResponse, dependencies=[Depends(require_key)])
+@limiter.limit(SCORE_RATE_LIMIT)
+def score_sensitivity(request: Request, req: SensitivityRequest):
+    """
+    What-if analysis for a single applicant: sweep one or two features over a
+    grid of values and return the PD / risk grade / decision surface.
+    
+    The whole grid is scored in a single vectorized model call. Nothing is saved.
+    SHAP explanations are only computed for the grid points in explain_points.
+    """
+    if model is None:
+        logger.error("Sensitivity endpoint called but model is not loaded")
+        raise HTTPException(
+            status_code=503, 
+            detail="Scoring service is temporarily unavailable. Please try again later."
+        )
+    
+    # Validate each sweep value against the ScoreRequest constraints (once per value, not per grid point)
+    base_fields = req.base.model_dump()
+    features = [sweep.feature for sweep in req.sweeps]
+    values = []
+    for sweep in req.sweeps:
+        validated = []
+        for v in sweep.values:
+            try:
+                validated.append(getattr(ScoreRequest(**{**base_fields, sweep.feature: v}), sweep.feature))
+            except ValueError:
+                raise HTTPException(
+                    status_code=422,
+                    detail=f"Invalid value {v!r} for feature '{sweep.feature}'."
+                )
+        values.append(validated)
+    
+    shape = tuple(len(v) for v in values)
+    n_points = int(np.prod(shape))
+    if n_points > WHATIF_MAX_GRID:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Sensitivity grid has {n_points} points; the maximum is {WHATIF_MAX_GRID}."
+        )
+    
+    # Build the full grid as one frame: repeat the base row, then overwrite the
+    # swept columns with the flattened (row-major) mesh
+    grid = _to_dataframe(req.base)
+    grid = grid.loc[grid.index.repeat(n_points)].reset_index(drop=True)
+    mesh = np.meshgrid(*[np.arange(n) for n in shape], indexing="ij")
+    for feature, feature_values, idx in zip(features, values, mesh):
+        grid[feature] = np.asarray(feature_values, dtype=object)[idx.ravel()]
+        if not isinstance(feature_values[0], str):
+            grid[feature] = grid[feature].astype(type(feature_values[0]))
+    
+    try:
+        pds = _predict_pd(grid)
+    except Exception as e:
+        logger.error(f"ML model inference failed: {type(e).__name__}: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=500, 
+            detail="An error occurred while processing your request. Please verify your input and try again."
+        )
+    
+    grades = _risk_grades(pds)
+    decisions = np.where(pds < THRESHOLD, "approve", "review")
+    
+    explanations = None
+    if req.explain_points:
+        flat_idx = []
+        for point in req.explain_points:
+            if len(point) != len(shape) or any(not 0 <= i < n for i, n in zip(point, shape)):
+                raise HTTPException(
+                    status_code=422,
+                    detail=f"Explain point {point} is outside the sensitivity grid {list(shape)}."
+                )
+            flat_idx.append(int(np.ravel_multi_index(tuple(point), shape)))
+        explained = _compute_shap_explanations(grid.iloc[flat_idx], pds[flat_idx], req.explain_tier)
+        explanations = [
+            {"index": point, "explanation": explained[i] if explained else None}
+            for i, point in enumerate(req.explain_points)
+        ]
+    
+    return ORJSONResponse({
+        "features": features,
+        "values": values,
+        "pd": pds.reshape(shape).tolist(),
+        "risk_grade": grades.reshape(shape).tolist(),
+        "decision": decisions.reshape(shape).tolist(),
+        "explanations": explanations,
+        "explanation_tier": req.explain_tier if explanations else None
+    })
+
+def _counterfactual_candidates(req: ScoreRequest, steps: int) -> tuple[dict, np.ndarray, np.ndarray]:
+    """
+    Enumerate candidate changes to the actionable features, ordered by distance.
+    
+    Numeric features (loan_amnt, dti, revol_util) can only be reduced; each gets
+    `steps` evenly spaced levels from "unchanged" to its floor, and the cost of a
+    level is its fractional reduction. Term can be switched at TERM_CHANGE_COST.
+    
+    Returns:
+        tuple: (level values per feature, level index matrix of shape (n, 4) sorted by
+                distance with the unchanged application removed, matching distances)
+    """
+    other_term = "60 months" if req.term == "36 months" else "36 months"
+    loan_floor = min(COUNTERFACTUAL_MIN_LOAN, req.loan_amnt)
+    fractions = {
+        "loan_amnt": np.linspace(0.0, 1.0 - loan_floor / req.loan_amnt, steps) if req.loan_amnt > loan_floor else np.zeros(1),
+        "dti": np.linspace(0.0, 1.0, steps) if req.dti > 0 else np.zeros(1),
+        "revol_util": np.linspace(0.0, 1.0, steps) if req.revol_util > 0 else np.zeros(1),
+    }
+    level_values = {
+        "loan_amnt": np.unique(np.round(req.loan_amnt * (1 - fractions["loan_amnt"])).astype(int))[::-1],
+        "dti": np.round(req.dti * (1 - fractions["dti"]), 2),
+        "revol_util": np.round(req.revol_util * (1 - fractions["revol_util"]), 2),
+        "term": np.array([req.term, other_term], dtype=object),
+    }
+    level_costs = [
+        1.0 - level_values["loan_amnt"] / req.loan_amnt,
+        fractions["dti"],
+        fractions["revol_util"],
+        np.array([0.0, TERM_CHANGE_COST]),
+    ]
+    
+    grids = np.meshgrid(*[np.arange(len(c)) for c in level_costs], indexing="ij")
+    levels = np.stack([g.ravel() for g in grids], axis=1)
+    distances = sum(cost[levels[:, i]] for i, cost in enumerate(level_costs))
+    
+    order = np.argsort(distances, kind="stable")
+    order = order[distances[order] > 0]  # drop the unchanged application
+    return level_values, levels[order], distances[order]
+
+@app.post("/score/counterfactual", response_model=CounterfactualResponse, dependencies=[Depends(require_key)])
+@limiter.limit(SCORE_RATE_LIMIT)
+def score_counterfactual(request: Request, req: CounterfactualRequest):
+    """
+    Find the closest changes to loan_amnt, term, dti and revol_util that bring the
+    PD below THRESHOLD.
+    
+    Candidates are scored in batches of COUNTERFACTUAL_BATCH_SIZE in order of
+    increasing distance. Candidates that change every feature at least as much as
+    an approval already found are pruned (they cannot be minimal), and the search
+    stops after max_results approvals or max_evaluations scored candidates.
+    Nothing is saved.
+    """
+    if model is None:
+        logger.error("Counterfactual endpoint called but model is not loaded")
+        raise HTTPException(
+            status_code=503, 
+            detail="Scoring service is temporarily unavailable. Please try again later."
+        )
+    
+    started_at = time.perf_counter()
+    base = req.application
+    base_df = _to_dataframe(base)
+    try:
+        base_pd = float(_predict_pd(base_df, [base.model_dump()])[0])
+    except Exception as e:
+        logger.error(f"ML model inference failed: {type(e).__name__}: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=500, 
+            detail="An error occurred while processing your request. Please verify your input and try again."
+        )
+    
+    budget = min(req.max_evaluations, COUNTERFACTUAL_MAX_EVALUATIONS)
+    level_values, levels, distances = _counterfactual_candidates(base, req.steps)
+    actionable = ["loan_amnt", "dti", "revol_util", "term"]
+    
+    found = []  # (level index row, pd, distance) of accepted counterfactuals, in distance order
+    evaluated = 0
+    pos = 0
+    
+    if base_pd >= THRESHOLD:
+        while pos < len(levels) and evaluated < budget and len(found) < req.max_results:
+            batch = np.arange(pos, min(pos + COUNTERFACTUAL_BATCH_SIZE, len(levels)))
+            pos = batch[-1] + 1
+            
+            # Prune candidates that dominate an approval we already have
+            if found:
+                dominated = np.zeros(len(batch), dtype=bool)
+                for found_levels, _, _ in found:
+                    dominated |= np.all(levels[batch] >= found_levels, axis=1)
+                batch = batch[~dominated]
+            batch = batch[:budget - evaluated]
+            if len(batch) == 0:
+                continue
+            
+            frame = base_df.loc[base_df.index.repeat(len(batch))].reset_index(drop=True)
+            for i, feature in enumerate(actionable):
+                frame[feature] = level_values[feature][levels[batch, i]]
+            try:
+                pds = _predict_pd(frame)
+            except Exception as e:
+                logger.error(f"Counterfactual batch inference failed: {type(e).__name__}: {str(e)}", exc_info=True)
+                raise HTTPException(
+                    status_code=500, 
+                    detail="An error occurred while processing your request. Please verify your input and try again."
+                )
+            evaluated += len(batch)
+            
+            # Accept approvals in distance order, skipping ones that dominate earlier finds in this batch
+            for j in np.flatnonzero(pds < THRESHOLD):
+                candidate = levels[batch[j]]
+                if any(np.all(candidate >= found_levels) for found_levels, _, _ in found):
+                    continue
+                found.append((candidate, float(pds[j]), float(distances[batch[j]])))
+                if len(found) >= req.max_results:
+                    break
+    
+    counterfactuals = []
+    for candidate, cf_pd, distance in found:
+        changes = {}
+        for i, feature in enumerate(actionable):
+            if candidate[i] != 0:
+                proposed = level_values[feature][candidate[i]]
+                changes[feature] = {
+                    "original": getattr(base, feature),
+                    "proposed": proposed if isinstance(proposed, str) else proposed.item()
+                }
+        counterfactuals.append({
+            "changes": changes,
+            "pd": cf_pd,
+            "risk_grade": _risk_grade(cf_pd),
+            "distance": round(distance, 4)
+        })
+    
+    return ORJSONResponse({
+        "pd": base_pd,
+        "risk_grade": _risk_grade(base_pd),
+        "decision": "approve" if base_pd < THRESHOLD else "review",
+        "threshold": THRESHOLD,
+        "counterfactuals": counterfactuals,
+        "candidates_evaluated": evaluated,
+        "candidates_total": len(levels),
+        "budget_exhausted": evaluated >= budget and pos < len(levels) and len(found) < req.max_results,
+        "elapsed_ms": round((time.perf_counter() - started_at) * 1000, 2)
+    })
 
 @app.get("/portfolio", dependencies=[Depends(require_key)])
 @limiter.limit(PORTFOLIO_RATE_LIMIT)
-def portfolio(request: Request, authorization: str | None = Header(default=None)):
+def portfolio(
+    request: Request,
+    fields: str | None = Query(None, description="Comma-separated application fields to return"),
+    explanation_format: str = Query("full", pattern="^(full|compact)$"),
+    limit: int | None = Query(None, ge=1, le=1000, description="Page size (default: all applications)"),
+    offset: int = Query(0, ge=0),
+    authorization: str | None = Header(default=None)
+):
     # Extract user JWT from Authorization header
     user_jwt = None
     if authorization and authorization.startswith("Bearer "):
         user_jwt = authorization.split(" ")[1]
     
+    selected_fields = _parse_fields(fields, PORTFOLIO_DEFAULT_FIELDS)
+    columns = _select_columns(selected_fields)
+    
     supabase = get_supabase_client(user_jwt)
     if not supabase:
         return {"error": "Supabase not connected"}
@@ -693,29 +1459,49 @@ def portfolio(request: Request, authorization: str | None = Header(default=None)
         logger.warning("Invalid or unverifiable JWT token provided for portfolio query. RLS policies will enforce access control.")
     
     try:
-        # Get portfolio stats from cache or compute fresh (uses row count comparison)
-        stats = _get_or_compute_portfolio_stats(supabase, user_id if is_valid_token and user_id else None)
-        
-        # Get all applications (always fetch fresh, not cached)
-        # Remove limit to fetch all applications for pagination
-        recent_query = supabase.table("applications").select(
-            "id, created_at, loan_amnt, annual_inc, pd, risk_grade, decision, explanation"
-        ).order("created_at", desc=True)
+        scoped_user_id = user_id if is_valid_token and user_id else None
+        conditional = request.headers.get("if-none-match") is not None
+        variant = ("portfolio", selected_fields, explanation_format, limit, offset)
         
-        if is_valid_token and user_id:
-            recent_query = recent_query.eq("user_id", user_id)
+        combined = None
+        if PORTFOLIO_COMBINED_RPC and scoped_user_id and not conditional:
+            # Stats + first page in a single round-trip
+            combined = _fetch_portfolio_combined(supabase, scoped_user_id, columns, limit, offset)
         
-        recent_result = recent_query.execute()
+        if combined is not None:
+            stats, recent_applications = combined
+            etag = _portfolio_etag(scoped_user_id, stats.get("version"), *variant)
+        elif conditional:
+            # Stats first so a matching ETag skips the applications query entirely
+            stats = _get_or_compute_portfolio_stats(supabase, scoped_user_id)
+            etag = _portfolio_etag(scoped_user_id, stats.get("version"), *variant)
+            if _etag_matches(request.headers.get("if-none-match"), etag):
+                return _conditional_json(request, None, etag)
+            recent_applications = _fetch_recent_applications(supabase, scoped_user_id, columns, limit, offset)
+        else:
+            # Tag with the version read before the listing: a write landing during the
+            # fan-out bumps the version, so a stale listing can never be revalidated
+            etag = _portfolio_etag(scoped_user_id, _portfolio_version(supabase, scoped_user_id), *variant)
+            # Stats and listing are independent: run them concurrently
+            stats_future = supabase_io_pool.submit(_get_or_compute_portfolio_stats, supabase, scoped_user_id)
+            recent_future = supabase_io_pool.submit(_fetch_recent_applications, supabase, scoped_user_id, columns, limit, offset)
+            stats = stats_future.result()
+            recent_applications = recent_future.result()
         
-        return {
+        response = {
             "total_applications": stats["total_applications"],
             "avg_pd": stats["avg_pd"],
             "approval_rate": stats["approval_rate"],
             "default_rate": stats["default_rate"],
             "grade_distribution": stats["grade_distribution"],
-            "recent_applications": recent_result.data
+            "recent_applications": _project_rows(recent_applications, selected_fields, explanation_format)
         }
+        if explanation_format == "compact" and "explanation" in selected_fields:
+            response["explanation_features"] = ORIGINAL_FEATURES
+        return _conditional_json(request, response, etag)
         
+    except CircuitOpenError as e:
+        raise _database_unavailable(e)
     except Exception as e:
         logger.error(f"Failed to retrieve portfolio data: {type(e).__name__}: {str(e)}", exc_info=True)
         raise HTTPException(
@@ -723,9 +1509,76 @@ def portfolio(request: Request, authorization: str | None = Header(default=None)
             detail="An error occurred while retrieving portfolio data. Please try again later."
         )
 
+SIMULATION_GROUP_BY = ("risk_grade", "purpose", "state", "term")
+SIMULATION_MAX_THRESHOLDS = 20
+
+def _parse_thresholds(thresholds: str | None, default: float) -> List[float]:
+    """Validate a comma-separated `thresholds` parameter; returns sorted unique values."""
+    if thresholds is None or not thresholds.strip():
+        return [default]
+    try:
+        values = sorted({float(t) for t in thresholds.split(",") if t.strip()})
+    except ValueError:
+        raise HTTPException(status_code=400, detail="thresholds must be a comma-separated list of numbers.")
+    if not values or len(values) > SIMULATION_MAX_THRESHOLDS:
+        raise HTTPException(status_code=400, detail=f"Provide between 1 and {SIMULATION_MAX_THRESHOLDS} thresholds.")
+    if any(not 0.01 <= t <= 0.25 for t in values):
+        raise HTTPException(status_code=400, detail="Each threshold must be between 0.01 and 0.25.")
+    return values
+
+def _threshold_grid(pds: np.ndarray, codes: np.ndarray, n_groups: int, thresholds: np.ndarray):
+    """
+    Approved count and approved PD sum for every (group, threshold) cell in one pass.
+    
+    Each application is bucketed by how many of the sorted thresholds are <= its PD;
+    it is approved at threshold j (pd < t_j) iff its bucket is <= j. One bincount over
+    (group, bucket) and a prefix sum along the threshold axis give every cell.
+    
+    Returns:
+        tuple: (approved, approved_pd_sum) of shape (n_groups, n_thresholds), and
+        applications per group
+    """
+    k = len(thresholds)
+    buckets = np.searchsorted(thresholds, pds, side="right")  # k = rejected at every threshold
+    cells = codes * (k + 1) + buckets
+    counts = np.bincount(cells, minlength=n_groups * (k + 1)).reshape(n_groups, k + 1)
+    pd_sums = np.bincount(cells, weights=pds, minlength=n_groups * (k + 1)).reshape(n_groups, k + 1)
+    return np.cumsum(counts[:, :k], axis=1), np.cumsum(pd_sums[:, :k], axis=1), counts.sum(axis=1)
+
+def _simulation_results(thresholds: List[float], approved: np.ndarray, approved_pd: np.ndarray, applications: int) -> List[Dict[str, Any]]:
+    """One simulate_portfolio result per threshold from a row of _threshold_grid."""
+    return [
+        {
+            "threshold": t,
+            "approval_rate": round(int(n) / applications, 4) if applications else 0.0,
+            "expected_default_rate": round(float(pd_sum) / int(n), 4) if n else 0.0,
+            "applications_approved": int(n),
+            "applications_rejected": int(applications - n)
+        }
+        for t, n, pd_sum in zip(thresholds, approved, approved_pd)
+    ]
+
 @app.get("/portfolio/simulate", dependencies=[Depends(require_key)])
 @limiter.limit(PORTFOLIO_RATE_LIMIT)
-def simulate_portfolio(request: Request, threshold: float = Query(0.15, ge=0.01, le=0.25), authorization: str | None = Header(default=None)):
+def simulate_portfolio(
+    request: Request,
+    threshold: float = Query(0.15, ge=0.01, le=0.25),
+    thresholds: str | None = Query(None, description="Comma-separated thresholds to simulate at once (overrides threshold)"),
+    group_by: str | None = Query(None, pattern="^(risk_grade|purpose|state|term)$", description="Break results down by this column"),
+    authorization: str | None = Header(default=None)
+):
+    """
+    Approval rate and expected default rate if applications with PD below the
+    threshold were approved.
+    
+    With only `threshold` the response is the single whole-portfolio result.
+    With `thresholds` and/or `group_by` it is a grid: `total` has one result per
+    threshold and `segments` one row per group value, all computed in a single
+    vectorized pass over the fetched columns.
+    """
+    threshold_list = _parse_thresholds(thresholds, threshold)
+    grid_response = thresholds is not None or group_by is not None
+    
     # Extract user JWT from Authorization header
     user_jwt = None
     if authorization and authorization.startswith("Bearer "):
@@ -743,39 +1596,50 @@ def simulate_portfolio(request: Request, threshold: float = Query(0.15, ge=0.01,
         logger.warning("Invalid or unverifiable JWT token provided for portfolio simulation. RLS policies will enforce access control.")
     
     try:
+        # Conditional GET: skip the applications query if the client's copy is current
+        scoped_user_id = user_id if is_valid_token and user_id else None
+        variant = ("simulate", threshold) if not grid_response else ("simulate", tuple(threshold_list), group_by)
+        etag = _portfolio_etag(scoped_user_id, _portfolio_version(supabase, scoped_user_id), *variant)
+        if _etag_matches(request.headers.get("if-none-match"), etag):
+            return _conditional_json(request, None, etag)
+        
         # Get all applications with optional user filtering
         # Note: RLS policies in Supabase will enforce data isolation even if user_id is None
-        query = supabase.table("applications").select("pd, risk_grade")
+        query = supabase.table("applications").select("pd" + (f", {group_by}" if group_by else ""))
         if is_valid_token and user_id:
             query = query.eq("user_id", user_id)
         
-        result = query.execute()
-        applications = result.data
-        
-        if not applications:
-            return {
-                "threshold": threshold,
-                "approval_rate": 0.0,
-                "expected_default_rate": 0.0,
-                "applications_approved": 0,
-                "applications_rejected": 0
-            }
+        applications = _execute(query).data or []
         
-        # Simulate with new threshold
-        approved_apps = [app for app in applications if app["pd"] < threshold]
-        rejected_apps = [app for app in applications if app["pd"] >= threshold]
+        pds = np.fromiter((app["pd"] for app in applications), dtype=np.float64, count=len(applications))
+        if group_by:
+            segment_names, codes = np.unique(
+                np.array([str(app.get(group_by) or "unknown") for app in applications], dtype=str), return_inverse=True
+            )
+        else:
+            segment_names, codes = np.array([], dtype=str), np.zeros(len(applications), dtype=np.int64)
+        approved, approved_pd, segment_sizes = _threshold_grid(
+            pds, codes.astype(np.int64), max(len(segment_names), 1), np.array(threshold_list)
+        )
+        total = _simulation_results(threshold_list, approved.sum(axis=0), approved_pd.sum(axis=0), len(applications))
         
-        approval_rate = len(approved_apps) / len(applications)
-        expected_default_rate = sum(app["pd"] for app in approved_apps) / len(approved_apps) if approved_apps else 0.0
+        if not grid_response:
+            return _conditional_json(request, total[0], etag)
         
-        return {
-            "threshold": threshold,
-            "approval_rate": round(approval_rate, 4),
-            "expected_default_rate": round(expected_default_rate, 4),
-            "applications_approved": len(approved_apps),
-            "applications_rejected": len(rejected_apps)
-        }
+        response = {"thresholds": threshold_list, "group_by": group_by, "applications": len(applications), "total": total}
+        if group_by:
+            response["segments"] = [
+                {
+                    "segment": str(name),
+                    "applications": int(size),
+                    "results": _simulation_results(threshold_list, approved[g], approved_pd[g], int(size))
+                }
+                for g, (name, size) in enumerate(zip(segment_names, segment_sizes))
+            ]
+        return _conditional_json(request, response, etag)
         
+    except CircuitOpenError as e:
+        raise _database_unavailable(e)
     except Exception as e:
         logger.error(f"Portfolio simulation failed: {type(e).__name__}: {str(e)}", exc_info=True)
         raise HTTPException(
@@ -783,13 +1647,306 @@ def simulate_portfolio(request: Request, threshold: float = Query(0.15, ge=0.01,
             detail="An error occurred while running the simulation. Please try again later."
         )
 
+@app.get("/portfolio/stream", dependencies=[Depends(require_key)])
+async def portfolio_stream(request: Request, authorization: str | None = Header(default=None)):
+    """
+    Server-sent events for the caller's portfolio. Subscribe once and apply
+    `applications_created` / `applications_deleted` events (application
+    summaries + stat deltas) instead of polling /portfolio; on `resync` the
+    client missed events and should refetch /portfolio.
+    """
+    if not authorization or not authorization.startswith("Bearer "):
+        raise HTTPException(status_code=401, detail="Authentication required to subscribe to portfolio updates.")
+    user_id, is_valid_token = await asyncio.get_running_loop().run_in_executor(
+        priority_pool, get_user_id_from_token, authorization
+    )
+    if not is_valid_token or not user_id:
+        raise HTTPException(status_code=401, detail="Invalid or expired authentication token.")
+    
+    subscription = portfolio_events.subscribe(user_id)
+    if subscription is None:
+        raise HTTPException(status_code=429, detail="Too many open portfolio streams for this user.")
+    
+    async def stream():
+        try:
+            yield b"retry: 5000\n" + format_event("ready", {})
+            while True:
+                try:
+                    yield await asyncio.wait_for(subscription.queue.get(), timeout=SSE_HEARTBEAT_S)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield b": keep-alive\n\n"
+        finally:
+            portfolio_events.unsubscribe(user_id, subscription)
+    
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def _fetch_rollups(supabase: Client, user_id: str, granularity: str, start: datetime, end: datetime) -> List[Dict[str, Any]]:
+    """Rollup rows of one granularity with bucket_start in [start, end)."""
+    return _execute(
+        supabase.table("portfolio_rollups")
+        .select(", ".join(rollups.ROLLUP_COLUMNS))
+        .eq("user_id", user_id)
+        .eq("granularity", granularity)
+        .gte("bucket_start", start.isoformat())
+        .lt("bucket_start", end.isoformat())
+        .order("bucket_start")
+    ).data
+
+@app.get("/portfolio/trends", dependencies=[Depends(require_key)])
+@limiter.limit(PORTFOLIO_RATE_LIMIT)
+def portfolio_trends(
+    request: Request,
+    granularity: str = Query("day", pattern="^(hour|day|month)$"),
+    start: datetime | None = Query(None, description="Range start (ISO 8601, UTC if no offset); default depends on granularity"),
+    end: datetime | None = Query(None, description="Range end, exclusive (default: now)"),
+    authorization: str | None = Header(default=None)
+):
+    """
+    Application count, average PD, approval rate and grade distribution per
+    hour/day/month bucket, plus totals for the whole range. Served from the
+    incrementally maintained portfolio_rollups table: the series reads one row
+    per non-empty bucket and the totals merge the coarsest buckets covering the
+    range, so cost does not grow with the number of applications.
+    """
+    user_id, supabase = _authenticated_client(authorization, "view portfolio trends")
+    
+    end = rollups.to_utc(end) if end else datetime.now(timezone.utc)
+    start = rollups.to_utc(start) if start else end - TRENDS_DEFAULT_SPAN[granularity]
+    # Buckets are hourly at the finest, so the range is hour-aligned (end rounded up)
+    start = rollups.truncate(start, "hour")
+    end_floor = rollups.truncate(end, "hour")
+    end = end_floor if end_floor == end else rollups.next_bucket(end_floor, "hour")
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end.")
+    if rollups.bucket_count(start, end, granularity) > TRENDS_MAX_BUCKETS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Range too large for {granularity} buckets (max {TRENDS_MAX_BUCKETS}); use a coarser granularity."
+        )
+    
+    try:
+        # Series buckets overlapping the range, and the exact cover for totals, fetched concurrently
+        series_future = supabase_io_pool.submit(
+            _fetch_rollups, supabase, user_id, granularity, rollups.truncate(start, granularity), end
+        )
+        cover_futures = [
+            supabase_io_pool.submit(_fetch_rollups, supabase, user_id, g, seg_start, seg_end)
+            for g, seg_start, seg_end in rollups.cover(start, end)
+        ]
+        series_rows = series_future.result()
+        cover_rows = [row for future in cover_futures for row in future.result()]
+    except CircuitOpenError as e:
+        raise _database_unavailable(e)
+    except Exception as e:
+        logger.error(f"Failed to retrieve portfolio trends: {type(e).__name__}: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail="An error occurred while retrieving portfolio trends. Please try again later."
+        )
+    
+    return {
+        "granularity": granularity,
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        # Only non-empty buckets are listed
+        "buckets": [
+            {"bucket_start": row["bucket_start"], **rollups.summarize([row])}
+            for row in series_rows if row["applications"] > 0
+        ],
+        "total": rollups.summarize(cover_rows),
+        "buckets_read": len(series_rows) + len(cover_rows)
+    }
+
+@app.get("/portfolio/explanation", dependencies=[Depends(require_key)])
+@limiter.limit(PORTFOLIO_RATE_LIMIT)
+def portfolio_explanation(
+    request: Request,
+    by_grade: bool = Query(False, description="Also break the importance down by risk grade"),
+    authorization: str | None = Header(default=None)
+):
+    """
+    Global explanation of the user's portfolio: mean SHAP value (direction) and
+    mean absolute SHAP value (importance) of each of the 11 features across all
+    explained applications. Served from the trigger-maintained
+    portfolio_feature_importance table (one row per risk grade), so the cost
+    does not grow with the number of applications.
+    """
+    user_id, supabase = _authenticated_client(authorization, "view the portfolio explanation")
+    
+    try:
+        rows = _execute(
+            supabase.table("portfolio_feature_importance")
+            .select(", ".join(IMPORTANCE_COLUMNS))
+            .eq("user_id", user_id)
+        ).data
+    except CircuitOpenError as e:
+        raise _database_unavailable(e)
+    except Exception as e:
+        logger.error(f"Failed to retrieve portfolio explanation: {type(e).__name__}: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail="An error occurred while retrieving the portfolio explanation. Please try again later."
+        )
+    
+    response = summarize_importance(rows)
+    if by_grade:
+        response["by_grade"] = {
+            row["risk_grade"]: summarize_importance([row])
+            for row in sorted(rows, key=lambda r: r["risk_grade"])
+        }
+    return response
+
+@app.get("/portfolio/loss-simulation", dependencies=[Depends(require_key)])
+@limiter.limit(PORTFOLIO_RATE_LIMIT)
+def portfolio_loss_simulation(
+    request: Request,
+    lgd: float = Query(0.45, gt=0, le=1, description="Loss given default, as a fraction of loan_amnt"),
+    correlation: float = Query(0.0, ge=0, le=0.99, description="Single-factor asset correlation (0 = independent defaults)"),
+    scenarios: int = Query(10000, ge=100, le=LOSS_SIM_MAX_SCENARIOS),
+    seed: int | None = Query(None, ge=0, description="Random seed; the same seed reproduces the same result"),
+    threshold: float | None = Query(None, ge=0.01, le=0.25, description="Simulate the book approved at this PD threshold instead of stored decisions"),
+    authorization: str | None = Header(default=None)
+):
+    """
+    Loss distribution of the user's approved book by Monte Carlo simulation:
+    expected loss, quantiles, and VaR / expected shortfall at 95%, 99% and 99.9%.
+    
+    Approved applications are those with decision "approve", or with PD below
+    `threshold` when given. Each scenario defaults every loan with its PD,
+    coupled through one systematic factor when `correlation` > 0, and loses
+    lgd * loan_amnt per default. The seed used is returned so a run can be repeated.
+    Requests over LOSS_SIM_MAX_CELLS (scenarios x approved applications) are rejected with 400.
+    """
+    user_id, supabase = _authenticated_client(authorization, "run the loss simulation")
+    
+    try:
+        query = supabase.table("applications").select("pd, loan_amnt, decision").eq("user_id", user_id)
+        applications = _execute(query).data or []
+    except CircuitOpenError as e:
+        raise _database_unavailable(e)
+    except Exception as e:
+        logger.error(f"Failed to load applications for loss simulation: {type(e).__name__}: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail="An error occurred while running the loss simulation. Please try again later."
+        )
+    
+    if threshold is not None:
+        approved = [app for app in applications if app["pd"] < threshold]
+    else:
+        approved = [app for app in applications if app.get("decision") == "approve"]
+    
+    if scenarios * len(approved) > LOSS_SIM_MAX_CELLS:
+        raise HTTPException(
+            status_code=400,
+            detail=(
+                f"Too much work for one simulation: {len(approved)} approved applications allow "
+                f"at most {max(1, LOSS_SIM_MAX_CELLS // len(approved))} scenarios."
+            )
+        )
+    
+    if seed is None:
+        seed = int(np.random.default_rng().integers(2**31))
+    result = loss_simulator.run(
+        np.fromiter((app["pd"] for app in approved), dtype=np.float64, count=len(approved)),
+        np.fromiter((app["loan_amnt"] for app in approved), dtype=np.float64, count=len(approved)),
+        lgd=lgd,
+        correlation=correlation,
+        n_scenarios=scenarios,
+        seed=seed,
+    )
+    return {
+        "applications_approved": len(approved),
+        "lgd": lgd,
+        "correlation": correlation,
+        "scenarios": scenarios,
+        "seed": seed,
+        **result,
+    }
+
+@app.get("/monitoring/drift", dependencies=[Depends(require_key)])
+@limiter.limit(PORTFOLIO_RATE_LIMIT)
+def drift_report(request: Request):
+    """
+    PSI / KS drift scores of scored traffic against the training reference
+    profile, per input feature and for the PD distribution. Computed from
+    in-memory histograms; no stored data is scanned. Counts are per worker
+    process and reset on restart; below min_rows the status is "insufficient_data".
+    """
+    if drift_monitor is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Drift monitoring is not available (reference profile not loaded)."
+        )
+    return drift_monitor.report()
+
+@app.post("/applications/get/bulk", response_model=BulkGetApplicationsResponse, dependencies=[Depends(require_key)])
+@limiter.limit(PORTFOLIO_RATE_LIMIT)
+async def get_applications_bulk(
+    request: Request,
+    req: BulkGetApplicationsRequest,
+    fields: str | None = Query(None, description="Comma-separated application fields to return (default: all)"),
+    authorization: str | None = Header(default=None)
+):
+    """
+    Get several applications by ID with one token check and a single `in`
+    filtered query. RLS restricts the read to the caller's rows; found rows are
+    keyed by id and requested ids that were not returned are listed in
+    `missing_ids`. Use `fields` to return only a subset of columns.
+    """
+    # Same priority lane as GET /applications/{id}
+    return await asyncio.get_running_loop().run_in_executor(
+        priority_pool, _get_applications_bulk, req, fields, authorization
+    )
+
+def _get_applications_bulk(req: BulkGetApplicationsRequest, fields: str | None, authorization: str | None) -> dict:
+    selected_fields = _parse_fields(fields, APPLICATION_FIELDS)
+    user_id, supabase = _authenticated_client(authorization, "view applications")
+    ids = list(dict.fromkeys(str(i) for i in req.ids))
+    
+    try:
+        result = _execute(supabase.table("applications").select(_select_clause(selected_fields)).in_("id", ids))
+    except CircuitOpenError as e:
+        raise _database_unavailable(e)
+    except Exception as e:
+        logger.error(f"Failed to retrieve {len(ids)} applications: {type(e).__name__}: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail="An error occurred while retrieving the applications."
+        )
+    
+    applications = {row["id"]: row for row in _project_rows(result.data or [], selected_fields)}
+    return {
+        "applications": applications,
+        "missing_ids": [i for i in ids if i not in applications]
+    }
+
 @app.get("/applications/{application_id}", dependencies=[Depends(require_key)])
 @limiter.limit(PORTFOLIO_RATE_LIMIT)
-def get_application(request: Request, application_id: str, authorization: str | None = Header(default=None)):
+async def get_application(
+    request: Request,
+    application_id: str,
+    fields: str | None = Query(None, description="Comma-separated application fields to return (default: all)"),
+    authorization: str | None = Header(default=None)
+):
     """
     Get a single application by ID with full details including explanation.
     Requires authentication and verifies user owns the application.
+    Use `fields` to return only a subset of columns.
     """
+    # Priority lane: served from priority_pool, not the threadpool scoring requests use
+    return await asyncio.get_running_loop().run_in_executor(
+        priority_pool, _get_application, application_id, fields, authorization
+    )
+
+def _get_application(application_id: str, fields: str | None, authorization: str | None) -> dict:
+    selected_fields = _parse_fields(fields, APPLICATION_FIELDS)
     # Extract and verify user JWT
     user_jwt = None
     user_id = None
@@ -820,7 +1977,7 @@ def get_application(request: Request, application_id: str, authorization: str |
     
     try:
         # Fetch application with RLS enforcement (user can only see their own)
-        result = supabase.table("applications").select("*").eq("id", application_id).execute()
+        result = _execute(supabase.table("applications").select(_select_clause(selected_fields)).eq("id", application_id))
         
         if not result.data or len(result.data) == 0:
             raise HTTPException(
@@ -828,11 +1985,13 @@ def get_application(request: Request, application_id: str, authorization: str |
                 detail="Application not found or you don't have permission to view it."
             )
         
-        application = result.data[0]
+        application = _project_rows(result.data[:1], selected_fields)[0]
         return application
         
     except HTTPException:
         raise
+    except CircuitOpenError as e:
+        raise _database_unavailable(e)
     except Exception as e:
         logger.error(f"Failed to retrieve application: {type(e).__name__}: {str(e)}", exc_info=True)
         raise HTTPException(
@@ -874,15 +2033,16 @@ def delete_application(request: Request, application_id: str, authorization: str
     
     try:
         # Delete application (RLS will ensure user can only delete their own applications)
-        result = supabase.table("applications").delete().eq("id", application_id).execute()
+        result = _execute(supabase.table("applications").delete().eq("id", application_id))
         
         # Check if deletion was successful
         if result.data and len(result.data) > 0:
             logger.info(f"Application {application_id} deleted by user {user_id}")
+            _publish_applications_changed(user_id, result.data, deleted=True)
             # Update portfolio stats manually (until DELETE trigger is added to database)
             # TODO: Once DELETE trigger is added, this manual update can be removed
             try:
-                supabase.rpc("upsert_portfolio_stats", {"p_user_id": user_id}).execute()
+                _execute(supabase.rpc("upsert_portfolio_stats", {"p_user_id": user_id}))
                 logger.debug(f"Portfolio stats updated after deletion for user {user_id}")
             except Exception as e:
                 logger.warning(f"Failed to update portfolio stats after deletion: {str(e)}")
@@ -896,6 +2056,8 @@ def delete_application(request: Request, application_id: str, authorization: str
             )
     except HTTPException:
         raise
+    except CircuitOpenError as e:
+        raise _database_unavailable(e)
     except Exception as e:
         logger.error(f"Error deleting application {application_id}: {type(e).__name__}: {str(e)}", exc_info=True)
         raise HTTPException(
@@ -905,12 +2067,24 @@ def delete_application(request: Request, application_id: str, authorization: str
 
 @app.post("/applications/save", response_model=SaveApplicationResponse, dependencies=[Depends(require_key)])
 @limiter.limit(SCORE_RATE_LIMIT)
-def save_application(request: Request, req: SaveApplicationRequest, authorization: str | None = Header(default=None)):
+def save_application(
+    request: Request,
+    req: SaveApplicationRequest,
+    authorization: str | None = Header(default=None),
+    idempotency_key: str | None = Header(default=None)
+):
     """
     Save a previously scored application to the database.
     Requires authentication. This endpoint is used to persist applications
     that were scored while the user was unauthenticated.
+    Send an Idempotency-Key header to make retries safe.
     """
+    return _run_idempotent(
+        request, "applications/save", req, authorization, idempotency_key,
+        lambda: _save_application(req, authorization, idempotency_key)
+    )
+
+def _save_application(req: SaveApplicationRequest, authorization: str | None, idempotency_key: str | None):
     # Extract and verify user JWT
     user_jwt = None
     user_id = None
@@ -941,8 +2115,72 @@ def save_application(request: Request, req: SaveApplicationRequest, authorizatio
         )
     
     # Prepare application data for insertion
-    application_data = {
-        "user_id": user_id,  # Always set user_id for this endpoint
+    application_data = _saved_application_row(req, user_id)
+    if IDEMPOTENCY_DB_COLUMN and idempotency_key:
+        application_data["idempotency_key"] = idempotency_key
+    
+    # Transient errors are retried with backoff by _execute only when the row carries an
+    # idempotency key; otherwise a retry after a timeout could insert the row twice
+    saved_successfully = False
+    application_id = None
+    
+    try:
+        result = _execute(
+            supabase.table("applications").insert(application_data),
+            retry="idempotency_key" in application_data
+        )
+        
+        # Verify insert was successful
+        if result.data:
+            saved_successfully = True
+            application_id = result.data[0].get("id")
+            
+            # Portfolio stats are automatically updated via database trigger
+            _publish_applications_changed(user_id, result.data)
+            logger.debug(f"Application saved for user {user_id}; portfolio stats will be updated automatically by trigger")
+        else:
+            # Insert returned no data - could be RLS policy issue
+            logger.warning("Database insert returned no data. This may indicate RLS policy rejection.")
+    except CircuitOpenError as e:
+        raise _database_unavailable(e)
+    except Exception as e:
+        if "idempotency_key" in application_data and _is_unique_violation(e):
+            # Saved by an earlier request (or an earlier attempt) with the same key
+            application_id = _find_application_by_idempotency_key(supabase, user_id, idempotency_key)
+            saved_successfully = application_id is not None
+        else:
+            logger.error(
+                f"Failed to save application to database: {type(e).__name__}: {str(e)}.",
+                exc_info=True
+            )
+    
+    if not saved_successfully:
+        logger.error(f"Failed to save application for user {user_id}")
+        raise HTTPException(
+            status_code=500,
+            detail="Failed to save application. Please try again or score the application again."
+        )
+    
+    return ORJSONResponse({
+        "success": True,
+        "message": "Application saved successfully",
+        "application_id": application_id
+    })
+
+def _find_application_by_idempotency_key(supabase: Client, user_id: str, idempotency_key: str) -> str | None:
+    try:
+        result = _execute(
+            supabase.table("applications").select("id").eq("user_id", user_id).eq("idempotency_key", idempotency_key).limit(1)
+        )
+        return result.data[0]["id"] if result.data else None
+    except Exception as e:
+        logger.warning(f"Failed to look up application by Idempotency-Key: {str(e)}")
+        return None
+
+def _saved_application_row(req: SaveApplicationRequest, user_id: str) -> dict:
+    """Row for the applications table from a previously scored application."""
+    return {
+        "user_id": user_id,  # Always set user_id for saved applications
         "loan_amnt": req.loan_amnt,
         "annual_inc": float(req.annual_inc),
         "dti": float(req.dti),
@@ -958,79 +2196,177 @@ def save_application(request: Request, req: SaveApplicationRequest, authorizatio
         "risk_grade": req.risk_grade,
         "decision": req.decision
     }
+
+def _authenticated_client(authorization: str | None, action: str) -> tuple[str, Client]:
+    """Verify the bearer token and return (user_id, RLS-scoped Supabase client)."""
+    if not authorization or not authorization.startswith("Bearer "):
+        raise HTTPException(
+            status_code=401,
+            detail=f"Authentication required. Please sign in to {action}."
+        )
     
-    # Attempt to save with retry logic
-    max_retries = 2
-    saved_successfully = False
-    application_id = None
+    user_jwt = authorization.split(" ")[1]
+    user_id, is_valid_token = get_user_id_from_token(authorization)
+    if not is_valid_token or not user_id:
+        raise HTTPException(
+            status_code=401,
+            detail="Invalid or expired authentication token. Please sign in again."
+        )
     
-    for attempt in range(max_retries + 1):
-        try:
-            result = supabase.table("applications").insert(application_data).execute()
-            
-            # Verify insert was successful
-            if hasattr(result, 'data') and result.data and len(result.data) > 0:
-                saved_successfully = True
-                application_id = result.data[0].get("id")
-                
-                if attempt > 0:
-                    logger.info(f"Successfully saved application after {attempt} retries")
-                
-                # Portfolio stats are automatically updated via database trigger
-                logger.debug(f"Application saved for user {user_id}; portfolio stats will be updated automatically by trigger")
+    supabase = get_supabase_client(user_jwt)
+    if not supabase:
+        logger.error(f"Supabase client creation failed ({action})")
+        raise HTTPException(
+            status_code=503,
+            detail="Database service is temporarily unavailable. Please try again later."
+        )
+    return user_id, supabase
+
+@app.post("/applications/save/bulk", response_model=BulkSaveApplicationsResponse, dependencies=[Depends(require_key)])
+@limiter.limit(SCORE_RATE_LIMIT)
+def save_applications_bulk(
+    request: Request,
+    req: BulkSaveApplicationsRequest,
+    authorization: str | None = Header(default=None),
+    idempotency_key: str | None = Header(default=None)
+):
+    """
+    Save several previously scored applications with a single multi-row insert
+    (e.g. syncing a session's anonymously scored results after sign-in).
+    The insert trigger refreshes portfolio stats once for the whole batch.
+    Send an Idempotency-Key header for the batch; with IDEMPOTENCY_DB_COLUMN each
+    application's idempotency_key is also stored, and applications already saved
+    under their key are skipped rather than failing the batch.
+    """
+    return _run_idempotent(
+        request, "applications/save/bulk", req, authorization, idempotency_key,
+        lambda: _save_applications_bulk(req, authorization)
+    )
+
+def _saved_application_ids(supabase: Client, user_id: str, idempotency_keys: List[str]) -> Dict[str, str]:
+    """Map each of idempotency_keys already stored for the user to its application id."""
+    if not idempotency_keys:
+        return {}
+    result = _execute(
+        supabase.table("applications").select("id, idempotency_key").eq("user_id", user_id).in_("idempotency_key", idempotency_keys)
+    )
+    return {row["idempotency_key"]: row["id"] for row in result.data or []}
+
+def _save_applications_bulk(req: BulkSaveApplicationsRequest, authorization: str | None):
+    user_id, supabase = _authenticated_client(authorization, "save applications")
+    rows = [_saved_application_row(application, user_id) for application in req.applications]
+    keyed = IDEMPOTENCY_DB_COLUMN and any(application.idempotency_key for application in req.applications)
+    if keyed:
+        for row, application in zip(rows, req.applications):
+            if application.idempotency_key:
+                row["idempotency_key"] = application.idempotency_key
+    
+    # With per-row keys, rows saved by an earlier (possibly partly failed) sync are skipped
+    # instead of inserted again. Postgres rejects the whole statement on a unique
+    # violation, so a row saved concurrently in between triggers one more pass.
+    existing: Dict[str, str] = {}
+    inserted: List[Dict[str, Any]] = []
+    try:
+        for attempt in range(2):
+            if keyed:
+                existing = _saved_application_ids(supabase, user_id, [row["idempotency_key"] for row in rows if "idempotency_key" in row])
+            # A key repeated within the request is inserted once
+            pending, seen = [], set()
+            for row in rows:
+                key = row.get("idempotency_key")
+                if key is None or (key not in existing and key not in seen):
+                    pending.append(row)
+                    seen.add(key)
+            if not pending:
                 break
-            elif hasattr(result, 'data') and (not result.data or len(result.data) == 0):
-                # Insert returned no data - could be RLS policy issue
-                logger.warning(
-                    f"Database insert returned no data (attempt {attempt + 1}/{max_retries + 1}). "
-                    "This may indicate RLS policy rejection."
-                )
-                if attempt == max_retries:
-                    raise ValueError("Insert operation returned no data after retries")
-                continue
-            else:
-                # Unexpected result structure
-                logger.warning(
-                    f"Unexpected result structure from insert (attempt {attempt + 1}/{max_retries + 1}): "
-                    f"{type(result)}"
-                )
-                if attempt == max_retries:
-                    raise ValueError("Insert operation returned unexpected result structure")
-                continue
-                
-        except Exception as e:
-            error_type = type(e).__name__
-            error_msg = str(e)
-            
-            # Determine if this is a transient error (worth retrying)
-            is_transient = any(indicator in error_msg.lower() for indicator in [
-                'timeout', 'connection', 'network', 'temporary', '503', '502', '504'
-            ])
-            
-            if attempt < max_retries and is_transient:
-                logger.warning(
-                    f"Transient error during database insert (attempt {attempt + 1}/{max_retries + 1}): "
-                    f"{error_type}: {error_msg}. Retrying..."
+            try:
+                # Only retried when every row is keyed: a timed-out insert may have been applied
+                result = _execute(
+                    supabase.table("applications").insert(pending),
+                    retry=keyed and all("idempotency_key" in row for row in pending)
                 )
-                continue
-            else:
-                # Log the failure (critical or max retries reached)
-                logger.error(
-                    f"Failed to save application to database after {attempt + 1} attempts: "
-                    f"{error_type}: {error_msg}.",
-                    exc_info=True
+            except Exception as e:
+                if keyed and attempt == 0 and _is_unique_violation(e):
+                    continue
+                raise
+            if not result.data:
+                logger.warning("Bulk insert returned no data. This may indicate RLS policy rejection.")
+                raise HTTPException(
+                    status_code=500,
+                    detail="Failed to save applications. Please try again."
                 )
-                break
+            inserted = result.data
+            break
+    except HTTPException:
+        raise
+    except CircuitOpenError as e:
+        raise _database_unavailable(e)
+    except Exception as e:
+        logger.error(f"Failed to bulk save {len(rows)} applications: {type(e).__name__}: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail="Failed to save applications. Please try again."
+        )
     
-    if not saved_successfully:
-        logger.error(f"Failed to save application for user {user_id}")
+    if inserted:
+        _publish_applications_changed(user_id, inserted)
+    logger.debug(f"{len(inserted)} applications saved for user {user_id}, {len(existing)} already saved")
+    # Request order; PostgREST returns inserted rows in insert order
+    ids_by_key = dict(existing)
+    unkeyed_ids = []
+    for row in inserted:
+        if row.get("idempotency_key"):
+            ids_by_key[row["idempotency_key"]] = row.get("id")
+        else:
+            unkeyed_ids.append(row.get("id"))
+    unkeyed = iter(unkeyed_ids)
+    return ORJSONResponse({
+        "success": True,
+        "message": f"{len(inserted)} applications saved successfully"
+        + (f" ({len(existing)} already saved)" if existing else ""),
+        "application_ids": [
+            ids_by_key[row["idempotency_key"]] if row.get("idempotency_key") else next(unkeyed)
+            for row in rows
+        ],
+        "already_saved": len(existing)
+    })
+
+@app.post("/applications/delete/bulk", response_model=BulkDeleteApplicationsResponse, dependencies=[Depends(require_key)])
+@limiter.limit(PORTFOLIO_RATE_LIMIT)
+def delete_applications_bulk(request: Request, req: BulkDeleteApplicationsRequest, authorization: str | None = Header(default=None)):
+    """
+    Delete several applications by ID with a single `in` filtered delete and
+    one portfolio stats refresh. RLS restricts the delete to the caller's rows;
+    ids that were not deleted are reported in `not_found_ids`.
+    """
+    user_id, supabase = _authenticated_client(authorization, "delete applications")
+    ids = list(dict.fromkeys(str(i) for i in req.ids))
+    
+    try:
+        result = _execute(supabase.table("applications").delete().in_("id", ids))
+    except CircuitOpenError as e:
+        raise _database_unavailable(e)
+    except Exception as e:
+        logger.error(f"Error bulk deleting {len(ids)} applications: {type(e).__name__}: {str(e)}", exc_info=True)
         raise HTTPException(
             status_code=500,
-            detail="Failed to save application. Please try again or score the application again."
+            detail="An error occurred while deleting the applications. Please try again later."
         )
     
-    return SaveApplicationResponse(
-        success=True,
-        message="Application saved successfully",
-        application_id=application_id
-    )
+    deleted_ids = [row["id"] for row in result.data or []]
+    if deleted_ids:
+        logger.info(f"{len(deleted_ids)} applications deleted by user {user_id}")
+        _publish_applications_changed(user_id, result.data, deleted=True)
+        # One stats refresh for the whole batch (there is no DELETE trigger)
+        try:
+            _execute(supabase.rpc("upsert_portfolio_stats", {"p_user_id": user_id}))
+        except Exception as e:
+            logger.warning(f"Failed to update portfolio stats after bulk deletion: {str(e)}")
+    
+    deleted = set(deleted_ids)
+    return ORJSONResponse({
+        "success": True,
+        "message": f"{len(deleted_ids)} applications deleted",
+        "deleted_ids": deleted_ids,
+        "not_found_ids": [i for i in ids if i not in deleted]
+    })
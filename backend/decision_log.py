@@ -0,0 +1,245 @@
+# backend/decision_log.py
+"""
+Local append-only columnar log of scoring decisions.
+
+Every scored request (input features, PD, grade, decision, model version,
+latency, and whether/where it was persisted) is offered to a bounded queue.
+A background thread drains it in batches and appends each batch as one Arrow
+record batch to the current segment; segments rotate after segment_rows rows
+or segment_seconds, so files stay small enough to ship, compact or delete.
+submit() never blocks: when the queue is full the record is dropped and
+counted, so logging cannot add latency to /score.
+
+Two segment formats:
+  - "arrow": Arrow IPC stream (.arrows). Every batch is readable as soon as it
+    is written, and a crash loses at most the batch being written.
+  - "parquet": one row group per batch, written to <name>.parquet.inprogress
+    and renamed when the segment is closed (Parquet needs its footer to be read).
+
+read_decisions() loads a log directory back as one pyarrow Table.
+"""
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+    import pyarrow.parquet as pq
+except ImportError:  # optional dependency: the log is disabled without it
+    pa = None
+
+logger = logging.getLogger(__name__)
+
+FORMATS = {"arrow": ".arrows", "parquet": ".parquet"}
+IN_PROGRESS_SUFFIX = ".inprogress"
+
+# (column, arrow type factory); features first, in ScoreRequest order
+_COLUMNS = [
+    ("ts", lambda: pa.timestamp("us", tz="UTC")),
+    ("loan_amnt", lambda: pa.int64()),
+    ("annual_inc", lambda: pa.float64()),
+    ("dti", lambda: pa.float64()),
+    ("emp_length", lambda: pa.int64()),
+    ("grade", lambda: pa.string()),
+    ("term", lambda: pa.string()),
+    ("purpose", lambda: pa.string()),
+    ("home_ownership", lambda: pa.string()),
+    ("state", lambda: pa.string()),
+    ("revol_util", lambda: pa.float64()),
+    ("fico", lambda: pa.int64()),
+    ("pd", lambda: pa.float64()),
+    ("risk_grade", lambda: pa.string()),
+    ("decision", lambda: pa.string()),
+    ("model_version", lambda: pa.string()),
+    ("latency_ms", lambda: pa.float64()),
+    ("user_id", lambda: pa.string()),
+    ("application_id", lambda: pa.string()),  # null when the row was not saved to Supabase
+    ("persisted", lambda: pa.bool_()),
+]
+COLUMN_NAMES = [name for name, _ in _COLUMNS]
+
+def schema() -> "pa.Schema":
+    return pa.schema([(name, type_()) for name, type_ in _COLUMNS])
+
+class DecisionLog:
+    def __init__(
+        self,
+        directory: str,
+        fmt: str = "arrow",
+        queue_size: int = 10000,
+        batch_size: int = 512,
+        batch_wait_s: float = 1.0,
+        segment_rows: int = 100000,
+        segment_seconds: float = 3600,
+    ):
+        if pa is None:
+            raise RuntimeError("pyarrow is not installed")
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown decision log format: {fmt} (expected one of {', '.join(FORMATS)})")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.fmt = fmt
+        self.batch_size = batch_size
+        self.batch_wait_s = batch_wait_s
+        self.segment_rows = segment_rows
+        self.segment_seconds = segment_seconds
+        self.schema = schema()
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="decision-log", daemon=True)
+        # Current segment; only touched by the writer thread
+        self._writer = None
+        self._sink = None
+        self._segment_path: str | None = None
+        self._segment_rows = 0
+        self._segment_opened_at = 0.0
+        self._segment_seq = 0
+        self.stats = {"submitted": 0, "dropped": 0, "written": 0, "batches": 0, "segments": 0, "errors": 0}
+        self._stats_lock = threading.Lock()
+
+    def start(self) -> None:
+        self._thread.start()
+        logger.info(f"Decision log enabled: format={self.fmt}, directory={self.directory}")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Signal the worker to write what is queued, close the segment and exit."""
+        self._stop.set()
+        self._thread.join(timeout)
+
+    def submit(self, record: Dict[str, Any]) -> bool:
+        """Queue one decision (keys from COLUMN_NAMES; missing ones are null). Returns False if dropped."""
+        try:
+            self._queue.put_nowait(record)
+            self._count("submitted")
+            return True
+        except queue.Full:
+            self._count("dropped")
+            return False
+
+    def _count(self, key: str, n: int = 1) -> None:
+        with self._stats_lock:
+            self.stats[key] += n
+
+    def snapshot(self) -> dict:
+        with self._stats_lock:
+            stats = dict(self.stats)
+        return {
+            **stats,
+            "queue_depth": self._queue.qsize(),
+            "format": self.fmt,
+            "current_segment": os.path.basename(self._segment_path) if self._segment_path else None,
+        }
+
+    def _next_batch(self) -> list:
+        """Block for the first item, then collect up to batch_size within batch_wait_s."""
+        try:
+            batch = [self._queue.get(timeout=0.5)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.batch_wait_s
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while not (self._stop.is_set() and self._queue.empty()):
+            batch = self._next_batch()
+            if not batch:
+                if self._writer is not None and time.monotonic() - self._segment_opened_at >= self.segment_seconds:
+                    self._close_segment()
+                continue
+            try:
+                self._write_batch(batch)
+            except Exception as e:
+                self._count("errors")
+                logger.warning(f"Decision log batch failed: {type(e).__name__}: {str(e)}")
+                self._close_segment()
+        self._close_segment()
+
+    def _write_batch(self, batch: List[Dict[str, Any]]) -> None:
+        columns = [[record.get(name) for record in batch] for name in COLUMN_NAMES]
+        record_batch = pa.RecordBatch.from_arrays(
+            [pa.array(values, type=field.type) for values, field in zip(columns, self.schema)],
+            schema=self.schema,
+        )
+        if self._writer is None:
+            self._open_segment()
+        self._writer.write_batch(record_batch)
+        if self._sink is not None:
+            self._sink.flush()  # make the batch visible to readers of the open Arrow segment
+        self._segment_rows += len(batch)
+        self._count("written", len(batch))
+        self._count("batches")
+        if self._segment_rows >= self.segment_rows or time.monotonic() - self._segment_opened_at >= self.segment_seconds:
+            self._close_segment()
+
+    def _open_segment(self) -> None:
+        self._segment_seq += 1
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+        name = f"decisions-{stamp}-{os.getpid()}-{self._segment_seq:04d}{FORMATS[self.fmt]}"
+        if self.fmt == "parquet":
+            self._segment_path = os.path.join(self.directory, name + IN_PROGRESS_SUFFIX)
+            self._writer = pq.ParquetWriter(self._segment_path, self.schema)
+            self._sink = None
+        else:
+            self._segment_path = os.path.join(self.directory, name)
+            self._sink = pa.OSFile(self._segment_path, "wb")
+            self._writer = pa_ipc.new_stream(self._sink, self.schema)
+        self._segment_rows = 0
+        self._segment_opened_at = time.monotonic()
+        self._count("segments")
+
+    def _close_segment(self) -> None:
+        if self._writer is None:
+            return
+        try:
+            self._writer.close()
+            if self.fmt == "parquet":
+                os.replace(self._segment_path, self._segment_path[:-len(IN_PROGRESS_SUFFIX)])
+            else:
+                self._sink.close()
+        except Exception as e:
+            self._count("errors")
+            logger.warning(f"Failed to close decision log segment {self._segment_path}: {str(e)}")
+        finally:
+            self._writer = None
+            self._sink = None
+            self._segment_path = None
+
+def read_decisions(directory: str) -> "pa.Table":
+    """
+    Load every closed Parquet segment and every Arrow segment (including the
+    one being written, up to its last complete batch) as one Table.
+    """
+    if pa is None:
+        raise RuntimeError("pyarrow is not installed")
+    tables = []
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        if name.endswith(FORMATS["parquet"]):
+            tables.append(pq.read_table(path))
+        elif name.endswith(FORMATS["arrow"]):
+            batches = []
+            with pa.OSFile(path, "rb") as source:
+                try:
+                    reader = pa_ipc.open_stream(source)
+                    for record_batch in reader:
+                        batches.append(record_batch)
+                except (pa.ArrowInvalid, OSError):
+                    pass  # empty segment or truncated tail after a crash
+            if batches:
+                tables.append(pa.Table.from_batches(batches))
+    if not tables:
+        return schema().empty_table()
+    return pa.concat_tables(tables)
@@ -0,0 +1,169 @@
+# backend/drift.py
+"""
+Fixed-memory drift monitoring of scored traffic against the training data.
+
+A reference profile (bin edges + proportions for numeric features and PD,
+category frequencies for categorical features) is exported at training time.
+At serving time each scored row increments one counter per feature, so
+memory is constant and updates are O(1) per row. PSI and KS are computed
+from the counters on demand without touching stored data.
+
+Counters live in the worker process: with several workers each one reports
+only the traffic it scored, and all counts start from zero on restart.
+"""
+import json
+import threading
+import numpy as np
+import pandas as pd
+from typing import Dict, Any
+
+NUMERIC_FEATURES = ['loan_amnt', 'annual_inc', 'dti', 'emp_length', 'revol_util', 'fico']
+CATEGORICAL_FEATURES = ['grade', 'term', 'purpose', 'home_ownership', 'state']
+OTHER_CATEGORY = "__other__"
+PD_BINS = 20
+
+# Conventional PSI cut-offs
+PSI_MODERATE = 0.1
+PSI_SIGNIFICANT = 0.25
+
+# Default minimum sample: this many scored rows per bin of the finest histogram
+MIN_ROWS_PER_BIN = 5
+
+def _quantile_edges(values: np.ndarray, n_bins: int) -> list[float]:
+    """Interior bin edges at reference quantiles (duplicates removed)."""
+    qs = np.quantile(values, np.linspace(0, 1, n_bins + 1)[1:-1])
+    return [float(q) for q in np.unique(qs)]
+
+def _bin_counts(values: np.ndarray, edges: list[float]) -> np.ndarray:
+    return np.bincount(np.searchsorted(edges, values, side="right"), minlength=len(edges) + 1)
+
+def build_reference_profile(X: pd.DataFrame, pds: np.ndarray, n_bins: int = 10) -> Dict[str, Any]:
+    """
+    Build the reference profile from training features and model PDs.
+
+    Numeric features use n_bins quantile bins (open-ended outer bins); PD uses
+    PD_BINS equal-width bins on [0, 1]; categorical features store frequencies.
+    """
+    profile: Dict[str, Any] = {"n_rows": int(len(X)), "numeric": {}, "categorical": {}}
+    for feat in NUMERIC_FEATURES:
+        values = X[feat].to_numpy(dtype=float)
+        edges = _quantile_edges(values, n_bins)
+        counts = _bin_counts(values, edges)
+        profile["numeric"][feat] = {"edges": edges, "proportions": (counts / counts.sum()).tolist()}
+    for feat in CATEGORICAL_FEATURES:
+        freqs = X[feat].astype(str).str.strip().value_counts(normalize=True)
+        profile["categorical"][feat] = {str(k): float(v) for k, v in freqs.items()}
+
+    pd_edges = np.linspace(0, 1, PD_BINS + 1)[1:-1].tolist()
+    pd_counts = _bin_counts(np.asarray(pds, dtype=float), pd_edges)
+    profile["pd"] = {"edges": pd_edges, "proportions": (pd_counts / pd_counts.sum()).tolist()}
+    return profile
+
+def psi(expected: np.ndarray, actual: np.ndarray, eps: float = 1e-4) -> float:
+    """Population stability index between two proportion vectors."""
+    e = np.clip(expected, eps, None)
+    a = np.clip(actual, eps, None)
+    return float(np.sum((a - e) * np.log(a / e)))
+
+def ks(expected: np.ndarray, actual: np.ndarray) -> float:
+    """KS statistic on binned data: max distance between the two CDFs."""
+    return float(np.max(np.abs(np.cumsum(expected) - np.cumsum(actual))))
+
+def _status(psi_value: float) -> str:
+    if psi_value >= PSI_SIGNIFICANT:
+        return "significant"
+    if psi_value >= PSI_MODERATE:
+        return "moderate"
+    return "stable"
+
+class DriftMonitor:
+    """Constant-memory histograms of scored traffic, compared against a reference profile."""
+
+    def __init__(self, profile: Dict[str, Any], min_rows: int | None = None):
+        self.profile = profile
+        self._lock = threading.Lock()
+        self._numeric_edges = {f: np.asarray(p["edges"]) for f, p in profile["numeric"].items()}
+        self._pd_edges = np.asarray(profile["pd"]["edges"])
+        self._categories = {
+            f: {c: i for i, c in enumerate(freqs)} for f, freqs in profile["categorical"].items()
+        }
+        if min_rows is None:
+            # PSI over k bins is noise until each bin can expect a handful of rows
+            n_bins = max(
+                [len(self._pd_edges) + 1]
+                + [len(edges) + 1 for edges in self._numeric_edges.values()]
+                + [len(cats) + 1 for cats in self._categories.values()]
+            )
+            min_rows = MIN_ROWS_PER_BIN * n_bins
+        self.min_rows = int(min_rows)
+        self.reset()
+
+    @classmethod
+    def from_file(cls, path: str, min_rows: int | None = None) -> "DriftMonitor":
+        with open(path) as f:
+            return cls(json.load(f), min_rows=min_rows)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.n_rows = 0
+            self._numeric_counts = {
+                f: np.zeros(len(edges) + 1, dtype=np.int64) for f, edges in self._numeric_edges.items()
+            }
+            # One slot per reference category plus a shared slot for unseen ones
+            self._category_counts = {
+                f: np.zeros(len(cats) + 1, dtype=np.int64) for f, cats in self._categories.items()
+            }
+            self._pd_counts = np.zeros(len(self._pd_edges) + 1, dtype=np.int64)
+
+    def update(self, features: Dict[str, Any], pd_value: float) -> None:
+        """Add one scored row. O(1): one counter increment per feature."""
+        with self._lock:
+            self.n_rows += 1
+            for feat, edges in self._numeric_edges.items():
+                self._numeric_counts[feat][np.searchsorted(edges, float(features[feat]), side="right")] += 1
+            for feat, cats in self._categories.items():
+                self._category_counts[feat][cats.get(str(features[feat]).strip(), len(cats))] += 1
+            self._pd_counts[np.searchsorted(self._pd_edges, pd_value, side="right")] += 1
+
+    def report(self) -> Dict[str, Any]:
+        """
+        PSI (and KS for ordered features) per feature and for the PD distribution.
+        Below min_rows scored rows no scores are computed and status is "insufficient_data".
+        """
+        with self._lock:
+            n = self.n_rows
+            numeric_counts = {f: c.copy() for f, c in self._numeric_counts.items()}
+            category_counts = {f: c.copy() for f, c in self._category_counts.items()}
+            pd_counts = self._pd_counts.copy()
+
+        if n < self.min_rows:
+            return {"n_rows": n, "min_rows": self.min_rows, "status": "insufficient_data", "features": {}, "pd": None}
+
+        features: Dict[str, Any] = {}
+        for feat, counts in numeric_counts.items():
+            expected = np.asarray(self.profile["numeric"][feat]["proportions"])
+            actual = counts / n
+            value = psi(expected, actual)
+            features[feat] = {"psi": round(value, 4), "ks": round(ks(expected, actual), 4), "status": _status(value)}
+        for feat, counts in category_counts.items():
+            # Unseen categories are compared against an expected share of zero
+            expected = np.append(np.asarray(list(self.profile["categorical"][feat].values())), 0.0)
+            actual = counts / n
+            value = psi(expected, actual)
+            features[feat] = {
+                "psi": round(value, 4),
+                "ks": None,
+                "unseen_share": round(float(actual[-1]), 4),
+                "status": _status(value),
+            }
+
+        expected_pd = np.asarray(self.profile["pd"]["proportions"])
+        actual_pd = pd_counts / n
+        pd_psi = psi(expected_pd, actual_pd)
+        return {
+            "n_rows": n,
+            "min_rows": self.min_rows,
+            "status": "ok",
+            "features": features,
+            "pd": {"psi": round(pd_psi, 4), "ks": round(ks(expected_pd, actual_pd), 4), "status": _status(pd_psi)},
+        }
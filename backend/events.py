@@ -0,0 +1,93 @@
+# backend/events.py
+"""
+In-process per-user fan-out hub for live portfolio updates (server-sent events).
+
+Each subscriber gets a bounded queue on the event loop it subscribed from.
+Write endpoints run in worker threads and publish through
+loop.call_soon_threadsafe, so publishing never blocks a request. When a slow
+subscriber's buffer is full its backlog is replaced by a single "resync"
+event telling the client to refetch /portfolio instead of applying deltas.
+
+The hub lives in one process: with several uvicorn workers a subscriber only
+sees writes handled by its own worker.
+"""
+import asyncio
+import threading
+from typing import Any, Dict, List
+
+import orjson
+
+RESYNC = "resync"
+
+class Subscription:
+    def __init__(self, loop: asyncio.AbstractEventLoop, buffer_size: int):
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=buffer_size)
+
+    def offer(self, message: bytes) -> bool:
+        """Enqueue on the subscriber's loop; on overflow collapse the backlog into a resync."""
+        try:
+            self.queue.put_nowait(message)
+            return True
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(format_event(RESYNC, {}))
+            return False
+
+def format_event(event: str, data: Dict[str, Any]) -> bytes:
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+
+class EventHub:
+    def __init__(self, buffer_size: int = 100, max_subscribers_per_user: int = 5):
+        self.buffer_size = buffer_size
+        self.max_subscribers_per_user = max_subscribers_per_user
+        self._subscribers: Dict[str, List[Subscription]] = {}
+        self._lock = threading.Lock()
+        self.stats = {"published": 0, "delivered": 0, "overflows": 0}
+
+    def subscribe(self, user_id: str) -> Subscription | None:
+        """Register a subscriber for user_id (call from the event loop). None if the user has too many."""
+        subscription = Subscription(asyncio.get_running_loop(), self.buffer_size)
+        with self._lock:
+            subscribers = self._subscribers.setdefault(user_id, [])
+            if len(subscribers) >= self.max_subscribers_per_user:
+                return None
+            subscribers.append(subscription)
+        return subscription
+
+    def unsubscribe(self, user_id: str, subscription: Subscription) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(user_id, [])
+            if subscription in subscribers:
+                subscribers.remove(subscription)
+            if not subscribers:
+                self._subscribers.pop(user_id, None)
+
+    def publish(self, user_id: str, event: str, data: Dict[str, Any]) -> None:
+        """Fan an event out to user_id's subscribers. Safe to call from any thread."""
+        with self._lock:
+            subscribers = list(self._subscribers.get(user_id, ()))
+            self.stats["published"] += 1
+        if not subscribers:
+            return
+        message = format_event(event, data)
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(self._deliver, subscription, message)
+            except RuntimeError:
+                # Loop already closed (server shutting down)
+                continue
+
+    def _deliver(self, subscription: Subscription, message: bytes) -> None:
+        delivered = subscription.offer(message)
+        with self._lock:
+            self.stats["delivered" if delivered else "overflows"] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "users": len(self._subscribers),
+                "subscribers": sum(len(s) for s in self._subscribers.values()),
+                **self.stats,
+            }
@@ -0,0 +1,249 @@
+# backend/explain.py
+"""
+SHAP explanation helpers shared by the API and offline scripts.
+
+Raw per-column attributions are produced by one of several tiers, aggregated
+back from one-hot columns to the 11 original features, and formatted into
+the display structure stored with each application.
+"""
+import threading
+import numpy as np
+import xgboost as xgb
+from typing import Dict, Any, List
+
+NUMERIC_FEATURES = ['loan_amnt', 'annual_inc', 'dti', 'emp_length', 'revol_util', 'fico']
+CATEGORICAL_FEATURES = ['grade', 'term', 'purpose', 'home_ownership', 'state']
+ORIGINAL_FEATURES = NUMERIC_FEATURES + CATEGORICAL_FEATURES
+
+# Explanation tiers, most accurate first
+TIER_EXACT = "exact"      # exact TreeSHAP (shap.TreeExplainer)
+TIER_APPROX = "approx"    # Saabas path attribution (XGBoost approx_contribs)
+TIER_SKIPPED = "skipped"  # no explanation, latency budget exhausted
+EXPLANATION_TIERS = (TIER_EXACT, TIER_APPROX)
+
+def raw_contributions(model, shap_explainer, transformed: np.ndarray, tier: str) -> np.ndarray:
+    """
+    Compute per-column attributions (log-odds space) for preprocessed rows.
+
+    Args:
+        model: Fitted sklearn Pipeline with 'pre' and 'clf' steps
+        shap_explainer: shap.TreeExplainer for the classifier (used by the exact tier)
+        transformed: 2-D array of preprocessed features
+        tier: TIER_EXACT or TIER_APPROX
+
+    Returns:
+        Array of shape (n_rows, n_columns) without the bias term
+    """
+    if tier == TIER_EXACT:
+        values = shap_explainer.shap_values(transformed)
+        # For binary classification, get values for positive class (default=1)
+        if isinstance(values, list):
+            values = values[1]
+        return np.atleast_2d(np.asarray(values, dtype=np.float64))
+    if tier == TIER_APPROX:
+        booster = model.named_steps['clf'].get_booster()
+        contribs = booster.predict(
+            xgb.DMatrix(np.asarray(transformed, dtype=np.float32)),
+            pred_contribs=True,
+            approx_contribs=True,
+        )
+        # Last column is the bias (expected value); drop it to match TreeSHAP output
+        return np.asarray(contribs, dtype=np.float64)[:, :-1]
+    raise ValueError(f"Unknown explanation tier: {tier}")
+
+_aggregation_cache: Dict[int, np.ndarray] = {}
+
+def aggregation_matrix(preprocessor, n_columns: int) -> np.ndarray:
+    """
+    Matrix M of shape (n_columns, 11) such that values @ M sums one-hot
+    attributions back onto ORIGINAL_FEATURES. Cached per preprocessor.
+    """
+    key = id(preprocessor)
+    cached = _aggregation_cache.get(key)
+    if cached is not None and cached.shape[0] == n_columns:
+        return cached
+
+    matrix = np.zeros((n_columns, len(ORIGINAL_FEATURES)), dtype=np.float64)
+    for i in range(min(len(NUMERIC_FEATURES), n_columns)):
+        matrix[i, i] = 1.0
+
+    cat_start_idx = len(NUMERIC_FEATURES)
+    try:
+        cat_feature_names = list(
+            preprocessor.named_transformers_['cat'].get_feature_names_out(CATEGORICAL_FEATURES)
+        )
+    except Exception:
+        cat_feature_names = []
+
+    for idx, feat_name in enumerate(cat_feature_names):
+        global_idx = cat_start_idx + idx
+        if global_idx >= n_columns:
+            break
+        for j, cat_feat in enumerate(CATEGORICAL_FEATURES):
+            if feat_name.startswith(f"{cat_feat}_"):
+                matrix[global_idx, len(NUMERIC_FEATURES) + j] = 1.0
+                break
+
+    _aggregation_cache[key] = matrix
+    return matrix
+
+def aggregate_contributions(preprocessor, values: np.ndarray) -> np.ndarray:
+    """Aggregate (n_rows, n_columns) attributions to (n_rows, 11) original features."""
+    values = np.atleast_2d(values)
+    return values @ aggregation_matrix(preprocessor, values.shape[1])
+
+def build_explanation(shap_aggregated: Dict[str, float], pd_value: float) -> Dict[str, Any]:
+    """
+    Format aggregated SHAP values into the display structure
+    ({"top_features": [...], "summary": str}).
+    """
+    # Create feature contributions list
+    feature_contributions = [
+        {
+            "feature": feat.replace('_', ' ').title(),  # Format feature name
+            "shap_value": float(shap_val),
+            "impact": "positive" if shap_val > 0 else "negative",
+            "contribution_pct": abs(shap_val) / (abs(pd_value) + 1e-10) * 100 if pd_value > 0 else 0.0
+        }
+        for feat, shap_val in shap_aggregated.items()
+    ]
+
+    # Sort by absolute SHAP value, descending
+    feature_contributions.sort(key=lambda x: abs(x["shap_value"]), reverse=True)
+
+    # Return all features (we have 11 total, manageable to show all)
+    top_features = feature_contributions
+
+    # Normalize contribution percentages based on total absolute contribution
+    total_abs_contribution = sum(abs(f["shap_value"]) for f in top_features)
+    if total_abs_contribution > 0:
+        for feat in top_features:
+            feat["contribution_pct"] = (abs(feat["shap_value"]) / total_abs_contribution) * 100
+
+    return {
+        "top_features": top_features,
+        "summary": summarize(top_features)
+    }
+
+def summarize(top_features: List[Dict[str, Any]]) -> str:
+    """Human-readable summary built from the top 3 contributors."""
+    top_3 = top_features[:3]
+    increasing_factors = [f["feature"] for f in top_3 if f["impact"] == "positive"][:2]
+    decreasing_factors = [f["feature"] for f in top_3 if f["impact"] == "negative"][:2]
+
+    summary_parts = []
+    if increasing_factors:
+        summary_parts.append(f"High {' and '.join(increasing_factors)} increase risk")
+    if decreasing_factors:
+        summary_parts.append(f"Low {' and '.join(decreasing_factors)} decrease risk")
+
+    return ". ".join(summary_parts) if summary_parts else "Risk factors analyzed"
+
+class TierLatencyTracker:
+    """
+    Exponentially weighted moving average of explanation latency per tier,
+    used to pick the most accurate tier that fits the remaining budget.
+
+    A tier that keeps being passed over is let through once every
+    `probe_every` decisions so a transient latency spike cannot disable it
+    permanently.
+    """
+
+    def __init__(self, alpha: float = 0.2, probe_every: int = 50):
+        self.alpha = alpha
+        self.probe_every = probe_every
+        self._ewma_ms: Dict[str, float] = {}
+        self._passed_over: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def record(self, tier: str, elapsed_ms: float) -> None:
+        with self._lock:
+            prev = self._ewma_ms.get(tier)
+            self._ewma_ms[tier] = elapsed_ms if prev is None else (
+                self.alpha * elapsed_ms + (1 - self.alpha) * prev
+            )
+
+    def estimate(self, tier: str) -> float | None:
+        return self._ewma_ms.get(tier)
+
+    def choose(self, remaining_ms: float) -> str:
+        """Most accurate tier whose expected cost fits in remaining_ms, else TIER_SKIPPED."""
+        with self._lock:
+            for tier in EXPLANATION_TIERS:
+                expected = self._ewma_ms.get(tier)
+                if expected is None or expected <= remaining_ms:
+                    self._passed_over[tier] = 0
+                    return tier
+                self._passed_over[tier] = self._passed_over.get(tier, 0) + 1
+                if self._passed_over[tier] >= self.probe_every:
+                    self._passed_over[tier] = 0
+                    return tier
+            return TIER_SKIPPED
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return {tier: round(ms, 3) for tier, ms in self._ewma_ms.items()}
+
+# ---- Compact storage ----
+# An explanation is stored as the 11 aggregated SHAP values in ORIGINAL_FEATURES
+# order, packed as little-endian float32 (44 bytes) in a bytea column. PostgREST
+# exchanges bytea as a "\x"-prefixed hex string.
+COMPACT_DTYPE = np.dtype("<f4")
+_DISPLAY_TO_FEATURE = {feat.replace('_', ' ').title(): feat for feat in ORIGINAL_FEATURES}
+
+def shap_dict(vector) -> Dict[str, float]:
+    """Map an 11-value aggregated SHAP vector to {feature: value}."""
+    return dict(zip(ORIGINAL_FEATURES, (float(v) for v in vector)))
+
+def encode_compact(vector) -> str:
+    """Pack an aggregated SHAP vector for a bytea column."""
+    return "\\x" + np.asarray(vector, dtype=COMPACT_DTYPE).tobytes().hex()
+
+def decode_compact(value) -> np.ndarray | None:
+    """Unpack a bytea value (hex string from PostgREST, or raw bytes) into a float vector."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = bytes.fromhex(value[2:] if value.startswith("\\x") else value)
+    vector = np.frombuffer(value, dtype=COMPACT_DTYPE)
+    return vector if len(vector) == len(ORIGINAL_FEATURES) else None
+
+def vector_from_explanation(explanation: Dict[str, Any] | None) -> List[float] | None:
+    """Recover the aggregated SHAP vector from a legacy JSONB explanation."""
+    if not explanation or not explanation.get("top_features"):
+        return None
+    by_feature = {
+        _DISPLAY_TO_FEATURE.get(f.get("feature")): f.get("shap_value", 0.0)
+        for f in explanation["top_features"]
+    }
+    return [float(by_feature.get(feat, 0.0)) for feat in ORIGINAL_FEATURES]
+
+# ---- Portfolio feature importance ----
+# portfolio_feature_importance (see supabase-schema.sql) keeps, per user and
+# risk grade, the count of explained applications and running sums of their
+# aggregated SHAP values and |SHAP| values, maintained by insert/delete triggers.
+IMPORTANCE_COLUMNS = ["risk_grade", "explained", "shap_sum", "abs_shap_sum"]
+
+def summarize_importance(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Merge importance rows into per-feature mean SHAP (direction) and mean |SHAP|
+    (magnitude), with each feature's share of the total |SHAP|, most important first.
+    """
+    explained = sum(row["explained"] for row in rows)
+    shap_sum = np.zeros(len(ORIGINAL_FEATURES))
+    abs_sum = np.zeros(len(ORIGINAL_FEATURES))
+    for row in rows:
+        shap_sum += np.asarray(row["shap_sum"], dtype=float)
+        abs_sum += np.asarray(row["abs_shap_sum"], dtype=float)
+    total_abs = abs_sum.sum()
+    features = [
+        {
+            "feature": feat,
+            "mean_shap": float(shap_sum[i] / explained) if explained else 0.0,
+            "mean_abs_shap": float(abs_sum[i] / explained) if explained else 0.0,
+            "importance_pct": float(abs_sum[i] / total_abs * 100) if total_abs > 0 else 0.0,
+        }
+        for i, feat in enumerate(ORIGINAL_FEATURES)
+    ]
+    features.sort(key=lambda f: f["mean_abs_shap"], reverse=True)
+    return {"explained_applications": explained, "features": features}
@@ -0,0 +1,77 @@
+# backend/idempotency.py
+"""
+Bounded in-process store for Idempotency-Key handling.
+
+A key is scoped to the caller and endpoint. The first request with a key
+marks it in progress; once it succeeds the response body is kept (LRU,
+bounded by max_entries and ttl_s) and replayed for repeated requests with
+the same key and payload, without re-running the handler. A repeat with a
+different payload, or while the first is still running, is refused.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Tuple
+
+NEW = "new"
+REPLAY = "replay"
+IN_PROGRESS = "in_progress"
+MISMATCH = "mismatch"
+
+class IdempotencyStore:
+    def __init__(self, max_entries: int = 10000, ttl_s: float = 24 * 3600):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        # scope_key -> (fingerprint, stored_at, status_code | None, body | None); None status = in progress
+        self._entries: "OrderedDict[str, Tuple[str, float, int | None, bytes | None]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"replayed": 0, "conflicts": 0, "evicted": 0}
+
+    def begin(self, scope_key: str, fingerprint: str) -> Tuple[str, Tuple[int, bytes] | None]:
+        """
+        Claim a key. Returns (NEW, None) if the caller should run the request,
+        (REPLAY, (status_code, body)) for a completed duplicate, or
+        (IN_PROGRESS | MISMATCH, None) if it must be refused.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(scope_key)
+            if entry is not None and now - entry[1] > self.ttl_s:
+                del self._entries[scope_key]
+                entry = None
+            if entry is None:
+                self._entries[scope_key] = (fingerprint, now, None, None)
+                self._evict()
+                return NEW, None
+            self._entries.move_to_end(scope_key)
+            stored_fingerprint, _, status_code, body = entry
+            if stored_fingerprint != fingerprint:
+                self.stats["conflicts"] += 1
+                return MISMATCH, None
+            if status_code is None:
+                self.stats["conflicts"] += 1
+                return IN_PROGRESS, None
+            self.stats["replayed"] += 1
+            return REPLAY, (status_code, body)
+
+    def complete(self, scope_key: str, fingerprint: str, status_code: int, body: bytes) -> None:
+        with self._lock:
+            self._entries[scope_key] = (fingerprint, time.monotonic(), status_code, body)
+            self._entries.move_to_end(scope_key)
+            self._evict()
+
+    def abandon(self, scope_key: str) -> None:
+        """Release a key whose request failed, so the client can retry it."""
+        with self._lock:
+            entry = self._entries.get(scope_key)
+            if entry is not None and entry[2] is None:
+                del self._entries[scope_key]
+
+    def _evict(self) -> None:
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evicted"] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"entries": len(self._entries), **self.stats}
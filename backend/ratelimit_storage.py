@@ -0,0 +1,169 @@
+# backend/ratelimit_storage.py
+"""
+Rate-limit storage shared by all worker processes on a host.
+
+A `limits` storage backend (registered as the "mmap" scheme, so slowapi can
+use it via storage_uri="mmap:///dev/shm/...") that keeps fixed-window
+counters in a memory-mapped file. The file is an open-addressing hash table
+of fixed-size slots (key hash, count, window expiry) split into regions;
+each region has its own lock (a thread lock plus an fcntl byte-range lock
+for other processes), so contention is limited to keys hashing to the same
+region. Lookups and updates use struct.unpack_from / pack_into directly on
+the mapping and allocate almost nothing per request.
+"""
+import fcntl
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import time
+from urllib.parse import urlparse
+
+from limits.storage import Storage
+
+_HEADER = struct.Struct("<4sII")  # magic, n_slots, n_regions
+_SLOT = struct.Struct("<Qqd")     # key hash (0 = never used), count, window expiry (epoch s)
+_MAGIC = b"RLM1"
+_MAX_PROBE = 32
+
+class MmapStorage(Storage):
+    """Fixed-window counters in a memory-mapped hash table shared across processes."""
+
+    STORAGE_SCHEME = ["mmap"]
+
+    def __init__(self, uri: str | None = None, wrap_exceptions: bool = False, slots: int = 65536, regions: int = 256, **options):
+        parsed = urlparse(uri or "mmap:///dev/shm/ratelimit")
+        self.path = parsed.path
+        self.n_regions = int(regions)
+        # Whole regions only, so a key's probe sequence never leaves its region
+        self.region_slots = max(_MAX_PROBE, int(slots) // self.n_regions)
+        self.n_slots = self.region_slots * self.n_regions
+        size = _HEADER.size + self.n_slots * _SLOT.size
+
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(self._fd).st_size < size:
+            os.ftruncate(self._fd, size)
+        self._map = mmap.mmap(self._fd, size)
+        self._locks = [threading.Lock() for _ in range(self.n_regions)]
+        self._init_header()
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+
+    def _init_header(self) -> None:
+        fcntl.lockf(self._fd, fcntl.LOCK_EX, _HEADER.size, 0)
+        try:
+            magic, n_slots, n_regions = _HEADER.unpack_from(self._map, 0)
+            if magic == b"\0\0\0\0":
+                _HEADER.pack_into(self._map, 0, _MAGIC, self.n_slots, self.n_regions)
+            elif (magic, n_slots, n_regions) != (_MAGIC, self.n_slots, self.n_regions):
+                raise ValueError(
+                    f"Rate limit file {self.path} has a different layout "
+                    f"({n_slots} slots / {n_regions} regions); remove it or use another path"
+                )
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, _HEADER.size, 0)
+
+    @property
+    def base_exceptions(self) -> type[Exception] | tuple[type[Exception], ...]:
+        return OSError
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little") or 1
+
+    def _locked(self, key_hash: int):
+        return _RegionLock(self, (key_hash % self.n_slots) // self.region_slots)
+
+    def _find(self, key_hash: int, now: float, for_write: bool) -> int | None:
+        """
+        Offset of the key's live slot; with for_write, else the first reusable
+        (never used or expired) slot in its probe sequence. Caller holds the region lock.
+        """
+        home = key_hash % self.n_slots
+        region_start = home - home % self.region_slots
+        reusable = None
+        for i in range(_MAX_PROBE):
+            index = region_start + (home - region_start + i) % self.region_slots
+            offset = _HEADER.size + index * _SLOT.size
+            slot_hash, _, expiry = _SLOT.unpack_from(self._map, offset)
+            if slot_hash == key_hash and expiry > now:
+                return offset
+            if reusable is None and (slot_hash == 0 or expiry <= now):
+                reusable = offset
+            if slot_hash == 0:
+                break  # end of the probe chain
+        return reusable if for_write else None
+
+    def incr(self, key: str, expiry: float, amount: int = 1) -> int:
+        key_hash = self._hash(key)
+        now = time.time()
+        with self._locked(key_hash):
+            offset = self._find(key_hash, now, for_write=True)
+            if offset is None:
+                # Region saturated with live keys: fail open rather than block the request
+                return 0
+            slot_hash, count, window_end = _SLOT.unpack_from(self._map, offset)
+            if slot_hash == key_hash and window_end > now:
+                count += amount
+            else:
+                count, window_end = amount, now + expiry
+            _SLOT.pack_into(self._map, offset, key_hash, count, window_end)
+            return count
+
+    def get(self, key: str) -> int:
+        key_hash = self._hash(key)
+        with self._locked(key_hash):
+            offset = self._find(key_hash, time.time(), for_write=False)
+            return 0 if offset is None else _SLOT.unpack_from(self._map, offset)[1]
+
+    def get_expiry(self, key: str) -> float:
+        key_hash = self._hash(key)
+        now = time.time()
+        with self._locked(key_hash):
+            offset = self._find(key_hash, now, for_write=False)
+            return now if offset is None else _SLOT.unpack_from(self._map, offset)[2]
+
+    def check(self) -> bool:
+        return not self._map.closed
+
+    def clear(self, key: str) -> None:
+        key_hash = self._hash(key)
+        with self._locked(key_hash):
+            offset = self._find(key_hash, time.time(), for_write=False)
+            if offset is not None:
+                # Keep the hash so probe chains stay intact; an expired slot is reusable
+                _SLOT.pack_into(self._map, offset, key_hash, 0, 0.0)
+
+    def reset(self) -> int | None:
+        for region in range(self.n_regions):
+            with _RegionLock(self, region):
+                start = _HEADER.size + region * self.region_slots * _SLOT.size
+                self._map[start:start + self.region_slots * _SLOT.size] = bytes(self.region_slots * _SLOT.size)
+        return None
+
+class _RegionLock:
+    """Thread lock + fcntl byte-range lock over one region of the table."""
+    __slots__ = ("storage", "region")
+
+    def __init__(self, storage: MmapStorage, region: int):
+        self.storage = storage
+        self.region = region
+
+    def _range(self) -> tuple[int, int]:
+        length = self.storage.region_slots * _SLOT.size
+        return length, _HEADER.size + self.region * length
+
+    def __enter__(self):
+        # fcntl locks are per process, so threads of this worker serialize on the thread lock first
+        self.storage._locks[self.region].acquire()
+        try:
+            fcntl.lockf(self.storage._fd, fcntl.LOCK_EX, *self._range())
+        except BaseException:
+            self.storage._locks[self.region].release()
+            raise
+
+    def __exit__(self, *exc):
+        try:
+            fcntl.lockf(self.storage._fd, fcntl.LOCK_UN, *self._range())
+        finally:
+            self.storage._locks[self.region].release()
@@ -0,0 +1,202 @@
+# backend/resilience.py
+"""
+Retry / circuit-breaker layer shared by all Supabase calls.
+
+Each call runs with jittered exponential backoff on transient errors, inside
+an overall deadline that bounds the time spent across retries. A circuit
+breaker tracks the outcome of recent calls; once the failure rate over the
+window passes a threshold it opens and calls fail fast with CircuitOpenError
+until a cool-down has elapsed, after which a single probe call is let
+through (half-open) to decide whether to close again.
+"""
+import json
+import logging
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Dict
+
+logger = logging.getLogger(__name__)
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+# Substrings of error messages that indicate a transient (retryable) failure
+TRANSIENT_INDICATORS = ('timeout', 'timed out', 'connection', 'network', 'temporary', '503', '502', '504')
+
+def is_transient(exc: Exception) -> bool:
+    """True if the error looks like a connectivity / availability problem rather than a rejected query."""
+    message = f"{type(exc).__name__} {exc}".lower()
+    return any(indicator in message for indicator in TRANSIENT_INDICATORS)
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the database while the circuit is open."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Circuit open, retry after {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+class DeadlineExceededError(Exception):
+    """Raised when the call deadline expires before a retry could be attempted."""
+
+class CircuitBreaker:
+    """
+    Failure-rate circuit breaker over the last `window` calls.
+
+    Only transient failures count against the database; a query rejected by
+    RLS or a constraint is a successful round-trip as far as health goes.
+    """
+
+    def __init__(self, failure_rate: float = 0.5, window: int = 20, min_calls: int = 10, open_seconds: float = 30.0):
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.state = STATE_CLOSED
+        self._outcomes: deque = deque(maxlen=window)  # True = failure
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+        self.stats = {"opened": 0, "short_circuited": 0}
+
+    def allow(self) -> float | None:
+        """None if a call may proceed, otherwise the seconds until the next probe."""
+        with self._lock:
+            if self.state == STATE_CLOSED:
+                return None
+            remaining = self._opened_at + self.open_seconds - time.monotonic()
+            if self.state == STATE_OPEN and remaining <= 0:
+                self.state = STATE_HALF_OPEN
+            if self.state == STATE_HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return None
+            self.stats["short_circuited"] += 1
+            return max(remaining, 1.0)
+
+    def record(self, failed: bool) -> None:
+        with self._lock:
+            if self.state == STATE_HALF_OPEN:
+                self._probe_in_flight = False
+                if failed:
+                    self._open()
+                else:
+                    self.state = STATE_CLOSED
+                    self._outcomes.clear()
+                return
+            self._outcomes.append(failed)
+            if (
+                self.state == STATE_CLOSED
+                and len(self._outcomes) >= self.min_calls
+                and sum(self._outcomes) / len(self._outcomes) >= self.failure_rate
+            ):
+                self._open()
+
+    def _open(self) -> None:
+        self.state = STATE_OPEN
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        self.stats["opened"] += 1
+        logger.warning(f"Supabase circuit opened; failing fast for {self.open_seconds:.0f}s")
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            outcomes = list(self._outcomes)
+            return {
+                "state": self.state,
+                "window_failure_rate": round(sum(outcomes) / len(outcomes), 4) if outcomes else 0.0,
+                **self.stats,
+            }
+
+class ResilientExecutor:
+    """Executes PostgREST query builders with retries, a deadline and a circuit breaker."""
+
+    def __init__(
+        self,
+        breaker: CircuitBreaker,
+        max_retries: int = 2,
+        base_delay_s: float = 0.1,
+        max_delay_s: float = 2.0,
+        deadline_s: float = 10.0,
+    ):
+        self.breaker = breaker
+        self.max_retries = max_retries
+        self.base_delay_s = base_delay_s
+        self.max_delay_s = max_delay_s
+        self.deadline_s = deadline_s
+        self.stats = {"calls": 0, "failures": 0, "retries": 0, "deadline_exceeded": 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, key: str) -> None:
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for the given retry attempt (0-based)."""
+        return random.uniform(0, min(self.max_delay_s, self.base_delay_s * (2 ** attempt)))
+
+    def execute(self, query, retry: bool = True):
+        """
+        Run query.execute(). Transient errors are retried (if `retry`) with
+        backoff while the deadline allows; other errors are raised at once.
+
+        Raises:
+            CircuitOpenError: the circuit is open (no call is made)
+            DeadlineExceededError: the next retry would not start before the deadline
+        """
+        deadline = time.monotonic() + self.deadline_s
+        attempts = self.max_retries + 1 if retry else 1
+        for attempt in range(attempts):
+            retry_after = self.breaker.allow()
+            if retry_after is not None:
+                raise CircuitOpenError(retry_after)
+            self._count("calls")
+            try:
+                result = query.execute()
+            except Exception as e:
+                transient = is_transient(e)
+                self.breaker.record(failed=transient)
+                self._count("failures")
+                if not transient or attempt == attempts - 1:
+                    raise
+                delay = self.backoff(attempt)
+                if time.monotonic() + delay >= deadline:
+                    self._count("deadline_exceeded")
+                    raise DeadlineExceededError(f"Deadline of {self.deadline_s}s exceeded: {str(e)}") from e
+                logger.warning(
+                    f"Transient Supabase error (attempt {attempt + 1}/{attempts}): "
+                    f"{type(e).__name__}: {str(e)}. Retrying in {delay * 1000:.0f}ms"
+                )
+                self._count("retries")
+                time.sleep(delay)
+                continue
+            self.breaker.record(failed=False)
+            return result
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self.stats)
+        return {**stats, "breaker": self.breaker.snapshot()}
+
+class SpillLog:
+    """
+    Append-only JSONL file for rows that could not be written while the
+    database was unavailable, so they can be replayed by an operator.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.spilled = 0
+        self._lock = threading.Lock()
+
+    def append(self, table: str, row: Dict[str, Any]) -> bool:
+        line = json.dumps({"ts": time.time(), "table": table, "row": row}, default=str)
+        try:
+            with self._lock:
+                with open(self.path, "a") as f:
+                    f.write(line + "\n")
+                self.spilled += 1
+            return True
+        except OSError as e:
+            logger.error(f"Failed to spill {table} row to {self.path}: {str(e)}")
+            return False
@@ -0,0 +1,95 @@
+# backend/rollups.py
+"""
+Time-bucketed portfolio rollups.
+
+The portfolio_rollups table (see supabase-schema.sql) keeps, per user, one row
+per hour, day and month bucket with the application count, PD sum, approvals
+and a grade histogram, maintained incrementally by insert/delete triggers.
+A date range is answered by covering it with the coarsest whole buckets that
+fit (months, then days, then hours at the edges) and merging them, so the
+cost depends on the number of buckets rather than the number of applications.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Tuple
+
+GRANULARITIES = ("hour", "day", "month")  # finest first
+GRADES = "ABCDEFG"
+GRADE_COLUMNS = [f"grade_{g.lower()}" for g in GRADES]
+ROLLUP_COLUMNS = ["bucket_start", "applications", "pd_sum", "approvals", *GRADE_COLUMNS]
+
+def to_utc(ts: datetime) -> datetime:
+    """Naive datetimes are taken as UTC."""
+    return ts.replace(tzinfo=timezone.utc) if ts.tzinfo is None else ts.astimezone(timezone.utc)
+
+def truncate(ts: datetime, granularity: str) -> datetime:
+    """Start of the bucket containing ts."""
+    ts = ts.replace(minute=0, second=0, microsecond=0)
+    if granularity == "hour":
+        return ts
+    ts = ts.replace(hour=0)
+    if granularity == "day":
+        return ts
+    if granularity == "month":
+        return ts.replace(day=1)
+    raise ValueError(f"Unknown granularity: {granularity}")
+
+def next_bucket(ts: datetime, granularity: str) -> datetime:
+    """Start of the bucket after the one starting at ts."""
+    if granularity == "hour":
+        return ts + timedelta(hours=1)
+    if granularity == "day":
+        return ts + timedelta(days=1)
+    if granularity == "month":
+        return ts.replace(year=ts.year + ts.month // 12, month=ts.month % 12 + 1)
+    raise ValueError(f"Unknown granularity: {granularity}")
+
+def _ceil(ts: datetime, granularity: str) -> datetime:
+    floor = truncate(ts, granularity)
+    return floor if floor == ts else next_bucket(floor, granularity)
+
+def bucket_count(start: datetime, end: datetime, granularity: str) -> int:
+    """Number of granularity buckets overlapping [start, end)."""
+    if granularity == "hour":
+        return max(0, int((_ceil(end, "hour") - truncate(start, "hour")).total_seconds() // 3600))
+    if granularity == "day":
+        return max(0, (_ceil(end, "day") - truncate(start, "day")).days)
+    first, last = truncate(start, "month"), _ceil(end, "month")
+    return max(0, (last.year - first.year) * 12 + last.month - first.month)
+
+def cover(start: datetime, end: datetime, levels: Tuple[str, ...] = ("month", "day", "hour")) -> List[Tuple[str, datetime, datetime]]:
+    """
+    Split the hour-aligned range [start, end) into segments of whole buckets,
+    coarsest first: at most one run of months, up to two runs of days and up
+    to two runs of hours. Returns (granularity, segment_start, segment_end).
+    """
+    if start >= end:
+        return []
+    granularity, finer = levels[0], levels[1:]
+    if not finer:
+        return [(granularity, start, end)]
+    inner_start, inner_end = _ceil(start, granularity), truncate(end, granularity)
+    if inner_start >= inner_end:
+        return cover(start, end, finer)
+    return [
+        *cover(start, inner_start, finer),
+        (granularity, inner_start, inner_end),
+        *cover(inner_end, end, finer),
+    ]
+
+def summarize(rows: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Merge rollup rows into count / avg_pd / approval_rate / grade_distribution."""
+    applications = approvals = 0
+    pd_sum = 0.0
+    grades = dict.fromkeys(GRADES, 0)
+    for row in rows:
+        applications += row["applications"]
+        pd_sum += row["pd_sum"]
+        approvals += row["approvals"]
+        for grade, column in zip(GRADES, GRADE_COLUMNS):
+            grades[grade] += row[column]
+    return {
+        "applications": applications,
+        "avg_pd": round(pd_sum / applications, 4) if applications else 0.0,
+        "approval_rate": round(approvals / applications, 4) if applications else 0.0,
+        "grade_distribution": grades,
+    }
@@ -1,5 +1,6 @@
-from pydantic import BaseModel, confloat, conint, field_validator
-from typing import Literal
+from pydantic import BaseModel, Field, confloat, conint, field_validator
+from typing import Any, Literal
+from uuid import UUID
 
 class ScoreRequest(BaseModel):
     loan_amnt: conint(gt=0)
@@ -54,6 +55,7 @@ class ScoreResponse(BaseModel):
     decision: str
     top_features: list[str] | None = None  # Deprecated - use explanation instead
     explanation: Explanation | None = None
+    explanation_tier: Literal["exact", "approx", "skipped"] | None = None  # None = explanation unavailable
 
 class SaveApplicationRequest(BaseModel):
     """Request model for saving a previously scored application"""
@@ -102,3 +104,104 @@ class SaveApplicationResponse(BaseModel):
     success: bool
     message: str
     application_id: str | None = None
+
+class BulkSaveApplicationItem(SaveApplicationRequest):
+    """One application in a bulk save, with its own key (the Idempotency-Key a single save would send)"""
+    idempotency_key: str | None = Field(default=None, min_length=1, max_length=255)
+
+class BulkSaveApplicationsRequest(BaseModel):
+    """Several previously scored applications, saved with one insert"""
+    applications: list[BulkSaveApplicationItem] = Field(min_length=1, max_length=500)
+
+class BulkSaveApplicationsResponse(BaseModel):
+    success: bool
+    message: str
+    # Ids of all requested applications, including ones saved by an earlier request
+    application_ids: list[str]
+    # How many of them were already saved (matched by idempotency_key)
+    already_saved: int = 0
+
+class BulkDeleteApplicationsRequest(BaseModel):
+    ids: list[UUID] = Field(min_length=1, max_length=500)
+
+class BulkDeleteApplicationsResponse(BaseModel):
+    success: bool
+    message: str
+    deleted_ids: list[str]
+    # Requested ids that did not exist or belong to another user
+    not_found_ids: list[str]
+
+class BulkGetApplicationsRequest(BaseModel):
+    ids: list[UUID] = Field(min_length=1, max_length=100)
+
+class BulkGetApplicationsResponse(BaseModel):
+    # Found applications keyed by id
+    applications: dict[str, dict[str, Any]]
+    # Requested ids that do not exist or belong to another user
+    missing_ids: list[str]
+
+class FeatureSweep(BaseModel):
+    """A grid of values to try for one input feature"""
+    feature: Literal[
+        "loan_amnt", "annual_inc", "dti", "emp_length", "revol_util", "fico",
+        "grade", "term", "purpose", "home_ownership", "state"
+    ]
+    values: list[float | str] = Field(min_length=1, max_length=100)
+
+class SensitivityRequest(BaseModel):
+    """What-if request: a base application plus one or two feature sweeps"""
+    base: ScoreRequest
+    sweeps: list[FeatureSweep] = Field(min_length=1, max_length=2)
+    # Grid indices to explain, e.g. [[0, 3], [2, 1]]; one index per sweep
+    explain_points: list[list[int]] | None = Field(default=None, max_length=20)
+    explain_tier: Literal["exact", "approx"] = "exact"
+    
+    @field_validator("sweeps")
+    @classmethod
+    def validate_distinct_features(cls, v: list[FeatureSweep]) -> list[FeatureSweep]:
+        """Each feature may only be swept once"""
+        if len({s.feature for s in v}) != len(v):
+            raise ValueError("Each feature can only appear in one sweep")
+        return v
+
+class GridPointExplanation(BaseModel):
+    index: list[int]
+    explanation: Explanation | None = None
+
+class SensitivityResponse(BaseModel):
+    features: list[str]
+    values: list[list[float | str]]
+    # Surfaces are nested lists shaped like the grid (1-D for one sweep, 2-D for two)
+    pd: list
+    risk_grade: list
+    decision: list
+    explanations: list[GridPointExplanation] | None = None
+    explanation_tier: Literal["exact", "approx"] | None = None
+
+class CounterfactualRequest(BaseModel):
+    """Search for minimal changes to actionable features that bring PD under the threshold"""
+    application: ScoreRequest
+    max_results: conint(ge=1, le=20) = 5
+    max_evaluations: conint(ge=1) = 5000  # hard budget on candidates scored (capped server-side)
+    steps: conint(ge=2, le=50) = 20  # grid levels per numeric feature
+
+class FeatureChange(BaseModel):
+    original: int | float | str
+    proposed: int | float | str
+
+class Counterfactual(BaseModel):
+    changes: dict[str, FeatureChange]
+    pd: float
+    risk_grade: str
+    distance: float  # normalized size of the change (lower = closer to the original application)
+
+class CounterfactualResponse(BaseModel):
+    pd: float
+    risk_grade: str
+    decision: str
+    threshold: float
+    counterfactuals: list[Counterfactual]
+    candidates_evaluated: int
+    candidates_total: int
+    budget_exhausted: bool
+    elapsed_ms: float
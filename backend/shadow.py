@@ -0,0 +1,135 @@
+# backend/shadow.py
+"""
+Champion/challenger shadow scoring.
+
+Every scored request is offered to a bounded in-memory queue. A background
+thread drains it in batches, scores the batch with the challenger model and
+appends one JSON line per request (champion vs challenger PD and decision)
+to a local log file. submit() never blocks: when the queue is full the item
+is dropped and counted, so the challenger cannot add latency to /score.
+"""
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+import joblib
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+class ShadowScorer:
+    def __init__(
+        self,
+        challenger_path: str,
+        log_path: str,
+        threshold: float,
+        feature_order: list[str] | None,
+        champion_version: str,
+        queue_size: int = 1000,
+        batch_size: int = 64,
+        batch_wait_s: float = 0.05,
+    ):
+        self.challenger = joblib.load(challenger_path)
+        self.challenger_version = os.path.basename(challenger_path)
+        self.champion_version = champion_version
+        self.log_path = log_path
+        self.threshold = threshold
+        self.feature_order = feature_order
+        self.batch_size = batch_size
+        self.batch_wait_s = batch_wait_s
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="shadow-scorer", daemon=True)
+        self.stats = {"submitted": 0, "dropped": 0, "scored": 0, "batches": 0, "errors": 0}
+        self._stats_lock = threading.Lock()
+
+    def start(self) -> None:
+        self._thread.start()
+        logger.info(f"Shadow scoring enabled: challenger={self.challenger_version}, log={self.log_path}")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Signal the worker to drain what is queued and exit."""
+        self._stop.set()
+        self._thread.join(timeout)
+
+    def submit(self, features: dict, champion_pd: float, champion_decision: str) -> bool:
+        """Queue a scored request for the challenger. Returns False if it was dropped."""
+        try:
+            self._queue.put_nowait((datetime.now(timezone.utc).isoformat(), features, champion_pd, champion_decision))
+            self._count("submitted")
+            return True
+        except queue.Full:
+            self._count("dropped")
+            return False
+
+    def _count(self, key: str, n: int = 1) -> None:
+        with self._stats_lock:
+            self.stats[key] += n
+
+    def snapshot(self) -> dict:
+        with self._stats_lock:
+            stats = dict(self.stats)
+        return {
+            **stats,
+            "queue_depth": self._queue.qsize(),
+            "champion_version": self.champion_version,
+            "challenger_version": self.challenger_version,
+        }
+
+    def _next_batch(self) -> list:
+        """Block for the first item, then collect up to batch_size within batch_wait_s."""
+        try:
+            batch = [self._queue.get(timeout=0.5)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.batch_wait_s
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while not (self._stop.is_set() and self._queue.empty()):
+            batch = self._next_batch()
+            if not batch:
+                continue
+            try:
+                self._score_batch(batch)
+            except Exception as e:
+                self._count("errors")
+                logger.warning(f"Shadow scoring batch failed: {type(e).__name__}: {str(e)}")
+
+    def _score_batch(self, batch: list) -> None:
+        df = pd.DataFrame([features for _, features, _, _ in batch])
+        if self.feature_order:
+            df = df[self.feature_order]
+        challenger_pds = self.challenger.predict_proba(df)[:, 1]
+
+        lines = []
+        for (ts, _, champion_pd, champion_decision), challenger_pd in zip(batch, challenger_pds):
+            challenger_pd = float(challenger_pd)
+            challenger_decision = "approve" if challenger_pd < self.threshold else "review"
+            lines.append(json.dumps({
+                "ts": ts,
+                "champion_version": self.champion_version,
+                "challenger_version": self.challenger_version,
+                "champion_pd": champion_pd,
+                "challenger_pd": challenger_pd,
+                "champion_decision": champion_decision,
+                "challenger_decision": challenger_decision,
+                "agree": champion_decision == challenger_decision,
+            }))
+        # Append-only: one write per batch
+        with open(self.log_path, "a") as f:
+            f.write("\n".join(lines) + "\n")
+
+        self._count("scored", len(batch))
+        self._count("batches")
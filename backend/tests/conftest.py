@@ -0,0 +1,108 @@
+# backend/tests/conftest.py
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Backend modules import each other as top-level modules (uvicorn runs from backend/)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from explain import NUMERIC_FEATURES, CATEGORICAL_FEATURES, ORIGINAL_FEATURES  # noqa: E402
+
+CATEGORIES = {
+    'grade': ['A', 'B', 'C', 'D'],
+    'term': [' 36 months', ' 60 months'],
+    'purpose': ['debt_consolidation', 'credit_card', 'home_improvement'],
+    'home_ownership': ['RENT', 'MORTGAGE', 'OWN'],
+    'state': ['CA', 'NY', 'TX', 'FL'],
+}
+
+def make_applicants(n: int, seed: int = 0) -> pd.DataFrame:
+    """Synthetic applicants with the production feature columns."""
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame({
+        'loan_amnt': rng.uniform(1000, 40000, n),
+        'annual_inc': rng.uniform(20000, 250000, n),
+        'dti': rng.uniform(0, 40, n),
+        'emp_length': rng.integers(0, 11, n).astype(float),
+        'revol_util': rng.uniform(0, 100, n),
+        'fico': rng.uniform(620, 850, n),
+    })
+    for feat, values in CATEGORIES.items():
+        frame[feat] = rng.choice(values, n)
+    return frame[ORIGINAL_FEATURES]
+
+@pytest.fixture(scope="session")
+def applicants() -> pd.DataFrame:
+    return make_applicants(400)
+
+@pytest.fixture(scope="session")
+def pipeline(applicants):
+    """Small pipeline built like notebooks/train_credit_model.py."""
+    from sklearn.compose import ColumnTransformer
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import OneHotEncoder
+    from xgboost import XGBClassifier
+
+    rng = np.random.default_rng(1)
+    logit = (
+        0.04 * applicants['dti'] - 0.02 * (applicants['fico'] - 700)
+        + (applicants['grade'] == 'D') * 1.5 - 2.0
+    )
+    y = (rng.uniform(size=len(applicants)) < 1 / (1 + np.exp(-logit))).astype(int)
+
+    pre = ColumnTransformer([
+        ("num", "passthrough", NUMERIC_FEATURES),
+        ("cat", OneHotEncoder(handle_unknown="ignore", sparse_output=False), CATEGORICAL_FEATURES),
+    ])
+    clf = XGBClassifier(n_estimators=30, max_depth=3, learning_rate=0.2, eval_metric="logloss", tree_method="hist")
+    pipe = Pipeline([("pre", pre), ("clf", clf)])
+    pipe.fit(applicants, y)
+    return pipe
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+API_KEY = "test-api-key"
+
+@pytest.fixture(scope="session")
+def app_module():
+    """backend/app.py imported with the trained artifacts in backend/models and no Supabase."""
+    os.environ.setdefault("ALLOWED_ORIGINS", "http://localhost:3000")
+    os.environ["API_KEY"] = API_KEY
+    os.environ["SCORE_RATE_LIMIT"] = "10000/minute"
+    os.environ["PORTFOLIO_RATE_LIMIT"] = "10000/minute"
+    for name in ("SUPABASE_URL", "SUPABASE_KEY", "SUPABASE_JWT_SECRET"):
+        os.environ[name] = ""
+    previous = os.getcwd()
+    os.chdir(BACKEND_DIR)  # artifact paths are relative to backend/
+    try:
+        import app
+    finally:
+        os.chdir(previous)
+    if app.model is None:
+        pytest.skip("backend/models/model.pkl is not available")
+    return app
+
+@pytest.fixture(scope="session")
+def client(app_module):
+    from fastapi.testclient import TestClient
+    with TestClient(app_module.app, headers={"x-api-key": API_KEY}) as test_client:
+        yield test_client
+
+BASE_APPLICATION = {
+    "loan_amnt": 15000, "annual_inc": 65000, "dti": 18.5, "emp_length": 4, "grade": "C",
+    "term": "36 months", "purpose": "debt_consolidation", "home_ownership": "RENT",
+    "state": "CA", "revol_util": 55.0, "fico": 690,
+}
+
+USER_ID = "user-1"
+
+@pytest.fixture
+def as_user(app_module, monkeypatch):
+    """Route the app's Supabase access to a FakeSupabase and authenticate every request as USER_ID."""
+    def install(fake):
+        monkeypatch.setattr(app_module, "get_supabase_client", lambda user_jwt=None: fake)
+        monkeypatch.setattr(app_module, "get_user_id_from_token", lambda authorization: (USER_ID, True))
+        return {"Authorization": "Bearer test-token"}
+    return install
@@ -0,0 +1,121 @@
+# backend/tests/fake_supabase.py
+"""
+In-memory stand-in for the supabase-py client, covering the query builder
+calls the backend makes (select / eq / in_ / order / range / limit / insert /
+delete / rpc). Every executed query is recorded in `calls`.
+"""
+import threading
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List
+
+class FakeQuery:
+    def __init__(self, client: "FakeSupabase", table: str):
+        self.client = client
+        self.table = table
+        self.op = "select"
+        self.columns: List[str] | None = None
+        self.filters: List[Callable[[dict], bool]] = []
+        self.order_by: tuple[str, bool] | None = None
+        self.window: tuple[int, int] | None = None
+        self.rows: List[dict] = []
+        self.count = None
+
+    def select(self, columns: str = "*", count: str | None = None):
+        self.columns = None if columns.strip() == "*" else [c.strip() for c in columns.split(",")]
+        self.count = count
+        return self
+
+    def eq(self, column: str, value: Any):
+        self.filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def in_(self, column: str, values: List[Any]):
+        allowed = set(values)
+        self.filters.append(lambda row: row.get(column) in allowed)
+        return self
+
+    def order(self, column: str, desc: bool = False):
+        self.order_by = (column, desc)
+        return self
+
+    def range(self, start: int, end: int):
+        self.window = (start, end + 1)
+        return self
+
+    def limit(self, n: int):
+        self.window = (0, n)
+        return self
+
+    def insert(self, rows):
+        self.op = "insert"
+        self.rows = rows if isinstance(rows, list) else [rows]
+        return self
+
+    def delete(self):
+        self.op = "delete"
+        return self
+
+    def execute(self):
+        self.client.record(self)
+        table = self.client.tables.setdefault(self.table, [])
+        if self.op == "insert":
+            inserted = []
+            for row in self.rows:
+                self.client.next_id += 1
+                inserted.append({"id": f"app-{self.client.next_id}", **row})
+            table.extend(inserted)
+            return SimpleNamespace(data=inserted, count=None)
+        matched = [row for row in table if all(f(row) for f in self.filters)]
+        if self.op == "delete":
+            self.client.tables[self.table] = [row for row in table if row not in matched]
+            return SimpleNamespace(data=matched, count=None)
+        if self.order_by:
+            column, desc = self.order_by
+            matched = sorted(matched, key=lambda row: row.get(column), reverse=desc)
+        total = len(matched)
+        if self.window:
+            matched = matched[self.window[0]:self.window[1]]
+        if self.columns is not None:
+            matched = [{c: row.get(c) for c in self.columns} for row in matched]
+        else:
+            matched = [dict(row) for row in matched]
+        return SimpleNamespace(data=matched, count=total if self.count else None)
+
+class FakeRpc:
+    def __init__(self, client: "FakeSupabase", name: str, params: dict):
+        self.client = client
+        self.table = f"rpc:{name}"
+        self.op = "rpc"
+        self.name = name
+        self.params = params
+
+    def execute(self):
+        self.client.record(self)
+        handler = self.client.rpcs.get(self.name)
+        if handler is None:
+            raise Exception(f"Could not find the function public.{self.name}")
+        return SimpleNamespace(data=handler(self.params), count=None)
+
+class FakeSupabase:
+    def __init__(self, tables: Dict[str, List[dict]] | None = None, rpcs: Dict[str, Callable] | None = None):
+        self.tables = {name: [dict(row) for row in rows] for name, rows in (tables or {}).items()}
+        self.rpcs = rpcs or {}
+        self.calls: List[Any] = []
+        self.next_id = 0
+        self.on_execute: Callable[[Any], None] | None = None
+        self._lock = threading.Lock()
+
+    def record(self, query) -> None:
+        with self._lock:
+            self.calls.append(query)
+        if self.on_execute is not None:
+            self.on_execute(query)
+
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(self, name)
+
+    def rpc(self, name: str, params: dict) -> FakeRpc:
+        return FakeRpc(self, name, params)
+
+    def queried(self, table: str) -> int:
+        return sum(1 for call in self.calls if call.table == table)
@@ -0,0 +1,60 @@
+# backend/tests/test_bulk_get.py
+import uuid
+
+import pytest
+
+from conftest import USER_ID
+from explain import encode_compact
+from fake_supabase import FakeSupabase
+
+SHAP_VECTOR = [0.31, -0.12, 0.05, -0.002, 0.2, -0.45, 0.6, 0.01, -0.03, 0.0, 0.07]
+IDS = [str(uuid.UUID(int=i + 1)) for i in range(4)]
+
+def _db() -> FakeSupabase:
+    return FakeSupabase({"applications": [
+        {
+            "id": app_id, "user_id": USER_ID, "loan_amnt": 1000 * (i + 1), "pd": 0.1 * (i + 1),
+            "risk_grade": "B", "decision": "approve", "explanation": None,
+            "explanation_compact": encode_compact(SHAP_VECTOR),
+        }
+        for i, app_id in enumerate(IDS[:3])
+    ]})
+
+def test_found_and_missing_ids_in_one_query(client, as_user):
+    fake = _db()
+    res = client.post("/applications/get/bulk", json={"ids": [IDS[2], IDS[3], IDS[0]]}, headers=as_user(fake))
+    assert res.status_code == 200
+    body = res.json()
+    assert sorted(body["applications"]) == sorted([IDS[0], IDS[2]])
+    assert body["missing_ids"] == [IDS[3]]
+    assert body["applications"][IDS[2]]["loan_amnt"] == 3000
+    assert fake.queried("applications") == 1
+
+def test_duplicate_ids_are_fetched_once(client, as_user):
+    fake = _db()
+    res = client.post("/applications/get/bulk", json={"ids": [IDS[1], IDS[1], IDS[3], IDS[3]]}, headers=as_user(fake))
+    assert res.status_code == 200
+    assert list(res.json()["applications"]) == [IDS[1]]
+    assert res.json()["missing_ids"] == [IDS[3]]
+
+def test_fields_projection_keeps_id_and_rebuilds_explanation(client, as_user):
+    fake = _db()
+    res = client.post(
+        "/applications/get/bulk?fields=explanation,loan_amnt",
+        json={"ids": [IDS[0]]}, headers=as_user(fake),
+    )
+    assert res.status_code == 200
+    row = res.json()["applications"][IDS[0]]
+    # pd is fetched to rebuild the explanation but not returned
+    assert set(row) == {"id", "explanation", "loan_amnt"}
+    assert row["explanation"]["top_features"][0]["shap_value"] == pytest.approx(0.6, abs=1e-6)
+
+def test_unknown_field_and_invalid_ids_are_rejected(client, as_user):
+    headers = as_user(_db())
+    assert client.post("/applications/get/bulk?fields=ssn", json={"ids": [IDS[0]]}, headers=headers).status_code == 400
+    assert client.post("/applications/get/bulk", json={"ids": ["not-a-uuid"]}, headers=headers).status_code == 422
+    assert client.post("/applications/get/bulk", json={"ids": []}, headers=headers).status_code == 422
+
+def test_requires_authentication(client):
+    res = client.post("/applications/get/bulk", json={"ids": [IDS[0]]})
+    assert res.status_code == 401
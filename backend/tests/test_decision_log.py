@@ -0,0 +1,70 @@
+# backend/tests/test_decision_log.py
+import os
+
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from decision_log import COLUMN_NAMES, IN_PROGRESS_SUFFIX, DecisionLog, read_decisions
+
+def _record(i: int, **overrides) -> dict:
+    return {
+        "loan_amnt": 10000 + i, "annual_inc": 65000.0, "fico": 700, "grade": "B",
+        "pd": i / 100, "risk_grade": "B", "decision": "approve", "model_version": "v1",
+        "persisted": i % 2 == 0, **overrides,
+    }
+
+def _log(tmp_path, **kwargs) -> DecisionLog:
+    options = {"batch_wait_s": 0.01, **kwargs}
+    return DecisionLog(str(tmp_path), **options)
+
+@pytest.mark.parametrize("fmt", ["arrow", "parquet"])
+def test_round_trip_keeps_submission_order(tmp_path, fmt):
+    log = _log(tmp_path, fmt=fmt)
+    log.start()
+    for i in range(25):
+        assert log.submit(_record(i))
+    log.stop()
+
+    table = read_decisions(str(tmp_path))
+    assert table.column_names == COLUMN_NAMES
+    assert table.num_rows == 25
+    assert table["loan_amnt"].to_pylist() == [10000 + i for i in range(25)]
+    # Keys not in the record are stored as nulls
+    assert table["application_id"].null_count == 25
+    assert log.snapshot()["written"] == 25
+    assert not any(name.endswith(IN_PROGRESS_SUFFIX) for name in os.listdir(tmp_path))
+
+def test_segments_rotate_by_row_count(tmp_path):
+    log = _log(tmp_path, batch_size=4, segment_rows=4)
+    for i in range(10):
+        log.submit(_record(i))
+    log.start()  # queue already full: batches of 4, 4 and 2
+    log.stop()
+
+    assert log.stats["segments"] == 3
+    assert len(os.listdir(tmp_path)) == log.stats["segments"]
+    assert read_decisions(str(tmp_path)).num_rows == 10
+
+def test_submit_drops_instead_of_blocking_when_queue_is_full(tmp_path):
+    log = _log(tmp_path, queue_size=2)  # not started, so nothing drains the queue
+    results = [log.submit(_record(i)) for i in range(5)]
+    assert results == [True, True, False, False, False]
+    assert log.snapshot()["dropped"] == 3
+    assert log.snapshot()["queue_depth"] == 2
+
+def test_open_arrow_segment_is_readable_before_close(tmp_path):
+    log = _log(tmp_path)
+    log.submit(_record(1))
+    log._write_batch([log._queue.get_nowait()])  # write without closing the segment
+    assert read_decisions(str(tmp_path)).num_rows == 1
+    log._close_segment()
+
+def test_read_decisions_on_empty_directory(tmp_path):
+    table = read_decisions(str(tmp_path))
+    assert table.num_rows == 0
+    assert table.column_names == COLUMN_NAMES
+
+def test_unknown_format_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        DecisionLog(str(tmp_path), fmt="csv")
@@ -0,0 +1,30 @@
+# backend/tests/test_drift.py
+from drift import DriftMonitor, build_reference_profile, MIN_ROWS_PER_BIN, PD_BINS
+
+from conftest import make_applicants
+
+def _monitor(min_rows=None):
+    reference = make_applicants(2000, seed=3)
+    pds = (reference['dti'] / 40).to_numpy()
+    return DriftMonitor(build_reference_profile(reference, pds), min_rows=min_rows), reference, pds
+
+def test_default_min_rows_scales_with_finest_histogram():
+    monitor, _, _ = _monitor()
+    assert monitor.min_rows == MIN_ROWS_PER_BIN * PD_BINS
+
+def test_report_withholds_scores_below_min_rows():
+    monitor, reference, pds = _monitor()
+    monitor.update(reference.iloc[0].to_dict(), float(pds[0]))
+    report = monitor.report()
+    assert report["status"] == "insufficient_data"
+    assert report["n_rows"] == 1
+    assert report["features"] == {} and report["pd"] is None
+
+def test_report_on_reference_traffic_is_stable():
+    monitor, reference, pds = _monitor(min_rows=500)
+    for i in range(1000):
+        monitor.update(reference.iloc[i].to_dict(), float(pds[i]))
+    report = monitor.report()
+    assert report["status"] == "ok"
+    assert report["pd"]["status"] == "stable"
+    assert all(f["status"] == "stable" for f in report["features"].values())
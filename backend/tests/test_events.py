@@ -0,0 +1,82 @@
+# backend/tests/test_events.py
+import asyncio
+import threading
+
+import orjson
+
+from events import RESYNC, EventHub, format_event
+
+def _parse(message: bytes):
+    event_line, data_line = message.decode().strip().split("\n")
+    return event_line[len("event: "):], orjson.loads(data_line[len("data: "):])
+
+def test_format_event_is_one_sse_frame():
+    message = format_event("application_deleted", {"id": "a-1"})
+    assert message.endswith(b"\n\n")
+    assert _parse(message) == ("application_deleted", {"id": "a-1"})
+
+def test_subscribe_limit_is_per_user():
+    async def scenario():
+        hub = EventHub(max_subscribers_per_user=2)
+        first, second = hub.subscribe("u1"), hub.subscribe("u1")
+        assert first is not None and second is not None
+        assert hub.subscribe("u1") is None
+        assert hub.subscribe("u2") is not None
+
+        hub.unsubscribe("u1", first)
+        assert hub.subscribe("u1") is not None
+        return hub.snapshot()
+
+    snapshot = asyncio.run(scenario())
+    assert snapshot["users"] == 2
+    assert snapshot["subscribers"] == 3
+
+def test_unsubscribe_drops_empty_users():
+    async def scenario():
+        hub = EventHub()
+        subscription = hub.subscribe("u1")
+        hub.unsubscribe("u1", subscription)
+        hub.unsubscribe("u1", subscription)  # second call is a no-op
+        return hub.snapshot()
+
+    assert asyncio.run(scenario())["users"] == 0
+
+def test_publish_from_worker_thread_reaches_only_that_users_subscribers():
+    async def scenario():
+        hub = EventHub()
+        mine, other = hub.subscribe("u1"), hub.subscribe("u2")
+        worker = threading.Thread(target=hub.publish, args=("u1", "application_saved", {"id": "a-1"}))
+        worker.start()
+        await asyncio.to_thread(worker.join)
+        message = await asyncio.wait_for(mine.queue.get(), timeout=1)
+        return hub, message, other.queue.qsize()
+
+    hub, message, other_pending = asyncio.run(scenario())
+    assert _parse(message) == ("application_saved", {"id": "a-1"})
+    assert other_pending == 0
+    assert hub.stats["published"] == 1
+    assert hub.stats["delivered"] == 1
+
+def test_publish_without_subscribers_is_counted_and_dropped():
+    hub = EventHub()
+    hub.publish("u1", "application_saved", {"id": "a-1"})
+    assert hub.stats == {"published": 1, "delivered": 0, "overflows": 0}
+
+def test_overflow_collapses_backlog_into_one_resync():
+    async def scenario():
+        hub = EventHub(buffer_size=3)
+        subscription = hub.subscribe("u1")
+        for i in range(5):
+            hub.publish("u1", "application_saved", {"id": f"a-{i}"})
+        await asyncio.sleep(0)  # let the scheduled deliveries run
+        pending = []
+        while not subscription.queue.empty():
+            pending.append(subscription.queue.get_nowait())
+        return hub, pending
+
+    hub, pending = asyncio.run(scenario())
+    # a-0..a-2 fill the buffer, a-3 overflows into a resync, a-4 queues behind it
+    assert [_parse(m)[0] for m in pending] == [RESYNC, "application_saved"]
+    assert _parse(pending[1])[1] == {"id": "a-4"}
+    assert hub.stats["delivered"] == 4
+    assert hub.stats["overflows"] == 1
@@ -0,0 +1,114 @@
+# backend/tests/test_explain.py
+import numpy as np
+
+import pytest
+
+from explain import (
+    ORIGINAL_FEATURES, NUMERIC_FEATURES, TIER_EXACT, TIER_APPROX, TIER_SKIPPED,
+    TierLatencyTracker, aggregate_contributions, aggregation_matrix,
+    build_explanation, decode_compact, encode_compact, shap_dict, summarize_importance,
+    vector_from_explanation,
+)
+
+def test_aggregation_matrix_maps_every_column_to_one_feature(pipeline, applicants):
+    pre = pipeline.named_steps['pre']
+    n_columns = pre.transform(applicants.head(1)).shape[1]
+    matrix = aggregation_matrix(pre, n_columns)
+    assert matrix.shape == (n_columns, len(ORIGINAL_FEATURES))
+    np.testing.assert_array_equal(matrix.sum(axis=1), np.ones(n_columns))
+    np.testing.assert_array_equal(matrix[:len(NUMERIC_FEATURES), :len(NUMERIC_FEATURES)], np.eye(len(NUMERIC_FEATURES)))
+
+def test_aggregate_contributions_preserves_row_sums(pipeline, applicants):
+    pre = pipeline.named_steps['pre']
+    n_columns = pre.transform(applicants.head(1)).shape[1]
+    raw = np.random.default_rng(0).normal(size=(25, n_columns))
+    aggregated = aggregate_contributions(pre, raw)
+    assert aggregated.shape == (25, len(ORIGINAL_FEATURES))
+    np.testing.assert_allclose(aggregated.sum(axis=1), raw.sum(axis=1))
+
+def test_aggregate_contributions_accepts_single_row(pipeline, applicants):
+    pre = pipeline.named_steps['pre']
+    n_columns = pre.transform(applicants.head(1)).shape[1]
+    raw = np.arange(n_columns, dtype=float)
+    assert aggregate_contributions(pre, raw).shape == (1, len(ORIGINAL_FEATURES))
+
+def test_choose_prefers_most_accurate_tier_that_fits():
+    tracker = TierLatencyTracker()
+    assert tracker.choose(1.0) == TIER_EXACT  # no estimate yet
+    tracker.record(TIER_EXACT, 40.0)
+    tracker.record(TIER_APPROX, 2.0)
+    assert tracker.choose(50.0) == TIER_EXACT
+    assert tracker.choose(10.0) == TIER_APPROX
+    assert tracker.choose(1.0) == TIER_SKIPPED
+
+def test_record_is_exponentially_weighted():
+    tracker = TierLatencyTracker(alpha=0.5)
+    tracker.record(TIER_EXACT, 10.0)
+    tracker.record(TIER_EXACT, 30.0)
+    assert tracker.estimate(TIER_EXACT) == 20.0
+    assert tracker.snapshot() == {TIER_EXACT: 20.0}
+
+def test_choose_probes_passed_over_tier_every_probe_every_decisions():
+    tracker = TierLatencyTracker(probe_every=5)
+    tracker.record(TIER_EXACT, 100.0)
+    tracker.record(TIER_APPROX, 100.0)
+    decisions = [tracker.choose(1.0) for _ in range(10)]
+    # Both tiers are passed over; exact is probed on the 5th call, approx one call later
+    assert decisions[:4] == [TIER_SKIPPED] * 4
+    assert decisions[4] == TIER_EXACT
+    assert decisions[5] == TIER_APPROX
+    assert decisions[9] == TIER_EXACT
+
+SHAP_VECTOR = [0.31, -0.12, 0.05, -0.002, 0.2, -0.45, 0.6, 0.01, -0.03, 0.0, 0.07]
+
+def test_compact_encoding_is_44_bytes_of_hex():
+    encoded = encode_compact(SHAP_VECTOR)
+    assert encoded.startswith("\\x")
+    assert len(bytes.fromhex(encoded[2:])) == 4 * len(ORIGINAL_FEATURES)
+
+def test_compact_round_trip_is_float32_exact():
+    expected = np.asarray(SHAP_VECTOR, dtype=np.float32)
+    encoded = encode_compact(SHAP_VECTOR)
+    np.testing.assert_array_equal(decode_compact(encoded), expected)
+    # PostgREST may hand back the hex without the prefix, or raw bytes
+    np.testing.assert_array_equal(decode_compact(encoded[2:]), expected)
+    np.testing.assert_array_equal(decode_compact(bytes.fromhex(encoded[2:])), expected)
+
+@pytest.mark.parametrize("value", [None, "\\x" + "00" * 40])
+def test_decode_compact_rejects_missing_or_wrong_length(value):
+    assert decode_compact(value) is None
+
+def test_legacy_explanation_converts_to_the_same_vector():
+    legacy = build_explanation(shap_dict(SHAP_VECTOR), 0.2)
+    assert vector_from_explanation(legacy) == pytest.approx(SHAP_VECTOR)
+    assert vector_from_explanation(None) is None
+    assert vector_from_explanation({"top_features": []}) is None
+
+def test_explanation_rebuilt_from_compact_matches_original():
+    original = build_explanation(shap_dict(SHAP_VECTOR), 0.2)
+    rebuilt = build_explanation(shap_dict(decode_compact(encode_compact(SHAP_VECTOR))), 0.2)
+    assert [f["feature"] for f in rebuilt["top_features"]] == [f["feature"] for f in original["top_features"]]
+    assert rebuilt["summary"] == original["summary"]
+    for a, b in zip(rebuilt["top_features"], original["top_features"]):
+        assert a["shap_value"] == pytest.approx(b["shap_value"], abs=1e-6)
+
+def test_summarize_importance_merges_grade_rows():
+    rows = [
+        {"risk_grade": "A", "explained": 2, "shap_sum": [2.0] + [0.0] * 10, "abs_shap_sum": [2.0] + [0.0] * 10},
+        {"risk_grade": "B", "explained": 2, "shap_sum": [-1.0, 1.0] + [0.0] * 9, "abs_shap_sum": [3.0, 3.0] + [0.0] * 9},
+    ]
+    summary = summarize_importance(rows)
+    assert summary["explained_applications"] == 4
+    by_feature = {f["feature"]: f for f in summary["features"]}
+    assert by_feature["loan_amnt"]["mean_shap"] == pytest.approx(0.25)
+    assert by_feature["loan_amnt"]["mean_abs_shap"] == pytest.approx(1.25)
+    assert by_feature["annual_inc"]["mean_abs_shap"] == pytest.approx(0.75)
+    assert by_feature["loan_amnt"]["importance_pct"] == pytest.approx(62.5)
+    assert sum(f["importance_pct"] for f in summary["features"]) == pytest.approx(100)
+    assert [f["feature"] for f in summary["features"][:2]] == ["loan_amnt", "annual_inc"]
+
+def test_summarize_importance_without_explained_applications():
+    summary = summarize_importance([])
+    assert summary["explained_applications"] == 0
+    assert all(f["mean_abs_shap"] == 0.0 and f["importance_pct"] == 0.0 for f in summary["features"])
+    assert len(summary["features"]) == len(ORIGINAL_FEATURES)
@@ -0,0 +1,96 @@
+# backend/tests/test_idempotency.py
+import idempotency
+from idempotency import IdempotencyStore, NEW, REPLAY, IN_PROGRESS, MISMATCH
+
+from conftest import BASE_APPLICATION
+from fake_supabase import FakeSupabase
+
+def test_first_request_runs_and_repeat_is_replayed():
+    store = IdempotencyStore()
+    assert store.begin("k", "fp") == (NEW, None)
+    store.complete("k", "fp", 200, b'{"ok":true}')
+    assert store.begin("k", "fp") == (REPLAY, (200, b'{"ok":true}'))
+    assert store.snapshot()["replayed"] == 1
+
+def test_repeat_while_running_is_in_progress():
+    store = IdempotencyStore()
+    store.begin("k", "fp")
+    assert store.begin("k", "fp") == (IN_PROGRESS, None)
+
+def test_same_key_with_different_payload_is_mismatch():
+    store = IdempotencyStore()
+    store.begin("k", "fp")
+    store.complete("k", "fp", 200, b"{}")
+    assert store.begin("k", "other") == (MISMATCH, None)
+    assert store.snapshot()["conflicts"] == 1
+
+def test_abandoned_key_can_be_retried_but_completed_key_is_kept():
+    store = IdempotencyStore()
+    store.begin("k", "fp")
+    store.abandon("k")
+    assert store.begin("k", "fp") == (NEW, None)
+    store.complete("k", "fp", 200, b"{}")
+    store.abandon("k")
+    assert store.begin("k", "fp")[0] == REPLAY
+
+def test_expired_entry_starts_over(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(idempotency.time, "monotonic", lambda: clock[0])
+    store = IdempotencyStore(ttl_s=60)
+    store.begin("k", "fp")
+    store.complete("k", "fp", 200, b"{}")
+    clock[0] += 61
+    assert store.begin("k", "other") == (NEW, None)
+
+def test_least_recently_used_entries_are_evicted():
+    store = IdempotencyStore(max_entries=2)
+    for key in ("a", "b"):
+        store.begin(key, "fp")
+        store.complete(key, "fp", 200, b"{}")
+    store.begin("a", "fp")  # touch a, so b is the oldest
+    store.begin("c", "fp")
+    assert store.snapshot() == {"entries": 2, "replayed": 1, "conflicts": 0, "evicted": 1}
+    assert store.begin("b", "fp") == (NEW, None)
+
+SAVED_APPLICATION = {**BASE_APPLICATION, "pd": 0.3, "risk_grade": "D", "decision": "review"}
+
+def test_save_with_same_key_inserts_once_and_replays(client, as_user):
+    fake = FakeSupabase()
+    headers = {**as_user(fake), "Idempotency-Key": "save-2026-01-01T00:00:00.000Z"}
+    first = client.post("/applications/save", json=SAVED_APPLICATION, headers=headers)
+    second = client.post("/applications/save", json=SAVED_APPLICATION, headers=headers)
+    assert first.status_code == second.status_code == 200
+    assert second.headers.get("idempotent-replayed") == "true"
+    assert second.json() == first.json()
+    assert len(fake.tables["applications"]) == 1
+
+def test_save_reusing_key_for_other_payload_is_rejected(client, as_user):
+    fake = FakeSupabase()
+    headers = {**as_user(fake), "Idempotency-Key": "save-2026-01-02T00:00:00.000Z"}
+    client.post("/applications/save", json=SAVED_APPLICATION, headers=headers)
+    res = client.post("/applications/save", json={**SAVED_APPLICATION, "loan_amnt": 999}, headers=headers)
+    assert res.status_code == 422
+    assert len(fake.tables["applications"]) == 1
+
+def _bulk_item(key: str) -> dict:
+    return {**SAVED_APPLICATION, "idempotency_key": key}
+
+def test_bulk_save_skips_rows_saved_by_an_earlier_sync(app_module, client, as_user, monkeypatch):
+    monkeypatch.setattr(app_module, "IDEMPOTENCY_DB_COLUMN", True)
+    fake = FakeSupabase()
+    headers = as_user(fake)
+    first = client.post("/applications/save/bulk", json={"applications": [_bulk_item("a"), _bulk_item("b")]}, headers=headers)
+    assert first.status_code == 200
+    # A later sync with a different batch still carries rows a and b, plus a repeated c
+    second = client.post(
+        "/applications/save/bulk",
+        json={"applications": [_bulk_item("c"), _bulk_item("a"), _bulk_item("c"), _bulk_item("b")]},
+        headers=headers,
+    )
+    assert second.status_code == 200
+    body = second.json()
+    assert body["already_saved"] == 2
+    assert [row["idempotency_key"] for row in fake.tables["applications"]] == ["a", "b", "c"]
+    ids = {row["idempotency_key"]: row["id"] for row in fake.tables["applications"]}
+    assert body["application_ids"] == [ids["c"], ids["a"], ids["c"], ids["b"]]
+    assert first.json()["application_ids"] == [ids["a"], ids["b"]]
@@ -0,0 +1,207 @@
+# backend/tests/test_portfolio_endpoints.py
+import threading
+
+import numpy as np
+import pytest
+
+from conftest import USER_ID
+from explain import build_explanation, encode_compact, shap_dict
+from fake_supabase import FakeSupabase
+
+SHAP_VECTOR = [0.31, -0.12, 0.05, -0.002, 0.2, -0.45, 0.6, 0.01, -0.03, 0.0, 0.07]
+
+def test_expand_explanations_rebuilds_compact_and_keeps_legacy(app_module):
+    legacy = build_explanation(shap_dict(SHAP_VECTOR), 0.3)
+    rows = [
+        {"id": "compact", "pd": 0.3, "explanation_compact": encode_compact(SHAP_VECTOR), "explanation": None},
+        {"id": "legacy", "pd": 0.3, "explanation_compact": None, "explanation": legacy},
+        {"id": "none", "pd": 0.3, "explanation_compact": None, "explanation": None},
+    ]
+    compact, old, missing = app_module._expand_explanations(rows)
+    assert "explanation_compact" not in compact
+    assert compact["explanation"]["summary"] == legacy["summary"]
+    assert old["explanation"] == legacy
+    assert missing["explanation"] is None
+
+def test_expand_explanations_compact_format_returns_vectors(app_module):
+    legacy = build_explanation(shap_dict(SHAP_VECTOR), 0.3)
+    rows = [
+        {"pd": 0.3, "explanation_compact": encode_compact(SHAP_VECTOR)},
+        {"pd": 0.3, "explanation": legacy},
+    ]
+    for row in app_module._expand_explanations(rows, "compact"):
+        assert "explanation" not in row
+        assert row["explanation_shap"] == pytest.approx(SHAP_VECTOR, abs=1e-6)
+
+def _applications(n: int) -> list:
+    grades = "ABCDEFG"
+    return [
+        {
+            "id": f"app-{i}", "user_id": USER_ID, "created_at": f"2026-01-{i + 1:02d}T00:00:00+00:00",
+            "loan_amnt": 1000 * (i + 1), "annual_inc": 50000.0, "pd": 0.02 * (i + 1),
+            "risk_grade": grades[i % 7], "decision": "approve" if 0.02 * (i + 1) < 0.15 else "review",
+            "purpose": "credit_card", "state": "CA", "term": "36 months",
+            "explanation": None, "explanation_compact": encode_compact(SHAP_VECTOR),
+        }
+        for i in range(n)
+    ]
+
+def _stats_row(applications: list, version: int = 1) -> dict:
+    return {
+        "user_id": USER_ID, "total_applications": len(applications), "avg_pd": 0.1, "approval_rate": 0.5,
+        "default_rate": 0.1, "grade_distribution": {g: 1 for g in "ABCDEFG"},
+        "computed_at": "2026-01-10T00:00:00+00:00", "version": version,
+    }
+
+def _portfolio_db(n: int = 10) -> FakeSupabase:
+    applications = _applications(n)
+    return FakeSupabase({"applications": applications, "portfolio_stats": [_stats_row(applications)]})
+
+def _is_stats_or_listing(query) -> bool:
+    # The version-only read (explicit columns) runs before the two concurrent queries
+    return query.table == "applications" or (query.table == "portfolio_stats" and query.columns is None)
+
+def test_portfolio_fetches_stats_and_listing_concurrently(client, as_user):
+    fake = _portfolio_db()
+    headers = as_user(fake)
+    # The stats row and listing queries each wait for the other: sequential calls would time out
+    barrier = threading.Barrier(2, timeout=5)
+    fake.on_execute = lambda query: barrier.wait() if _is_stats_or_listing(query) else None
+    res = client.get("/portfolio?limit=5", headers=headers)
+    assert res.status_code == 200
+    body = res.json()
+    assert body["total_applications"] == 10
+    assert [row["id"] for row in body["recent_applications"]] == [f"app-{i}" for i in range(9, 4, -1)]
+    assert body["recent_applications"][0]["explanation"]["top_features"]
+
+def test_portfolio_revalidation_skips_the_listing_query(client, as_user):
+    fake = _portfolio_db()
+    headers = as_user(fake)
+    first = client.get("/portfolio", headers=headers)
+    etag = first.headers["etag"]
+    listing_queries = fake.queried("applications")
+
+    res = client.get("/portfolio", headers={**headers, "If-None-Match": etag})
+    assert res.status_code == 304
+    assert fake.queried("applications") == listing_queries
+
+    # Any insert or delete bumps the trigger-maintained version: the old ETag no longer matches
+    fake.tables["portfolio_stats"][0]["version"] += 1
+    res = client.get("/portfolio", headers={**headers, "If-None-Match": etag})
+    assert res.status_code == 200 and res.headers["etag"] != etag
+
+def test_portfolio_write_during_fan_out_is_not_revalidated(client, as_user):
+    fake = _portfolio_db()
+    headers = as_user(fake)
+
+    def insert_during_fan_out(query):
+        # An insert lands while the stats row and listing are being read
+        if query.table == "portfolio_stats" and query.columns is None and len(fake.tables["applications"]) == 10:
+            fake.tables["applications"].append(_applications(11)[10])
+            fake.tables["portfolio_stats"][0].update(version=2, total_applications=11)
+
+    fake.on_execute = insert_during_fan_out
+    first = client.get("/portfolio", headers=headers)
+    assert first.status_code == 200
+    fake.on_execute = None
+
+    # Tagged with the version read before the fan-out, so the copy is refreshed next time
+    res = client.get("/portfolio", headers={**headers, "If-None-Match": first.headers["etag"]})
+    assert res.status_code == 200
+    assert res.headers["etag"] != first.headers["etag"]
+    assert len(res.json()["recent_applications"]) == 11
+    assert client.get("/portfolio", headers={**headers, "If-None-Match": res.headers["etag"]}).status_code == 304
+
+def test_portfolio_without_version_column_sends_no_etag(client, as_user):
+    fake = _portfolio_db()
+    del fake.tables["portfolio_stats"][0]["version"]
+    res = client.get("/portfolio", headers=as_user(fake))
+    assert res.status_code == 200
+    assert "etag" not in res.headers
+
+def test_portfolio_combined_rpc_uses_one_round_trip(app_module, client, as_user, monkeypatch):
+    monkeypatch.setattr(app_module, "PORTFOLIO_COMBINED_RPC", True)
+    fake = _portfolio_db()
+    fake.rpcs["get_portfolio_page"] = lambda params: {
+        "stats": _stats_row(fake.tables["applications"]),
+        "applications": [
+            {c: row[c] for c in params["p_columns"] if c in row}
+            for row in fake.tables["applications"][params["p_offset"]:params["p_offset"] + params["p_limit"]]
+        ],
+    }
+    res = client.get("/portfolio?limit=3&fields=id,pd", headers=as_user(fake))
+    assert res.status_code == 200
+    assert [call.table for call in fake.calls] == ["rpc:get_portfolio_page"]
+    assert res.json()["recent_applications"] == [{"id": f"app-{i}", "pd": 0.02 * (i + 1)} for i in range(3)]
+
+def test_portfolio_explanation_reads_only_the_importance_table(client, as_user):
+    fake = FakeSupabase({"portfolio_feature_importance": [
+        {"user_id": USER_ID, "risk_grade": "B", "explained": 3,
+         "shap_sum": [0.3] * 11, "abs_shap_sum": [0.6] * 11},
+        {"user_id": USER_ID, "risk_grade": "A", "explained": 1,
+         "shap_sum": [-0.1] * 11, "abs_shap_sum": [0.2] * 11},
+        {"user_id": "someone-else", "risk_grade": "A", "explained": 50,
+         "shap_sum": [9.0] * 11, "abs_shap_sum": [9.0] * 11},
+    ]})
+    res = client.get("/portfolio/explanation?by_grade=true", headers=as_user(fake))
+    assert res.status_code == 200
+    body = res.json()
+    assert [call.table for call in fake.calls] == ["portfolio_feature_importance"]
+    assert body["explained_applications"] == 4
+    assert body["features"][0]["mean_shap"] == pytest.approx(0.05)
+    assert body["features"][0]["mean_abs_shap"] == pytest.approx(0.2)
+    assert list(body["by_grade"]) == ["A", "B"]
+    assert body["by_grade"]["B"]["explained_applications"] == 3
+
+def _naive_grid(pds, codes, n_groups, thresholds):
+    approved = np.zeros((n_groups, len(thresholds)), dtype=np.int64)
+    approved_pd = np.zeros((n_groups, len(thresholds)))
+    for pd_value, code in zip(pds, codes):
+        for j, t in enumerate(thresholds):
+            if pd_value < t:
+                approved[code, j] += 1
+                approved_pd[code, j] += pd_value
+    return approved, approved_pd
+
+def test_threshold_grid_matches_a_naive_loop(app_module):
+    rng = np.random.default_rng(5)
+    thresholds = np.array([0.05, 0.1, 0.15, 0.2])
+    # Include PDs exactly on a threshold: approval is strict (pd < t)
+    pds = np.concatenate([rng.uniform(0, 0.3, 500), thresholds])
+    codes = rng.integers(0, 6, len(pds))
+    approved, approved_pd, sizes = app_module._threshold_grid(pds, codes, 6, thresholds)
+    expected, expected_pd = _naive_grid(pds, codes, 6, thresholds)
+    np.testing.assert_array_equal(approved, expected)
+    np.testing.assert_allclose(approved_pd, expected_pd)
+    np.testing.assert_array_equal(sizes, np.bincount(codes, minlength=6))
+
+def test_parse_thresholds_sorts_dedups_and_validates(app_module):
+    from fastapi import HTTPException
+    assert app_module._parse_thresholds(None, 0.15) == [0.15]
+    assert app_module._parse_thresholds("0.2, 0.1,0.2", 0.15) == [0.1, 0.2]
+    for bad in ("abc", "0.5", ",".join(["0.1"] * 2 + [str(0.01 * i) for i in range(1, 22)])):
+        with pytest.raises(HTTPException):
+            app_module._parse_thresholds(bad, 0.15)
+
+def test_simulate_grid_by_segment(client, as_user):
+    fake = _portfolio_db(14)
+    res = client.get("/portfolio/simulate?thresholds=0.1,0.2&group_by=risk_grade", headers=as_user(fake))
+    assert res.status_code == 200
+    body = res.json()
+    pds = [0.02 * (i + 1) for i in range(14)]
+    assert [r["applications_approved"] for r in body["total"]] == [sum(p < t for p in pds) for t in (0.1, 0.2)]
+    assert [s["segment"] for s in body["segments"]] == list("ABCDEFG")
+    # Segment A holds app-0 (pd 0.02) and app-7 (pd 0.16)
+    segment_a = body["segments"][0]
+    assert segment_a["applications"] == 2
+    assert [r["applications_approved"] for r in segment_a["results"]] == [1, 2]
+    assert segment_a["results"][1]["expected_default_rate"] == pytest.approx(0.09)
+    assert sum(s["results"][1]["applications_approved"] for s in body["segments"]) == body["total"][1]["applications_approved"]
+
+def test_simulate_single_threshold_keeps_the_flat_response(client, as_user):
+    res = client.get("/portfolio/simulate?threshold=0.1", headers=as_user(_portfolio_db(10)))
+    assert res.status_code == 200
+    assert res.json() == {
+        "threshold": 0.1, "approval_rate": 0.4, "expected_default_rate": 0.05,
+        "applications_approved": 4, "applications_rejected": 6,
+    }
@@ -0,0 +1,126 @@
+# backend/tests/test_ratelimit_storage.py
+import types
+
+import pytest
+from limits import parse
+from limits.storage import MemoryStorage
+from limits.strategies import FixedWindowRateLimiter
+
+import ratelimit_storage
+from conftest import BASE_APPLICATION
+from ratelimit_storage import MmapStorage, _HEADER, _SLOT
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable time.time() for the storage module (window expiry)."""
+    now = [1_000_000.0]
+    monkeypatch.setattr(ratelimit_storage, "time", types.SimpleNamespace(time=lambda: now[0]))
+    return now
+
+def _storage(tmp_path, **kwargs) -> MmapStorage:
+    options = {"slots": 1024, "regions": 8, **kwargs}
+    return MmapStorage(f"mmap://{tmp_path}/ratelimit", **options)
+
+def _recorded_hits(storage: MmapStorage) -> int:
+    """Sum of the counts in every slot of the table."""
+    return sum(_SLOT.unpack_from(storage._map, _HEADER.size + i * _SLOT.size)[1] for i in range(storage.n_slots))
+
+def test_fixed_window_counts_hits(tmp_path):
+    limiter = FixedWindowRateLimiter(_storage(tmp_path))
+    limit = parse("3/minute")
+    assert [limiter.hit(limit, "10.0.0.1", "/score") for _ in range(4)] == [True, True, True, False]
+    assert not limiter.test(limit, "10.0.0.1", "/score")
+    assert limiter.get_window_stats(limit, "10.0.0.1", "/score").remaining == 0
+    # Other clients have their own counter
+    assert limiter.test(limit, "10.0.0.2", "/score")
+    assert limiter.get_window_stats(limit, "10.0.0.2", "/score").remaining == 3
+
+def test_hit_costs_match_memory_storage(tmp_path):
+    limit = parse("5/minute")
+    results = []
+    for storage in (MemoryStorage(), _storage(tmp_path)):
+        limiter = FixedWindowRateLimiter(storage)
+        hits = [limiter.hit(limit, "client", cost=cost) for cost in (2, 2, 2, 1)]
+        results.append((hits, limiter.get_window_stats(limit, "client").remaining, storage.get(limit.key_for("client"))))
+    assert results[1] == results[0]
+
+def test_new_window_starts_after_expiry(tmp_path, clock):
+    storage = _storage(tmp_path)
+    limiter = FixedWindowRateLimiter(storage)
+    limit = parse("2/minute")
+    assert limiter.hit(limit, "client") and limiter.hit(limit, "client")
+    assert not limiter.hit(limit, "client")
+    assert storage.get_expiry(limit.key_for("client")) == pytest.approx(clock[0] + 60)
+
+    clock[0] += 61
+    assert limiter.get_window_stats(limit, "client").remaining == 2
+    assert limiter.hit(limit, "client")
+    assert storage.get(limit.key_for("client")) == 1
+    assert storage.get_expiry(limit.key_for("client")) == pytest.approx(clock[0] + 60)
+
+def test_clear_keeps_the_probe_chain_intact(tmp_path):
+    storage = _storage(tmp_path, slots=32, regions=1)
+    # Two keys with the same home slot: the second lives further down the first one's chain
+    homes = {}
+    for i in range(10000):
+        home = storage._hash(f"key-{i}") % storage.n_slots
+        if home in homes:
+            first, second = homes[home], f"key-{i}"
+            break
+        homes[home] = f"key-{i}"
+    storage.incr(first, 60)
+    storage.incr(second, 60, amount=5)
+
+    storage.clear(first)
+    assert storage.get(first) == 0
+    assert storage.get(second) == 5
+    # The cleared slot is reused by its own key, not duplicated further down the chain
+    assert storage.incr(first, 60) == 1
+    assert storage.incr(second, 60) == 6
+    assert _recorded_hits(storage) == 7
+
+def test_instances_on_the_same_file_share_counters(tmp_path):
+    # Same file as two worker processes would open it
+    first, second = _storage(tmp_path), _storage(tmp_path)
+    limit = parse("3/minute")
+    assert FixedWindowRateLimiter(first).hit(limit, "client")
+    assert FixedWindowRateLimiter(second).hit(limit, "client")
+    assert FixedWindowRateLimiter(first).hit(limit, "client")
+    assert not FixedWindowRateLimiter(second).hit(limit, "client")
+    second.reset()
+    assert first.get(limit.key_for("client")) == 0
+
+def test_file_with_another_layout_is_rejected(tmp_path):
+    _storage(tmp_path, slots=1024)
+    with pytest.raises(ValueError, match="different layout"):
+        _storage(tmp_path, slots=2048)
+
+def test_slowapi_limiter_enforces_limits_with_mmap_uri(tmp_path):
+    from fastapi import FastAPI, Request
+    from fastapi.testclient import TestClient
+    from slowapi import Limiter, _rate_limit_exceeded_handler
+    from slowapi.errors import RateLimitExceeded
+    from slowapi.util import get_remote_address
+
+    # Built like app.py's limiter with RATE_LIMIT_STORAGE_URI=mmap://...
+    limiter = Limiter(key_func=get_remote_address, storage_uri=f"mmap://{tmp_path}/ratelimit")
+    app = FastAPI()
+    app.state.limiter = limiter
+    app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+
+    @app.get("/limited")
+    @limiter.limit("2/minute")
+    def limited(request: Request):
+        return {"ok": True}
+
+    client = TestClient(app)
+    assert [client.get("/limited").status_code for _ in range(3)] == [200, 200, 429]
+
+def test_app_routes_count_hits_in_mmap_storage(app_module, client, tmp_path, monkeypatch):
+    storage = _storage(tmp_path)
+    monkeypatch.setattr(app_module.limiter, "_storage", storage)
+    monkeypatch.setattr(app_module.limiter, "_limiter", FixedWindowRateLimiter(storage))
+    for _ in range(2):
+        assert client.post("/score", json=BASE_APPLICATION).status_code == 200
+    assert client.get("/portfolio/simulate").status_code == 200
+    assert _recorded_hits(storage) == 3
@@ -0,0 +1,110 @@
+# backend/tests/test_resilience.py
+import pytest
+
+from resilience import (
+    CircuitBreaker, CircuitOpenError, DeadlineExceededError, ResilientExecutor,
+    SpillLog, STATE_CLOSED, STATE_OPEN, STATE_HALF_OPEN, is_transient,
+)
+
+class FakeQuery:
+    """Query builder stand-in whose execute() raises the queued errors, then returns result."""
+
+    def __init__(self, *errors, result="ok"):
+        self.errors = list(errors)
+        self.result = result
+        self.calls = 0
+
+    def execute(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return self.result
+
+def _executor(**kwargs) -> ResilientExecutor:
+    options = {"max_retries": 2, "base_delay_s": 0.0, "deadline_s": 5.0, **kwargs}
+    return ResilientExecutor(CircuitBreaker(min_calls=100), **options)
+
+def test_is_transient_distinguishes_connectivity_from_rejections():
+    assert is_transient(TimeoutError("read timed out"))
+    assert is_transient(Exception("502 Bad Gateway"))
+    assert not is_transient(Exception("new row violates row-level security policy"))
+
+def test_transient_errors_are_retried_until_success():
+    query = FakeQuery(TimeoutError("timed out"), ConnectionError("connection reset"))
+    executor = _executor()
+    assert executor.execute(query) == "ok"
+    assert query.calls == 3
+    assert executor.stats["retries"] == 2
+
+def test_non_transient_error_is_raised_without_retry():
+    query = FakeQuery(ValueError("duplicate key value violates unique constraint"))
+    with pytest.raises(ValueError):
+        _executor().execute(query)
+    assert query.calls == 1
+
+def test_retry_false_makes_a_single_attempt():
+    query = FakeQuery(TimeoutError("timed out"))
+    with pytest.raises(TimeoutError):
+        _executor().execute(query, retry=False)
+    assert query.calls == 1
+
+def test_last_transient_error_is_raised_once_retries_run_out():
+    query = FakeQuery(*[TimeoutError("timed out")] * 3)
+    with pytest.raises(TimeoutError):
+        _executor().execute(query)
+    assert query.calls == 3
+
+def test_retry_that_cannot_start_before_deadline_raises():
+    query = FakeQuery(TimeoutError("timed out"))
+    executor = _executor(base_delay_s=10.0, max_delay_s=10.0, deadline_s=0.0)
+    with pytest.raises(DeadlineExceededError):
+        executor.execute(query)
+    assert query.calls == 1
+    assert executor.stats["deadline_exceeded"] == 1
+
+def test_breaker_opens_on_failure_rate_and_fails_fast():
+    breaker = CircuitBreaker(failure_rate=0.5, window=4, min_calls=4, open_seconds=30.0)
+    for failed in (False, True, False, True):
+        breaker.record(failed=failed)
+    assert breaker.state == STATE_OPEN
+    executor = ResilientExecutor(breaker)
+    query = FakeQuery()
+    with pytest.raises(CircuitOpenError) as excinfo:
+        executor.execute(query)
+    assert query.calls == 0
+    assert excinfo.value.retry_after >= 1.0
+
+def test_half_open_breaker_lets_one_probe_through_and_closes_on_success():
+    breaker = CircuitBreaker(window=2, min_calls=2, open_seconds=0.0)
+    breaker.record(failed=True)
+    breaker.record(failed=True)
+    assert breaker.state == STATE_OPEN
+    assert breaker.allow() is None  # cool-down elapsed: this call is the probe
+    assert breaker.state == STATE_HALF_OPEN
+    assert breaker.allow() is not None  # second caller waits for the probe
+    breaker.record(failed=False)
+    assert breaker.state == STATE_CLOSED
+
+def test_failed_probe_reopens_breaker():
+    breaker = CircuitBreaker(window=2, min_calls=2, open_seconds=0.0)
+    breaker.record(failed=True)
+    breaker.record(failed=True)
+    breaker.allow()
+    breaker.record(failed=True)
+    assert breaker.state == STATE_OPEN
+    assert breaker.stats["opened"] == 2
+
+def test_rejected_queries_do_not_count_against_breaker():
+    breaker = CircuitBreaker(window=4, min_calls=4)
+    executor = ResilientExecutor(breaker, base_delay_s=0.0)
+    for _ in range(4):
+        with pytest.raises(ValueError):
+            executor.execute(FakeQuery(ValueError("permission denied")))
+    assert breaker.state == STATE_CLOSED
+
+def test_spill_log_appends_jsonl(tmp_path):
+    log = SpillLog(str(tmp_path / "spill.jsonl"))
+    assert log.append("applications", {"pd": 0.1})
+    assert log.append("applications", {"pd": 0.2})
+    lines = (tmp_path / "spill.jsonl").read_text().splitlines()
+    assert len(lines) == 2 and log.spilled == 2
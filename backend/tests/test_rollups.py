@@ -0,0 +1,108 @@
+# backend/tests/test_rollups.py
+import random
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import rollups
+
+UTC = timezone.utc
+
+def _ts(*args) -> datetime:
+    return datetime(*args, tzinfo=UTC)
+
+@pytest.mark.parametrize("ts,granularity,expected", [
+    (_ts(2026, 3, 14, 15, 9, 26), "hour", _ts(2026, 3, 14, 15)),
+    (_ts(2026, 3, 14, 15, 9, 26), "day", _ts(2026, 3, 14)),
+    (_ts(2026, 3, 14, 15, 9, 26), "month", _ts(2026, 3, 1)),
+])
+def test_truncate(ts, granularity, expected):
+    assert rollups.truncate(ts, granularity) == expected
+
+@pytest.mark.parametrize("ts,granularity,expected", [
+    (_ts(2026, 12, 31, 23), "hour", _ts(2027, 1, 1, 0)),
+    (_ts(2024, 2, 28), "day", _ts(2024, 2, 29)),
+    (_ts(2026, 1, 1), "month", _ts(2026, 2, 1)),
+    (_ts(2026, 11, 1), "month", _ts(2026, 12, 1)),
+    (_ts(2026, 12, 1), "month", _ts(2027, 1, 1)),
+])
+def test_next_bucket(ts, granularity, expected):
+    assert rollups.next_bucket(ts, granularity) == expected
+
+def test_to_utc_treats_naive_as_utc():
+    assert rollups.to_utc(datetime(2026, 1, 1, 12)) == _ts(2026, 1, 1, 12)
+    assert rollups.to_utc(datetime(2026, 1, 1, 12, tzinfo=timezone(timedelta(hours=2)))) == _ts(2026, 1, 1, 10)
+
+def _buckets(start, end, granularity):
+    ts = rollups.truncate(start, granularity)
+    while ts < end:
+        yield ts
+        ts = rollups.next_bucket(ts, granularity)
+
+def _random_range(rng):
+    start = _ts(2025, 1, 1) + timedelta(hours=rng.randrange(24 * 800))
+    return start, start + timedelta(hours=rng.randrange(1, 24 * 500))
+
+def test_bucket_count_matches_enumeration():
+    rng = random.Random(7)
+    for _ in range(200):
+        start, end = _random_range(rng)
+        for granularity in rollups.GRANULARITIES:
+            assert rollups.bucket_count(start, end, granularity) == len(list(_buckets(start, end, granularity)))
+
+def test_cover_partitions_the_range_into_whole_buckets():
+    rng = random.Random(11)
+    for _ in range(500):
+        start, end = _random_range(rng)
+        segments = rollups.cover(start, end)
+        # Contiguous, in order, exactly [start, end)
+        assert segments[0][1] == start and segments[-1][2] == end
+        for (_, _, seg_end), (_, next_start, _) in zip(segments, segments[1:]):
+            assert seg_end == next_start
+        for granularity, seg_start, seg_end in segments:
+            assert seg_start < seg_end
+            assert rollups.truncate(seg_start, granularity) == seg_start
+            assert rollups.truncate(seg_end, granularity) == seg_end
+        # At most one run of months, two of days, two of hours
+        kinds = [g for g, _, _ in segments]
+        assert kinds.count("month") <= 1 and kinds.count("day") <= 2 and kinds.count("hour") <= 2
+
+def test_cover_of_empty_range_is_empty():
+    assert rollups.cover(_ts(2026, 1, 2), _ts(2026, 1, 1)) == []
+
+def test_totals_from_cover_equal_a_scan_of_the_applications():
+    rng = random.Random(3)
+    events = [
+        (_ts(2025, 1, 1) + timedelta(minutes=rng.randrange(60 * 24 * 900)), rng.random(), rng.choice(rollups.GRADES))
+        for _ in range(3000)
+    ]
+    # What the insert triggers maintain: one row per granularity and bucket
+    table = {g: defaultdict(lambda: {"applications": 0, "pd_sum": 0.0, "approvals": 0, **dict.fromkeys(rollups.GRADE_COLUMNS, 0)}) for g in rollups.GRANULARITIES}
+    for ts, pd_value, grade in events:
+        for granularity in rollups.GRANULARITIES:
+            row = table[granularity][rollups.truncate(ts, granularity)]
+            row["applications"] += 1
+            row["pd_sum"] += pd_value
+            row["approvals"] += pd_value < 0.15
+            row[f"grade_{grade.lower()}"] += 1
+
+    for _ in range(100):
+        start, end = _random_range(rng)
+        rows = [
+            row
+            for granularity, seg_start, seg_end in rollups.cover(start, end)
+            for bucket_start, row in table[granularity].items()
+            if seg_start <= bucket_start < seg_end
+        ]
+        in_range = [(pd_value, grade) for ts, pd_value, grade in events if start <= ts < end]
+        total = rollups.summarize(rows)
+        assert total["applications"] == len(in_range)
+        assert total["grade_distribution"] == {g: sum(1 for _, grade in in_range if grade == g) for g in rollups.GRADES}
+        if in_range:
+            assert total["avg_pd"] == round(sum(p for p, _ in in_range) / len(in_range), 4)
+
+def test_summarize_of_no_rows():
+    assert rollups.summarize([]) == {
+        "applications": 0, "avg_pd": 0.0, "approval_rate": 0.0, "grade_distribution": dict.fromkeys(rollups.GRADES, 0),
+    }
@@ -0,0 +1,104 @@
+# backend/tests/test_scoring_endpoints.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import BASE_APPLICATION
+
+def _pd_of(app_module, **changes) -> float:
+    row = {**BASE_APPLICATION, **changes}
+    return float(app_module.model.predict_proba(pd.DataFrame([row])[app_module.feature_order])[0, 1])
+
+def test_sensitivity_grid_matches_scoring_each_point(app_module, client):
+    sweeps = [
+        {"feature": "dti", "values": [5.0, 20.0, 35.0]},
+        {"feature": "grade", "values": ["A", "D"]},
+    ]
+    res = client.post("/score/sensitivity", json={"base": BASE_APPLICATION, "sweeps": sweeps})
+    assert res.status_code == 200
+    body = res.json()
+    assert body["features"] == ["dti", "grade"]
+    assert np.asarray(body["pd"]).shape == (3, 2)
+    for i, dti in enumerate([5.0, 20.0, 35.0]):
+        for j, grade in enumerate(["A", "D"]):
+            expected = _pd_of(app_module, dti=dti, grade=grade)
+            assert body["pd"][i][j] == pytest.approx(expected, abs=1e-6)
+            assert body["risk_grade"][i][j] == app_module._risk_grade(expected)
+            assert body["decision"][i][j] == ("approve" if expected < app_module.THRESHOLD else "review")
+
+def test_sensitivity_explains_only_requested_points(client):
+    res = client.post("/score/sensitivity", json={
+        "base": BASE_APPLICATION,
+        "sweeps": [{"feature": "fico", "values": [620, 700, 780]}],
+        "explain_points": [[2]],
+        "explain_tier": "approx",
+    })
+    assert res.status_code == 200
+    body = res.json()
+    assert [e["index"] for e in body["explanations"]] == [[2]]
+    assert len(body["explanations"][0]["explanation"]["top_features"]) == 11
+    assert body["explanation_tier"] == "approx"
+
+@pytest.mark.parametrize("payload", [
+    {"sweeps": [{"feature": "fico", "values": [100]}]},  # outside ScoreRequest bounds
+    {"sweeps": [{"feature": "fico", "values": [700]}], "explain_points": [[3]]},  # outside the grid
+])
+def test_sensitivity_rejects_invalid_requests(client, payload):
+    res = client.post("/score/sensitivity", json={"base": BASE_APPLICATION, **payload})
+    assert res.status_code == 422
+
+def test_sensitivity_rejects_grid_over_limit(app_module, client, monkeypatch):
+    monkeypatch.setattr(app_module, "WHATIF_MAX_GRID", 4)
+    res = client.post("/score/sensitivity", json={
+        "base": BASE_APPLICATION,
+        "sweeps": [{"feature": "dti", "values": [1.0, 2.0, 3.0]}, {"feature": "grade", "values": ["A", "B"]}],
+    })
+    assert res.status_code == 422
+
+def _changes_at_least(changes: dict, other: dict) -> bool:
+    """True if `changes` moves every feature `other` moves, at least as far (numeric features only go down)."""
+    for feature, change in other.items():
+        if feature not in changes:
+            return False
+        if feature != "term" and changes[feature]["proposed"] > change["proposed"]:
+            return False
+    return True
+
+def test_counterfactual_candidates_are_sorted_and_exclude_the_original(app_module):
+    from schemas import ScoreRequest
+    level_values, levels, distances = app_module._counterfactual_candidates(ScoreRequest(**BASE_APPLICATION), steps=5)
+    assert np.all(np.diff(distances) >= 0)
+    assert np.all(distances > 0)
+    assert not np.any(np.all(levels == 0, axis=1))
+    # Numeric features can only be reduced
+    for feature in ("loan_amnt", "dti", "revol_util"):
+        assert np.all(level_values[feature] <= BASE_APPLICATION[feature])
+
+def test_counterfactuals_reach_approval_and_are_minimal(app_module, client):
+    res = client.post("/score/counterfactual", json={"application": BASE_APPLICATION, "max_results": 5})
+    assert res.status_code == 200
+    body = res.json()
+    assert body["decision"] == "review"
+    counterfactuals = body["counterfactuals"]
+    assert counterfactuals
+    assert [c["distance"] for c in counterfactuals] == sorted(c["distance"] for c in counterfactuals)
+    for cf in counterfactuals:
+        proposed = {feature: change["proposed"] for feature, change in cf["changes"].items()}
+        assert cf["pd"] == pytest.approx(_pd_of(app_module, **proposed), abs=1e-6)
+        assert cf["pd"] < body["threshold"]
+    # A later result never changes every feature at least as much as an earlier one
+    for i, later in enumerate(counterfactuals):
+        for earlier in counterfactuals[:i]:
+            assert not _changes_at_least(later["changes"], earlier["changes"])
+
+def test_counterfactual_search_respects_budget(client):
+    res = client.post("/score/counterfactual", json={"application": BASE_APPLICATION, "max_evaluations": 10})
+    body = res.json()
+    assert body["candidates_evaluated"] <= 10
+    assert body["budget_exhausted"] == (len(body["counterfactuals"]) < 5)
+
+def test_counterfactual_for_approved_application_is_empty(client):
+    approved = {**BASE_APPLICATION, "grade": "A", "fico": 800, "dti": 5.0, "annual_inc": 200000, "revol_util": 10.0}
+    body = client.post("/score/counterfactual", json={"application": approved}).json()
+    assert body["decision"] == "approve"
+    assert body["counterfactuals"] == [] and body["candidates_evaluated"] == 0
@@ -0,0 +1,46 @@
+# backend/tests/test_shadow.py
+import json
+
+import joblib
+import pytest
+
+from explain import ORIGINAL_FEATURES
+from shadow import ShadowScorer
+
+@pytest.fixture
+def challenger_path(tmp_path, pipeline):
+    path = tmp_path / "challenger.pkl"
+    joblib.dump(pipeline, path)
+    return str(path)
+
+def _scorer(challenger_path, log_path, **kwargs) -> ShadowScorer:
+    return ShadowScorer(challenger_path, str(log_path), threshold=0.15, feature_order=ORIGINAL_FEATURES, champion_version="champ", **kwargs)
+
+def test_shadow_scores_every_submitted_row(challenger_path, tmp_path, pipeline, applicants):
+    log_path = tmp_path / "shadow.jsonl"
+    scorer = _scorer(challenger_path, log_path, batch_size=8)
+    scorer.start()
+    rows = applicants.head(20)
+    for record in rows.to_dict("records"):
+        assert scorer.submit(record, champion_pd=0.1, champion_decision="approve")
+    scorer.stop()
+
+    lines = [json.loads(line) for line in log_path.read_text().splitlines()]
+    assert len(lines) == 20
+    expected = pipeline.predict_proba(rows)[:, 1]
+    for line, challenger_pd in zip(lines, expected):
+        assert line["challenger_pd"] == pytest.approx(float(challenger_pd))
+        assert line["challenger_decision"] == ("approve" if challenger_pd < 0.15 else "review")
+        assert line["agree"] == (line["challenger_decision"] == "approve")
+        assert line["champion_version"] == "champ" and line["challenger_version"] == "challenger.pkl"
+    snapshot = scorer.snapshot()
+    assert snapshot["scored"] == 20 and snapshot["errors"] == 0 and snapshot["batches"] >= 3
+
+def test_submit_drops_instead_of_blocking_when_queue_is_full(challenger_path, tmp_path, applicants):
+    scorer = _scorer(challenger_path, tmp_path / "shadow.jsonl", queue_size=2)  # worker not started
+    record = applicants.iloc[0].to_dict()
+    assert scorer.submit(record, 0.1, "approve")
+    assert scorer.submit(record, 0.1, "approve")
+    assert not scorer.submit(record, 0.1, "approve")
+    assert scorer.snapshot()["dropped"] == 1
+    assert scorer.snapshot()["queue_depth"] == 2
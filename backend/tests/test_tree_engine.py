@@ -0,0 +1,55 @@
+# backend/tests/test_tree_engine.py
+import numpy as np
+import pytest
+import xgboost as xgb
+
+from conftest import make_applicants
+from tree_engine import CHUNK_ROWS, CompiledModel, TreeEnsemble
+
+@pytest.fixture(scope="module")
+def compiled(pipeline):
+    return CompiledModel.from_pipeline(pipeline)
+
+def _booster_margin(pipeline, X):
+    return pipeline.named_steps["clf"].get_booster().predict(xgb.DMatrix(X), output_margin=True)
+
+def test_margins_match_booster_bit_for_bit(pipeline, compiled):
+    # More rows than one chunk, including unseen applicants
+    df = make_applicants(CHUNK_ROWS * 2 + 17, seed=7)
+    X = pipeline.named_steps["pre"].transform(df).astype(np.float32)
+    np.testing.assert_array_equal(compiled.predict_margin(df), _booster_margin(pipeline, X))
+
+def test_probabilities_match_pipeline(pipeline, compiled):
+    df = make_applicants(300, seed=8)
+    np.testing.assert_allclose(compiled.predict_pd(df), pipeline.predict_proba(df)[:, 1], rtol=1e-6)
+
+def test_encoder_matches_column_transformer_including_unknown_categories(pipeline, compiled):
+    df = make_applicants(50, seed=9)
+    df.loc[:4, "state"] = "ZZ"  # never seen in training: all-zero one-hot block
+    expected = pipeline.named_steps["pre"].transform(df).astype(np.float32)
+    np.testing.assert_array_equal(compiled.encoder.transform(df), expected)
+    records = df.to_dict(orient="records")
+    np.testing.assert_array_equal(compiled.encoder.transform_records(records), expected)
+    np.testing.assert_array_equal(compiled.predict_pd_records(records), compiled.predict_pd(df))
+
+def test_missing_values_follow_default_direction(pipeline, compiled):
+    X = pipeline.named_steps["pre"].transform(make_applicants(64, seed=10)).astype(np.float32)
+    X[::3, 0] = np.nan
+    X[1::4, 5] = np.nan
+    np.testing.assert_array_equal(compiled.ensemble.predict_margin(X), _booster_margin(pipeline, X))
+
+def test_values_on_split_thresholds(pipeline, compiled):
+    assert compiled.verify(pipeline, n_rows=2048, seed=3) == 0
+
+def test_single_row_matches_batch(compiled):
+    df = make_applicants(20, seed=11)
+    batch = compiled.predict_margin(df)
+    for i in range(len(df)):
+        assert compiled.predict_margin(df.iloc[[i]])[0] == batch[i]
+
+def test_unsupported_objective_is_rejected():
+    rng = np.random.default_rng(0)
+    X, y = rng.normal(size=(50, 3)), rng.normal(size=50)
+    booster = xgb.train({"objective": "reg:squarederror", "max_depth": 2}, xgb.DMatrix(X, label=y), num_boost_round=2)
+    with pytest.raises(ValueError, match="Unsupported objective"):
+        TreeEnsemble.from_booster(booster)
@@ -0,0 +1,266 @@
+# backend/tree_engine.py
+"""
+NumPy inference engine for the champion pipeline.
+
+At startup the XGBoost booster is flattened into contiguous node arrays
+(feature index, threshold, default direction, leaf value; children are
+implicit in a complete-tree layout) and the ColumnTransformer into a column
+layout (numeric passthrough plus a category -> one-hot column lookup). A
+batch is then scored without sklearn dispatch or DMatrix construction: rows
+are encoded straight into a float32 matrix and all trees are walked
+together, one tree level per step, as vectorized gathers over an
+(n_trees, n_rows) array of node indices, every row taking exactly
+max_depth steps. Rows are processed in chunks so the work arrays stay in cache.
+
+Margins match Booster.predict(output_margin=True) bit for bit: features and
+thresholds are float32, a row goes left iff value < threshold (missing values
+follow default_left), and leaf values are summed onto the base margin in tree
+order in float32, as XGBoost's CPU predictor does.
+"""
+import json
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+MAX_DEPTH = 10  # complete-tree layout grows as 2**depth per tree
+CHUNK_ROWS = 256  # rows per traversal pass; keeps the (n_trees, rows) work arrays in cache
+
+class TreeEnsemble:
+    """
+    Flattened numeric-split XGBoost tree ensemble (binary:logistic).
+
+    Every tree is padded to a complete binary tree of depth max_depth in heap
+    order (children of node k are 2k+1 and 2k+2), and trees are laid out one
+    after another with a fixed stride, so the next node is computed rather
+    than looked up. A leaf above the bottom level is expanded into a subtree
+    of dummy splits whose leaves all carry its value, so the direction taken
+    there does not matter.
+    """
+
+    def __init__(self, feature, threshold, default_right, value, max_depth, base_margin, n_features):
+        self.feature = feature              # (n_trees * stride,) split column, 0 for dummy/leaf slots
+        self.threshold = threshold          # float32; +inf for dummy/leaf slots
+        self.default_right = default_right  # missing values go right
+        self.value = value                  # float32 leaf values (bottom level only)
+        self.max_depth = max_depth
+        self.base_margin = base_margin
+        self.n_features = n_features
+        self.stride = 2 ** (max_depth + 1) - 1
+        self.n_trees = len(feature) // self.stride
+        starts = np.arange(self.n_trees, dtype=np.intp)[:, None] * self.stride
+        self._tree_start = starts
+        self._child_offset = 1 - starts  # global child = 2 * global node + 1 - tree start (+1 if right)
+        self._root_feature = feature[starts[:, 0]]
+        self._root_threshold = threshold[starts[:, 0]][:, None]
+        self._root_default_right = default_right[starts[:, 0]][:, None]
+
+    @classmethod
+    def from_booster(cls, booster) -> "TreeEnsemble":
+        learner = json.loads(booster.save_raw("json"))["learner"]
+        if learner["objective"]["name"] != "binary:logistic":
+            raise ValueError(f"Unsupported objective: {learner['objective']['name']}")
+        if learner["gradient_booster"]["name"] != "gbtree":
+            raise ValueError(f"Unsupported booster: {learner['gradient_booster']['name']}")
+        trees = learner["gradient_booster"]["model"]["trees"]
+        for tree in trees:
+            if any(tree["split_type"]):
+                raise ValueError("Categorical splits are not supported")
+
+        max_depth = max(1, max(_depth(tree["left_children"], tree["right_children"]) for tree in trees))
+        if max_depth > MAX_DEPTH:
+            raise ValueError(f"Trees of depth {max_depth} are too deep for the complete-tree layout (max {MAX_DEPTH})")
+        stride = 2 ** (max_depth + 1) - 1
+        n_internal = 2 ** max_depth - 1
+        feature = np.zeros((len(trees), stride), dtype=np.intp)
+        threshold = np.full((len(trees), stride), np.inf, dtype=np.float32)
+        default_right = np.zeros((len(trees), stride), dtype=bool)
+        value = np.zeros((len(trees), stride), dtype=np.float32)
+
+        for t, tree in enumerate(trees):
+            left, right = tree["left_children"], tree["right_children"]
+            conditions = np.asarray(tree["split_conditions"], dtype=np.float32)
+            stack = [(0, 0)]  # (xgboost node id, heap slot)
+            while stack:
+                node, slot = stack.pop()
+                if slot >= n_internal:
+                    value[t, slot] = conditions[node]  # leaf value is stored as its split condition
+                elif left[node] == -1:
+                    # Leaf above the bottom level: both children inherit it
+                    stack += [(node, 2 * slot + 1), (node, 2 * slot + 2)]
+                else:
+                    feature[t, slot] = tree["split_indices"][node]
+                    threshold[t, slot] = conditions[node]
+                    default_right[t, slot] = not tree["default_left"][node]
+                    stack += [(left[node], 2 * slot + 1), (right[node], 2 * slot + 2)]
+
+        base_score = np.float32(float(learner["learner_model_param"]["base_score"]))
+        # ProbToMargin for the logistic objective, in float32 like XGBoost
+        base_margin = -np.log(np.float32(1) / base_score - np.float32(1))
+        return cls(
+            feature=feature.ravel(),
+            threshold=threshold.ravel(),
+            default_right=default_right.ravel(),
+            value=value.ravel(),
+            max_depth=max_depth,
+            base_margin=np.float32(base_margin),
+            n_features=int(learner["learner_model_param"]["num_feature"]),
+        )
+
+    def predict_margin(self, X: np.ndarray) -> np.ndarray:
+        """Raw margins (log-odds) for a 2-D float32 feature matrix."""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        has_missing = bool(np.isnan(X).any())
+        out = np.empty(X.shape[0], dtype=np.float32)
+        for start in range(0, X.shape[0], CHUNK_ROWS):
+            out[start:start + CHUNK_ROWS] = self._margin_chunk(X[start:start + CHUNK_ROWS], has_missing)
+        return out
+
+    def _margin_chunk(self, X: np.ndarray, has_missing: bool) -> np.ndarray:
+        n, n_columns = X.shape
+        flat = X.ravel()
+        row_offsets = np.arange(n, dtype=np.intp) * n_columns
+        # Level 0: every row starts at the root, so the split column is fixed per tree
+        x = X.T[self._root_feature]  # (n_trees, n)
+        go_right = x >= self._root_threshold  # NaN compares False: fixed up below
+        if has_missing:
+            go_right = np.where(np.isnan(x), self._root_default_right, go_right)
+        nodes = self._tree_start + 1 + go_right
+        for _ in range(self.max_depth - 1):
+            x = flat[self.feature[nodes] + row_offsets]
+            go_right = x >= self.threshold[nodes]
+            if has_missing:
+                go_right = np.where(np.isnan(x), self.default_right[nodes], go_right)
+            nodes *= 2
+            nodes += self._child_offset
+            nodes += go_right
+        # Leaf values summed onto the base margin in tree order, in float32. accumulate is
+        # always sequential (reduce may switch to pairwise summation, e.g. for one row)
+        leaves = np.empty((self.n_trees + 1, n), dtype=np.float32)
+        leaves[0] = self.base_margin
+        leaves[1:] = self.value[nodes]
+        return np.add.accumulate(leaves, axis=0, out=leaves)[-1]
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """Probability of the positive class, float32."""
+        margin = self.predict_margin(X)
+        return np.float32(1) / (np.float32(1) + np.exp(-margin))
+
+def _depth(left: List[int], right: List[int]) -> int:
+    """Number of splits on the longest root-to-leaf path."""
+    depth, frontier = 0, [0]
+    while True:
+        frontier = [child for node in frontier if left[node] != -1 for child in (left[node], right[node])]
+        if not frontier:
+            return depth
+        depth += 1
+
+class FeatureEncoder:
+    """
+    Column layout of a fitted ColumnTransformer made of passthrough numeric
+    columns and a dense OneHotEncoder(handle_unknown='ignore').
+    """
+
+    def __init__(self, numeric: List[str], categorical: List[str], categories: List[Dict[Any, int]], n_columns: int):
+        self.numeric = numeric
+        self.categorical = categorical
+        self.categories = categories  # per categorical feature: value -> output column
+        self.n_columns = n_columns
+
+    @classmethod
+    def from_column_transformer(cls, pre) -> "FeatureEncoder":
+        numeric, categorical, categories = [], [], []
+        column = 0
+        blocks = [(name, transformer, columns) for name, transformer, columns in pre.transformers_ if transformer != "drop"]
+        for name, transformer, columns in blocks:
+            kind = type(transformer).__name__
+            if name == "remainder":
+                raise ValueError("ColumnTransformer remainder columns are not supported")
+            if transformer == "passthrough" or (kind == "FunctionTransformer" and transformer.func is None):
+                if numeric and column != len(numeric):
+                    raise ValueError("Numeric columns must come first")
+                numeric.extend(columns)
+                column += len(columns)
+            elif kind == "OneHotEncoder":
+                if transformer.handle_unknown != "ignore" or transformer.drop_idx_ is not None:
+                    raise ValueError("OneHotEncoder must use handle_unknown='ignore' and no drop")
+                for feature, values in zip(columns, transformer.categories_):
+                    categorical.append(feature)
+                    categories.append({value: column + i for i, value in enumerate(values.tolist())})
+                    column += len(values)
+            else:
+                raise ValueError(f"Unsupported transformer: {kind}")
+        return cls(numeric, categorical, categories, column)
+
+    def transform(self, df: pd.DataFrame) -> np.ndarray:
+        """Encode DataFrame rows into the float32 matrix the booster sees."""
+        n = len(df)
+        X = np.zeros((n, self.n_columns), dtype=np.float32)
+        for j, feature in enumerate(self.numeric):
+            X[:, j] = df[feature].to_numpy(dtype=np.float64)
+        rows = np.arange(n)
+        for feature, lookup in zip(self.categorical, self.categories):
+            columns = np.fromiter((lookup.get(v, -1) for v in df[feature].tolist()), dtype=np.int64, count=n)
+            known = columns >= 0  # unknown categories encode as all zeros
+            X[rows[known], columns[known]] = 1.0
+        return X
+
+    def transform_records(self, records: List[Dict[str, Any]]) -> np.ndarray:
+        """Same as transform for a list of feature dicts, without building a DataFrame."""
+        X = np.zeros((len(records), self.n_columns), dtype=np.float32)
+        X[:, :len(self.numeric)] = np.array(
+            [[record[feature] for feature in self.numeric] for record in records], dtype=np.float64
+        ).reshape(len(records), len(self.numeric))
+        for i, record in enumerate(records):
+            for feature, lookup in zip(self.categorical, self.categories):
+                column = lookup.get(record[feature])
+                if column is not None:
+                    X[i, column] = 1.0
+        return X
+
+class CompiledModel:
+    """FeatureEncoder + TreeEnsemble standing in for pipeline.predict_proba(df)[:, 1]."""
+
+    def __init__(self, encoder: FeatureEncoder, ensemble: TreeEnsemble):
+        self.encoder = encoder
+        self.ensemble = ensemble
+
+    @classmethod
+    def from_pipeline(cls, pipeline) -> "CompiledModel":
+        encoder = FeatureEncoder.from_column_transformer(pipeline.named_steps["pre"])
+        ensemble = TreeEnsemble.from_booster(pipeline.named_steps["clf"].get_booster())
+        if encoder.n_columns != ensemble.n_features:
+            raise ValueError(f"Encoder produces {encoder.n_columns} columns, booster expects {ensemble.n_features}")
+        return cls(encoder, ensemble)
+
+    def predict_margin(self, df: pd.DataFrame) -> np.ndarray:
+        return self.ensemble.predict_margin(self.encoder.transform(df))
+
+    def predict_pd(self, df: pd.DataFrame) -> np.ndarray:
+        return self.ensemble.predict_proba(self.encoder.transform(df))
+
+    def predict_pd_records(self, records: List[Dict[str, Any]]) -> np.ndarray:
+        return self.ensemble.predict_proba(self.encoder.transform_records(records))
+
+    def verify(self, pipeline, n_rows: int = 512, seed: int = 0) -> int:
+        """
+        Score random rows (every category, numeric values around each split
+        threshold) with both the compiled model and the booster; return the
+        number of rows whose margins differ.
+        """
+        import xgboost as xgb
+        rng = np.random.default_rng(seed)
+        ensemble = self.ensemble
+        X = np.zeros((n_rows, ensemble.n_features), dtype=np.float32)
+        n_numeric = len(self.encoder.numeric)
+        for j in range(n_numeric):
+            cuts = ensemble.threshold[(ensemble.feature == j) & np.isfinite(ensemble.threshold)]
+            if len(cuts):
+                # Exactly on, just below and just above split thresholds exercise the < comparison
+                picks = rng.choice(cuts, n_rows)
+                X[:, j] = np.where(rng.random(n_rows) < 0.5, picks, np.nextafter(picks, rng.choice([-np.inf, np.inf], n_rows)).astype(np.float32))
+        for lookup in self.encoder.categories:
+            columns = np.array(list(lookup.values()))
+            X[np.arange(n_rows), rng.choice(columns, n_rows)] = 1.0
+        expected = pipeline.named_steps["clf"].get_booster().predict(xgb.DMatrix(X), output_margin=True)
+        return int(np.sum(self.ensemble.predict_margin(X) != expected))
@@ -30,6 +30,12 @@ export async function POST(req: Request) {
     "Authorization": authHeader, // Forward the Authorization header
   };
   
+  // Forward Idempotency-Key so a retried save does not create a duplicate row
+  const idempotencyKey = req.headers.get("Idempotency-Key");
+  if (idempotencyKey) {
+    headers["Idempotency-Key"] = idempotencyKey;
+  }
+  
   const res = await fetch(`${baseUrl}/applications/save`, {
     method: "POST",
     headers,
@@ -33,29 +33,42 @@ export async function GET(req: Request) {
   if (authHeader) {
     headers["Authorization"] = authHeader;
   }
+
+  // Forward the browser's cached ETag so the backend can answer 304 without
+  // querying applications
+  const ifNoneMatch = req.headers.get("If-None-Match");
+  if (ifNoneMatch) {
+    headers["If-None-Match"] = ifNoneMatch;
+  }
   
-  // Add cache-busting query parameter and no-cache headers for backend fetch
   const timestamp = Date.now();
-  const res = await fetch(`${baseUrl}/portfolio?t=${timestamp}`, {
+  // The list view only needs these columns; full details (incl. explanation) are
+  // fetched per application. If explanation is requested it comes back as 11 SHAP
+  // values per row and is rebuilt in lib/portfolio.ts
+  const fields = "id,created_at,loan_amnt,annual_inc,pd,risk_grade,decision";
+  const res = await fetch(`${baseUrl}/portfolio?fields=${fields}&explanation_format=compact`, {
     method: "GET",
-    headers: {
-      ...headers,
-      "Cache-Control": "no-store, no-cache, must-revalidate",
-    },
-    cache: "no-store", // Explicitly disable caching
+    headers,
+    cache: "no-store", // Never let Next.js cache this; revalidation is done with ETags
   });
 
+  // Browser may keep the response but must revalidate it on every request
+  const responseHeaders: HeadersInit = {
+    "Cache-Control": "private, no-cache",
+    "X-Request-ID": `${timestamp}`, // For debugging
+  };
+  const etag = res.headers.get("ETag");
+  if (etag) {
+    responseHeaders["ETag"] = etag;
+  }
+
+  if (res.status === 304) {
+    return new Response(null, { status: 304, headers: responseHeaders });
+  }
+
   const data = await res.json();
-  
-  // Return response with no-cache headers to prevent Next.js/proxy caching
   return new Response(JSON.stringify(data), { 
     status: res.status,
-    headers: {
-      "Content-Type": "application/json",
-      "Cache-Control": "no-store, no-cache, must-revalidate, proxy-revalidate, max-age=0",
-      "Pragma": "no-cache",
-      "Expires": "0",
-      "X-Request-ID": `${timestamp}`, // For debugging
-    }
+    headers: { ...responseHeaders, "Content-Type": "application/json" }
   });
 }
@@ -11,7 +11,14 @@ export async function GET(req: Request) {
   }
 
   const { searchParams } = new URL(req.url);
-  const threshold = searchParams.get("threshold") || "0.15";
+  const params = new URLSearchParams({ threshold: searchParams.get("threshold") || "0.15" });
+  // Optional segmented / multi-threshold simulation
+  for (const key of ["thresholds", "group_by"]) {
+    const value = searchParams.get(key);
+    if (value) {
+      params.set(key, value);
+    }
+  }
   
   const baseUrl = process.env.NEXT_PUBLIC_API_URL!;
   
@@ -27,12 +34,32 @@ export async function GET(req: Request) {
   if (authHeader) {
     headers["Authorization"] = authHeader;
   }
+
+  // Forward the browser's cached ETag for conditional GET
+  const ifNoneMatch = req.headers.get("If-None-Match");
+  if (ifNoneMatch) {
+    headers["If-None-Match"] = ifNoneMatch;
+  }
   
-  const res = await fetch(`${baseUrl}/portfolio/simulate?threshold=${threshold}`, {
+  const res = await fetch(`${baseUrl}/portfolio/simulate?${params}`, {
     method: "GET",
     headers,
+    cache: "no-store",
   });
 
+  const responseHeaders: HeadersInit = { "Cache-Control": "private, no-cache" };
+  const etag = res.headers.get("ETag");
+  if (etag) {
+    responseHeaders["ETag"] = etag;
+  }
+
+  if (res.status === 304) {
+    return new Response(null, { status: 304, headers: responseHeaders });
+  }
+
   const data = await res.json();
-  return new Response(JSON.stringify(data), { status: res.status });
+  return new Response(JSON.stringify(data), {
+    status: res.status,
+    headers: { ...responseHeaders, "Content-Type": "application/json" }
+  });
 }
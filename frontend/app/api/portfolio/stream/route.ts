@@ -0,0 +1,52 @@
+export const dynamic = 'force-dynamic';
+export const revalidate = 0; // Disable caching completely
+
+export async function GET(req: Request) {
+  // Validate server-side environment variable (this route runs server-side only)
+  const apiKey = process.env.API_KEY;
+  if (!apiKey) {
+    return new Response(
+      JSON.stringify({ error: "Server configuration error: API_KEY not set" }),
+      { status: 500, headers: { "Content-Type": "application/json" } }
+    );
+  }
+
+  const baseUrl = process.env.NEXT_PUBLIC_API_URL!;
+  
+  // Extract Authorization header from incoming request (required for this endpoint)
+  const authHeader = req.headers.get("Authorization");
+  
+  if (!authHeader) {
+    return new Response(
+      JSON.stringify({ error: "Authentication required" }),
+      { status: 401, headers: { "Content-Type": "application/json" } }
+    );
+  }
+
+  // Abort the upstream stream when the browser disconnects
+  const res = await fetch(`${baseUrl}/portfolio/stream`, {
+    method: "GET",
+    headers: {
+      "Accept": "text/event-stream",
+      "X-API-Key": apiKey, // Server-side only - never exposed to client
+      "Authorization": authHeader, // Forward the Authorization header
+    },
+    cache: "no-store",
+    signal: req.signal,
+  });
+
+  if (!res.ok || !res.body) {
+    const data = await res.text();
+    return new Response(data, { status: res.status, headers: { "Content-Type": "application/json" } });
+  }
+
+  // Pass the event stream through unbuffered
+  return new Response(res.body, {
+    status: 200,
+    headers: {
+      "Content-Type": "text/event-stream; charset=utf-8",
+      "Cache-Control": "no-cache, no-transform",
+      "X-Accel-Buffering": "no",
+    },
+  });
+}
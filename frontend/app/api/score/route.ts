@@ -27,6 +27,12 @@ export async function POST(req: Request) {
       headers["Authorization"] = authHeader;
     }
     
+    // Forward Idempotency-Key so retried requests are not scored and saved twice
+    const idempotencyKey = req.headers.get("Idempotency-Key");
+    if (idempotencyKey) {
+      headers["Idempotency-Key"] = idempotencyKey;
+    }
+    
     const res = await fetch(`${baseUrl}/score`, {
       method: "POST",
       headers,
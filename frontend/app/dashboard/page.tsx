@@ -1,9 +1,9 @@
 "use client";
-import { useState, useEffect } from "react";
+import { useState, useEffect, useRef } from "react";
 import React from "react";
 import Link from "next/link";
 import { usePathname } from "next/navigation";
-import { getPortfolio, simulatePortfolio, getApplication, deleteApplication, PortfolioData, SimulationData, ApplicationDetail } from "../../lib/portfolio";
+import { getPortfolio, simulatePortfolio, getApplication, deleteApplication, subscribePortfolioEvents, applyPortfolioEvent, PortfolioData, SimulationData, ApplicationDetail } from "../../lib/portfolio";
 import { BarChart, Bar, XAxis, YAxis, CartesianGrid, Tooltip, ResponsiveContainer, LineChart, Line, PieChart, Pie, Cell } from "recharts";
 import Navigation from "../components/Navigation";
 import { useAuth } from "../../lib/auth";
@@ -25,6 +25,9 @@ export default function DashboardPage() {
   const [currentPage, setCurrentPage] = useState(1);
   const { session, user, loading: authLoading } = useAuth();
   const pathname = usePathname();
+  // Deletes made from this page: the refetch after the delete already reflects them,
+  // so their stream event must not be subtracted a second time
+  const reflectedDeletes = useRef(new Set<string>());
 
   // Reload portfolio when navigating to this page (handles production caching)
   useEffect(() => {
@@ -36,6 +39,23 @@ export default function DashboardPage() {
     }
   }, [session?.access_token, pathname, authLoading, user]);
 
+  // Apply applications scored/saved/deleted elsewhere (other tabs, bulk sync) as they happen
+  useEffect(() => {
+    if (!session?.access_token || pathname !== "/dashboard") return;
+    return subscribePortfolioEvents(session.access_token, (event) => {
+      if (event.type === "resync") {
+        loadPortfolio();
+      } else if (
+        event.type === "applications_deleted" &&
+        event.applications.every((app) => reflectedDeletes.current.has(app.id))
+      ) {
+        event.applications.forEach((app) => reflectedDeletes.current.delete(app.id));
+      } else {
+        setPortfolio((prev) => (prev ? applyPortfolioEvent(prev, event) : prev));
+      }
+    });
+  }, [session?.access_token, pathname]);
+
   useEffect(() => {
     if (portfolio && portfolio.total_applications > 0) {
       loadSimulation();
@@ -93,9 +113,11 @@ export default function DashboardPage() {
     
     try {
       setLoadingApplication(true);
+      reflectedDeletes.current.add(applicationId);
       await deleteApplication(applicationId, session.access_token);
       
-      // Close modal and reload portfolio
+      // Close modal and reload portfolio. The refetch does not depend on the stream:
+      // with several backend workers the delete event may never reach this page
       setSelectedApplication(null);
       setCurrentPage(1); // Reset to first page after deletion
       await loadPortfolio();
@@ -105,6 +127,7 @@ export default function DashboardPage() {
         await loadSimulation();
       }
     } catch (err: any) {
+      reflectedDeletes.current.delete(applicationId);
       console.error("Failed to delete application:", err);
       setError(err?.message || "Failed to delete application");
       alert(err?.message || "Failed to delete application. Please try again.");
@@ -45,6 +45,8 @@ export async function saveApplication(application: UnsavedApplication, accessTok
     headers: {
       "Content-Type": "application/json",
       "Authorization": `Bearer ${accessToken}`,
+      // Stable per unsaved application, so syncing it twice does not save it twice
+      "Idempotency-Key": `save-${application.timestamp}`,
     },
     body: JSON.stringify(application),
   });
@@ -57,6 +59,53 @@ export async function saveApplication(application: UnsavedApplication, accessTok
   return res.json();
 }
 
+const BULK_SAVE_MAX = 500;
+
+// Short stable hash (FNV-1a) of a string, for idempotency keys
+function fnv1a(text: string): string {
+  let hash = 0x811c9dc5;
+  for (let i = 0; i < text.length; i++) {
+    hash ^= text.charCodeAt(i);
+    hash = Math.imul(hash, 0x01000193);
+  }
+  return (hash >>> 0).toString(16).padStart(8, "0");
+}
+
+export async function saveApplications(applications: UnsavedApplication[], accessToken: string) {
+  if (!accessToken) {
+    throw new Error("Authentication required to save applications");
+  }
+
+  // One request and one multi-row insert per batch (the backend accepts up to 500).
+  // Each batch and each application carries a key derived from the scoring timestamps,
+  // so retrying a sync that failed part-way does not save the earlier batches twice
+  const applicationIds: string[] = [];
+  for (let i = 0; i < applications.length; i += BULK_SAVE_MAX) {
+    const batch = applications.slice(i, i + BULK_SAVE_MAX);
+    const timestamps = batch.map((app) => app.timestamp);
+    const res = await fetch("/api/applications/save/bulk", {
+      method: "POST",
+      headers: {
+        "Content-Type": "application/json",
+        "Authorization": `Bearer ${accessToken}`,
+        "Idempotency-Key": `save-bulk-${batch.length}-${timestamps[0]}-${fnv1a(timestamps.join("|"))}`,
+      },
+      body: JSON.stringify({
+        // Same key a single save of the application would send
+        applications: batch.map((app) => ({ ...app, idempotency_key: `save-${app.timestamp}` })),
+      }),
+    });
+
+    if (!res.ok) {
+      const errorText = await res.text();
+      throw new Error(errorText || "Failed to save applications");
+    }
+    applicationIds.push(...(await res.json()).application_ids);
+  }
+
+  return { application_ids: applicationIds };
+}
+
 // LocalStorage utilities for unsaved applications
 const UNSAVED_APPLICATIONS_KEY = "unsaved_applications";
 
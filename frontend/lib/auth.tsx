@@ -371,31 +371,22 @@ export function AuthProvider({ children }: { children: React.ReactNode }) {
       setHasAutoSaved(true); // Mark that we're attempting auto-save
       
       // Import dynamically to avoid SSR issues with localStorage
-      import('../lib/api').then(({ getUnsavedApplications, saveApplication, clearUnsavedApplications }) => {
+      import('../lib/api').then(({ getUnsavedApplications, saveApplications, clearUnsavedApplications }) => {
         const unsaved = getUnsavedApplications();
         if (unsaved.length > 0) {
           console.log(`Found ${unsaved.length} unsaved application(s). Saving...`);
           
-          // Save all unsaved applications
-          const savePromises = unsaved.map(app => 
-            saveApplication(app, session.access_token)
-              .catch(err => {
-                console.error('Failed to save application:', err);
-                return null; // Continue with other saves even if one fails
-              })
-          );
-          
-          Promise.all(savePromises).then(results => {
-            const successCount = results.filter(r => r !== null).length;
-            if (successCount > 0) {
-              console.log(`Successfully saved ${successCount} of ${unsaved.length} unsaved application(s)`);
+          // Save all unsaved applications in one bulk request
+          saveApplications(unsaved, session.access_token)
+            .then(result => {
+              console.log(`Successfully saved ${result.application_ids.length} of ${unsaved.length} unsaved application(s)`);
               clearUnsavedApplications();
-            }
-            // Reset flag if save fails completely so it can retry
-            if (successCount === 0) {
+            })
+            .catch(err => {
+              console.error('Failed to save unsaved applications:', err);
+              // Reset flag so it can retry
               setHasAutoSaved(false);
-            }
-          });
+            });
         }
       }).catch(err => {
         console.error('Error loading api module for auto-save:', err);
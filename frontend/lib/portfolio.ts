@@ -44,6 +44,57 @@ export type PortfolioData = {
   }>;
 };
 
+// Portfolio payload as sent by the backend with explanation_format=compact:
+// each row carries its 11 aggregated SHAP values instead of the display structure
+type CompactPortfolioData = Omit<PortfolioData, "recent_applications"> & {
+  explanation_features: string[];
+  recent_applications: Array<
+    Omit<PortfolioData["recent_applications"][number], "explanation"> & {
+      explanation_shap?: number[] | null; // absent when explanation is not in the requested fields
+    }
+  >;
+};
+
+/**
+ * Rebuild the explanation display structure from aggregated SHAP values.
+ * Mirrors build_explanation in backend/explain.py.
+ */
+export function rebuildExplanation(
+  shapValues: number[] | null | undefined,
+  features: string[],
+  pd: number
+): ApplicationDetail["explanation"] {
+  if (!shapValues || shapValues.length !== features.length) return null;
+
+  const topFeatures = features
+    .map((name, i) => ({
+      feature: name.split("_").map((w) => w.charAt(0).toUpperCase() + w.slice(1)).join(" "),
+      shap_value: shapValues[i],
+      impact: (shapValues[i] > 0 ? "positive" : "negative") as "positive" | "negative",
+      contribution_pct: pd > 0 ? (Math.abs(shapValues[i]) / (Math.abs(pd) + 1e-10)) * 100 : 0,
+    }))
+    .sort((a, b) => Math.abs(b.shap_value) - Math.abs(a.shap_value));
+
+  const totalAbs = topFeatures.reduce((sum, f) => sum + Math.abs(f.shap_value), 0);
+  if (totalAbs > 0) {
+    topFeatures.forEach((f) => {
+      f.contribution_pct = (Math.abs(f.shap_value) / totalAbs) * 100;
+    });
+  }
+
+  const top3 = topFeatures.slice(0, 3);
+  const increasing = top3.filter((f) => f.impact === "positive").map((f) => f.feature).slice(0, 2);
+  const decreasing = top3.filter((f) => f.impact === "negative").map((f) => f.feature).slice(0, 2);
+  const summaryParts: string[] = [];
+  if (increasing.length) summaryParts.push(`High ${increasing.join(" and ")} increase risk`);
+  if (decreasing.length) summaryParts.push(`Low ${decreasing.join(" and ")} decrease risk`);
+
+  return {
+    top_features: topFeatures,
+    summary: summaryParts.length ? summaryParts.join(". ") : "Risk factors analyzed",
+  };
+}
+
 export type SimulationData = {
   threshold: number;
   approval_rate: number;
@@ -59,16 +110,142 @@ export async function getPortfolio(accessToken?: string): Promise<PortfolioData>
     headers["Authorization"] = `Bearer ${accessToken}`;
   }
 
-  // Add cache-busting to ensure fresh data (especially important in production)
-  // Using timestamp query param to bypass any proxy/CDN caching
-  const timestamp = Date.now();
-  const res = await fetch(`/api/portfolio?t=${timestamp}`, {
+  // Always revalidate: the browser sends If-None-Match and an unchanged
+  // portfolio comes back as 304 and is served from the browser cache
+  const res = await fetch(`/api/portfolio`, {
     method: "GET",
     headers,
-    cache: "no-store", // Prevent browser caching
+    cache: "no-cache",
   });
   if (!res.ok) throw new Error(await res.text());
-  return res.json();
+  const data: CompactPortfolioData = await res.json();
+  const { explanation_features, recent_applications, ...stats } = data;
+  return {
+    ...stats,
+    recent_applications: (recent_applications ?? []).map(({ explanation_shap, ...app }) => ({
+      ...app,
+      explanation: rebuildExplanation(explanation_shap, explanation_features ?? [], app.pd),
+    })),
+  };
+}
+
+// Live update pushed by GET /portfolio/stream when applications are created or deleted
+export type PortfolioEvent =
+  | {
+      type: "applications_created" | "applications_deleted";
+      applications: Array<Omit<PortfolioData["recent_applications"][number], "explanation">>;
+      delta: {
+        total_applications: number;
+        pd_sum: number;
+        approvals: number;
+        grade_distribution: Record<string, number>;
+      };
+    }
+  | { type: "resync" }; // buffered events were dropped: refetch the portfolio
+
+/**
+ * Apply a pushed event to the portfolio without refetching.
+ * Averages are updated from the running sums implied by the current values.
+ */
+export function applyPortfolioEvent(portfolio: PortfolioData, event: PortfolioEvent): PortfolioData {
+  if (event.type === "resync") return portfolio;
+
+  const { delta } = event;
+  const total = portfolio.total_applications + delta.total_applications;
+  const pdSum = portfolio.avg_pd * portfolio.total_applications + delta.pd_sum;
+  const approvals = portfolio.approval_rate * portfolio.total_applications + delta.approvals;
+  const avgPd = total > 0 ? Math.max(0, pdSum / total) : 0;
+
+  const gradeDistribution = { ...portfolio.grade_distribution };
+  for (const [grade, count] of Object.entries(delta.grade_distribution)) {
+    gradeDistribution[grade] = Math.max(0, (gradeDistribution[grade] ?? 0) + count);
+  }
+
+  const ids = new Set(event.applications.map((app) => app.id));
+  const others = portfolio.recent_applications.filter((app) => !ids.has(app.id));
+  const recentApplications =
+    event.type === "applications_created"
+      ? [...event.applications.map((app) => ({ ...app, explanation: null })), ...others]
+          .sort((a, b) => b.created_at.localeCompare(a.created_at))
+          .slice(0, Math.max(portfolio.recent_applications.length, event.applications.length))
+      : others;
+
+  return {
+    ...portfolio,
+    total_applications: Math.max(0, total),
+    avg_pd: avgPd,
+    approval_rate: total > 0 ? Math.max(0, approvals / total) : 0,
+    default_rate: avgPd, // backend uses avg PD as the expected default rate
+    grade_distribution: gradeDistribution,
+    recent_applications: recentApplications,
+  };
+}
+
+/**
+ * Subscribe to live portfolio updates (server-sent events via /api/portfolio/stream).
+ * fetch is used instead of EventSource so the Authorization header can be sent.
+ * Reconnects after a dropped connection and emits "resync" so the caller refetches
+ * whatever it missed. Returns a function that closes the subscription.
+ */
+export function subscribePortfolioEvents(
+  accessToken: string,
+  onEvent: (event: PortfolioEvent) => void
+): () => void {
+  const controller = new AbortController();
+  let retryMs = 5000;
+
+  async function connect(isReconnect: boolean) {
+    const res = await fetch(`/api/portfolio/stream`, {
+      method: "GET",
+      headers: { "Authorization": `Bearer ${accessToken}`, "Accept": "text/event-stream" },
+      cache: "no-store",
+      signal: controller.signal,
+    });
+    if (!res.ok || !res.body) throw new Error(await res.text());
+    if (isReconnect) onEvent({ type: "resync" });
+
+    const reader = res.body.pipeThrough(new TextDecoderStream()).getReader();
+    let buffer = "";
+    while (true) {
+      const { value, done } = await reader.read();
+      if (done) return;
+      buffer += value;
+      let boundary: number;
+      while ((boundary = buffer.indexOf("\n\n")) !== -1) {
+        const block = buffer.slice(0, boundary);
+        buffer = buffer.slice(boundary + 2);
+        let eventName = "message";
+        let data = "";
+        for (const line of block.split("\n")) {
+          if (line.startsWith("event: ")) eventName = line.slice(7);
+          else if (line.startsWith("data: ")) data += line.slice(6);
+          else if (line.startsWith("retry: ")) retryMs = Number(line.slice(7)) || retryMs;
+          // lines starting with ":" are keep-alive comments
+        }
+        if (eventName === "resync") {
+          onEvent({ type: "resync" });
+        } else if (eventName === "applications_created" || eventName === "applications_deleted") {
+          onEvent({ type: eventName, ...JSON.parse(data) });
+        }
+      }
+    }
+  }
+
+  (async () => {
+    let isReconnect = false;
+    while (!controller.signal.aborted) {
+      try {
+        await connect(isReconnect);
+      } catch (err) {
+        if (controller.signal.aborted) return;
+        console.warn("Portfolio stream disconnected:", err);
+      }
+      isReconnect = true;
+      await new Promise((resolve) => setTimeout(resolve, retryMs));
+    }
+  })();
+
+  return () => controller.abort();
 }
 
 export async function simulatePortfolio(threshold: number, accessToken?: string): Promise<SimulationData> {
@@ -81,6 +258,7 @@ export async function simulatePortfolio(threshold: number, accessToken?: string)
   const res = await fetch(`/api/portfolio/simulate?threshold=${threshold}`, {
     method: "GET",
     headers,
+    cache: "no-cache", // revalidate with ETag
   });
   if (!res.ok) throw new Error(await res.text());
   return res.json();
@@ -107,6 +285,35 @@ export async function getApplication(applicationId: string, accessToken: string)
   return res.json();
 }
 
+export interface ApplicationsBulkResult {
+  applications: Record<string, ApplicationDetail>;
+  missing_ids: string[];
+}
+
+// Fetch several applications in one round-trip (up to 100 ids)
+export async function getApplications(applicationIds: string[], accessToken: string, fields?: string[]): Promise<ApplicationsBulkResult> {
+  if (!accessToken) {
+    throw new Error("Authentication required");
+  }
+
+  const query = fields && fields.length ? `?fields=${encodeURIComponent(fields.join(","))}` : "";
+  const res = await fetch(`/api/applications/get/bulk${query}`, {
+    method: "POST",
+    headers: {
+      "Content-Type": "application/json",
+      "Authorization": `Bearer ${accessToken}`,
+    },
+    body: JSON.stringify({ ids: applicationIds }),
+  });
+  
+  if (!res.ok) {
+    const errorText = await res.text();
+    throw new Error(errorText || "Failed to fetch applications");
+  }
+  
+  return res.json();
+}
+
 export async function deleteApplication(applicationId: string, accessToken: string): Promise<void> {
   if (!accessToken) {
     throw new Error("Authentication required");
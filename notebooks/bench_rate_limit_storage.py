@@ -0,0 +1,63 @@
+"""
+Benchmark and cross-process check for the shared rate-limit storage.
+
+Reports the per-hit overhead of the fixed-window limiter with the default
+in-memory storage and with MmapStorage, single-threaded and with several
+worker processes hammering the same table, and verifies that the limit is
+enforced once across processes (not once per process).
+
+Run from the project root:
+    python notebooks/bench_rate_limit_storage.py [--hits 50000] [--workers 4]
+"""
+import argparse, json, multiprocessing as mp, os, sys, tempfile, time
+from limits import parse
+from limits.storage import MemoryStorage
+from limits.strategies import FixedWindowRateLimiter
+
+sys.path.insert(0, "backend")
+from ratelimit_storage import MmapStorage  # noqa: E402
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--hits", type=int, default=50000)
+parser.add_argument("--workers", type=int, default=4)
+parser.add_argument("--clients", type=int, default=1000, help="Distinct client keys")
+args = parser.parse_args()
+
+path = os.path.join(tempfile.gettempdir(), f"bench-ratelimit-{os.getpid()}")
+uri = f"mmap://{path}"
+generous = parse("1000000/minute")
+
+def per_hit_us(limiter, hits, worker=0):
+    keys = [f"10.0.{worker}.{i % 256}-{i}" for i in range(args.clients)]
+    start = time.perf_counter()
+    for i in range(hits):
+        limiter.hit(generous, keys[i % len(keys)], "/score")
+    return (time.perf_counter() - start) / hits * 1e6
+
+def worker_overhead(worker):
+    return per_hit_us(FixedWindowRateLimiter(MmapStorage(uri)), args.hits // args.workers, worker)
+
+def worker_shared_key(n):
+    limiter = FixedWindowRateLimiter(MmapStorage(uri))
+    limit = parse(f"{n}/minute")
+    return sum(limiter.hit(limit, "203.0.113.7", "/score") for _ in range(n))
+
+if __name__ == "__main__":
+    report = {
+        "memory_us_per_hit": per_hit_us(FixedWindowRateLimiter(MemoryStorage()), args.hits),
+        "mmap_us_per_hit": per_hit_us(FixedWindowRateLimiter(MmapStorage(uri)), args.hits),
+    }
+    MmapStorage(uri).reset()
+    with mp.Pool(args.workers) as pool:
+        report[f"mmap_us_per_hit_{args.workers}_processes"] = sum(pool.map(worker_overhead, range(args.workers))) / args.workers
+
+    # Each process tries to take the full limit for one client: only `limit` hits may pass in total
+    MmapStorage(uri).reset()
+    limit = 500
+    with mp.Pool(args.workers) as pool:
+        allowed = sum(pool.map(worker_shared_key, [limit] * args.workers))
+    report["shared_limit"] = {"limit": limit, "attempted": limit * args.workers, "allowed": allowed}
+    os.remove(path)
+
+    print(json.dumps({k: round(v, 2) if isinstance(v, float) else v for k, v in report.items()}, indent=2))
+    assert allowed == limit, "limit was not enforced across processes"
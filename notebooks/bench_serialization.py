@@ -0,0 +1,83 @@
+"""
+Microbenchmark for response serialization on the hot endpoints.
+
+Compares the previous path (re-validating the explanation through the pydantic
+schemas, then FastAPI's jsonable_encoder + stdlib json) against the current one
+(dict built by build_explanation serialized directly with orjson), for a /score
+response and for a /portfolio page of --rows applications.
+
+Run from the project root:
+    python notebooks/bench_serialization.py [--rows 1000] [--repeat 2000]
+"""
+import argparse, json, sys, timeit
+import numpy as np
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+sys.path.insert(0, "backend")
+from explain import ORIGINAL_FEATURES, build_explanation, shap_dict  # noqa: E402
+from schemas import Explanation, FeatureContribution, ScoreResponse  # noqa: E402
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--rows", type=int, default=1000)
+parser.add_argument("--repeat", type=int, default=2000)
+args = parser.parse_args()
+
+rng = np.random.default_rng(0)
+explanation = build_explanation(shap_dict(rng.normal(0, 0.3, len(ORIGINAL_FEATURES))), 0.12)
+
+def score_before():
+    contribs = [FeatureContribution(**f) for f in explanation["top_features"]]
+    response = ScoreResponse(
+        pd=0.12, risk_grade="B", decision="approve", top_features=None,
+        explanation=Explanation(top_features=contribs, summary=explanation["summary"]),
+        explanation_tier="exact",
+    )
+    # response_model validation + jsonable_encoder + JSONResponse
+    validated = ScoreResponse.model_validate(response.model_dump())
+    return JSONResponse(jsonable_encoder(validated)).body
+
+def score_after():
+    return ORJSONResponse({
+        "pd": 0.12, "risk_grade": "B", "decision": "approve", "top_features": None,
+        "explanation": explanation, "explanation_tier": "exact",
+    }).body
+
+rows = [
+    {
+        "id": f"00000000-0000-0000-0000-{i:012d}",
+        "created_at": "2026-01-01T00:00:00+00:00",
+        "loan_amnt": int(rng.integers(1000, 40000)),
+        "annual_inc": float(rng.uniform(20000, 200000)),
+        "pd": float(rng.uniform(0, 0.5)),
+        "risk_grade": "B",
+        "decision": "approve",
+        "explanation_shap": [float(v) for v in rng.normal(0, 0.3, len(ORIGINAL_FEATURES))],
+    }
+    for i in range(args.rows)
+]
+portfolio = {"stats": {"total_applications": args.rows}, "recent_applications": rows}
+
+def portfolio_before():
+    return JSONResponse(jsonable_encoder(portfolio)).body
+
+def portfolio_after():
+    return ORJSONResponse(portfolio).body
+
+assert json.loads(score_before()) == json.loads(score_after())
+assert json.loads(portfolio_before()) == json.loads(portfolio_after())
+
+def per_call_us(fn, repeat):
+    return min(timeit.repeat(fn, number=repeat, repeat=5)) / repeat * 1e6
+
+portfolio_repeat = max(1, args.repeat // 100)
+report = {
+    "score_us": {"before": per_call_us(score_before, args.repeat), "after": per_call_us(score_after, args.repeat)},
+    f"portfolio_{args.rows}_rows_us": {
+        "before": per_call_us(portfolio_before, portfolio_repeat),
+        "after": per_call_us(portfolio_after, portfolio_repeat),
+    },
+}
+for timings in report.values():
+    timings["speedup"] = timings["before"] / timings["after"]
+print(json.dumps({k: {m: round(v, 2) for m, v in t.items()} for k, t in report.items()}, indent=2))
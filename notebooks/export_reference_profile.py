@@ -0,0 +1,31 @@
+"""
+Export the drift-monitoring reference profile for the current model without
+retraining. Uses the same data preparation and train split as
+train_credit_model.py.
+
+Run from the project root:
+    python notebooks/export_reference_profile.py
+"""
+import pandas as pd, json, joblib, sys
+from sklearn.model_selection import train_test_split
+
+sys.path.insert(0, "backend")
+from drift import build_reference_profile
+
+df = pd.read_csv("data/raw/lendingclub_sample_5000.csv")
+df["emp_length"] = (
+    df["emp_length"]
+    .astype(str)
+    .str.extract(r"(\d+)")
+    .fillna(0)
+    .astype(float)
+)
+
+y = df["default"].astype(int)
+X = df.drop(columns=["default"])
+Xtr,Xte,ytr,yte = train_test_split(X,y,test_size=0.2, stratify=y, random_state=42)
+
+pipe = joblib.load("backend/models/model.pkl")
+profile = build_reference_profile(Xtr, pipe.predict_proba(Xtr)[:,1])
+json.dump(profile, open("backend/models/reference_profile.json","w"))
+print(f"Saved reference profile ({profile['n_rows']} rows) to backend/models/reference_profile.json")
@@ -0,0 +1,62 @@
+"""
+Summarize the local decision log written by the backend (DECISION_LOG_DIR).
+
+Loads every segment into one Arrow table (no database access), reports read
+throughput, decision mix and PD per model version and scoring latency
+percentiles, and lists decisions that were not saved to Supabase. With
+--export-unsaved those rows are written as JSON lines (one SaveApplicationRequest
+per line, grouped by user_id) so they can be replayed through
+/applications/save/bulk with the user's token.
+
+Run from the project root:
+    python notebooks/read_decision_log.py [--dir backend/decision_log] [--export-unsaved unsaved.jsonl]
+"""
+import argparse, json, sys, time
+import pyarrow.compute as pc
+
+sys.path.insert(0, "backend")
+from decision_log import read_decisions  # noqa: E402
+
+SAVE_FIELDS = ["loan_amnt", "annual_inc", "dti", "emp_length", "grade", "term", "purpose",
+               "home_ownership", "state", "revol_util", "fico", "pd", "risk_grade", "decision"]
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--dir", default="backend/decision_log")
+parser.add_argument("--export-unsaved", help="Write unsaved decisions here as JSON lines")
+args = parser.parse_args()
+
+t0 = time.perf_counter()
+table = read_decisions(args.dir)
+elapsed = time.perf_counter() - t0
+print(f"{table.num_rows} decisions, {table.nbytes / 1e6:.1f} MB in memory, "
+      f"read in {elapsed * 1000:.1f} ms ({table.num_rows / max(elapsed, 1e-9):,.0f} rows/s)")
+if table.num_rows == 0:
+    sys.exit(0)
+
+print(f"{str(table['ts'][0])} .. {str(table['ts'][-1])}")
+
+by_version = table.group_by("model_version").aggregate([
+    ("pd", "count"), ("pd", "mean"),
+    ("latency_ms", "approximate_median"),
+])
+print("\nPer model version:")
+for row in by_version.to_pylist():
+    print(f"  {row['model_version']}: n={row['pd_count']}  mean PD={row['pd_mean']:.4f}  "
+          f"median latency={row['latency_ms_approximate_median']:.1f} ms")
+
+decisions = table.group_by("decision").aggregate([("decision", "count")])
+print("\nDecisions:", {row["decision"]: row["decision_count"] for row in decisions.to_pylist()})
+
+latency = table["latency_ms"]
+quantiles = pc.quantile(latency, q=[0.5, 0.95, 0.99]).to_pylist()
+print(f"Latency ms: p50={quantiles[0]:.1f}  p95={quantiles[1]:.1f}  p99={quantiles[2]:.1f}")
+
+unsaved = table.filter(pc.invert(pc.fill_null(table["persisted"], False)))
+recoverable = unsaved.filter(pc.is_valid(unsaved["user_id"]))
+print(f"\nNot saved to Supabase: {unsaved.num_rows} ({recoverable.num_rows} from signed-in users)")
+
+if args.export_unsaved:
+    with open(args.export_unsaved, "w") as f:
+        for row in recoverable.select(["user_id", *SAVE_FIELDS]).to_pylist():
+            f.write(json.dumps(row) + "\n")
+    print(f"Wrote {recoverable.num_rows} rows to {args.export_unsaved}")
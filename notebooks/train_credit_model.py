@@ -1,4 +1,4 @@
-import pandas as pd, json, joblib
+import pandas as pd, json, joblib, sys
 from sklearn.model_selection import train_test_split
 from sklearn.compose import ColumnTransformer
 from sklearn.preprocessing import OneHotEncoder
@@ -42,4 +42,9 @@ print("AUC:", roc_auc_score(yte, pipe.predict_proba(Xte)[:,1]))
 
 joblib.dump(pipe, "backend/models/model.pkl")
 json.dump({"feature_order": X.columns.tolist()}, open("backend/models/feature_meta.json","w"))
+
+# Reference profile of the training data for drift monitoring (see backend/drift.py)
+sys.path.insert(0, "backend")
+from drift import build_reference_profile
+json.dump(build_reference_profile(Xtr, pipe.predict_proba(Xtr)[:,1]), open("backend/models/reference_profile.json","w"))
 print("Saved artifacts to backend/models/")
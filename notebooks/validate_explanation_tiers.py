@@ -0,0 +1,89 @@
+"""
+Validation report for the approximate explanation tier.
+
+Compares the Saabas approximation against exact TreeSHAP on the reference
+sample and reports how often the top-3 features and the summary string
+produced by the API would differ, plus per-row latency of each tier.
+
+Run from the project root:
+    python notebooks/validate_explanation_tiers.py [--rows 2000] [--out report.json]
+"""
+import argparse, json, sys, time
+import joblib
+import numpy as np
+import pandas as pd
+import shap
+
+sys.path.insert(0, "backend")
+from explain import (  # noqa: E402
+    ORIGINAL_FEATURES, TIER_EXACT, TIER_APPROX,
+    raw_contributions, aggregate_contributions, build_explanation,
+)
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--data", default="data/raw/lendingclub_sample_5000.csv")
+parser.add_argument("--rows", type=int, default=2000)
+parser.add_argument("--latency-rows", type=int, default=200)
+parser.add_argument("--out", default=None, help="Optional path to write the JSON report")
+args = parser.parse_args()
+
+model = joblib.load("backend/models/model.pkl")
+with open("backend/models/feature_meta.json") as f:
+    feature_order = json.load(f)["feature_order"]
+pre = model.named_steps["pre"]
+explainer = shap.TreeExplainer(model.named_steps["clf"])
+
+# Same preprocessing as train_credit_model.py
+df = pd.read_csv(args.data)
+df["emp_length"] = df["emp_length"].astype(str).str.extract(r"(\d+)").fillna(0).astype(float)
+df = df[feature_order].head(args.rows)
+
+X = pre.transform(df)
+pds = model.predict_proba(df)[:, 1]
+
+explanations = {}
+for tier in (TIER_EXACT, TIER_APPROX):
+    aggregated = aggregate_contributions(pre, raw_contributions(model, explainer, X, tier))
+    explanations[tier] = [
+        build_explanation(dict(zip(ORIGINAL_FEATURES, map(float, row))), float(p))
+        for row, p in zip(aggregated, pds)
+    ]
+
+def top3(expl):
+    return [f["feature"] for f in expl["top_features"][:3]]
+
+n = len(df)
+top1_diff = top3_set_diff = top3_order_diff = summary_diff = 0
+for exact, approx in zip(explanations[TIER_EXACT], explanations[TIER_APPROX]):
+    e3, a3 = top3(exact), top3(approx)
+    top1_diff += e3[0] != a3[0]
+    top3_set_diff += set(e3) != set(a3)
+    top3_order_diff += e3 != a3
+    summary_diff += exact["summary"] != approx["summary"]
+
+# Single-row latency, which is what /score pays
+latency = {}
+for tier in (TIER_EXACT, TIER_APPROX):
+    samples = []
+    for i in range(min(args.latency_rows, n)):
+        row = X[i:i + 1]
+        start = time.perf_counter()
+        raw_contributions(model, explainer, row, tier)
+        samples.append((time.perf_counter() - start) * 1000)
+    latency[tier] = {
+        "p50_ms": round(float(np.percentile(samples, 50)), 3),
+        "p95_ms": round(float(np.percentile(samples, 95)), 3),
+    }
+
+report = {
+    "rows": n,
+    "top1_mismatch_rate": round(top1_diff / n, 4),
+    "top3_set_mismatch_rate": round(top3_set_diff / n, 4),
+    "top3_order_mismatch_rate": round(top3_order_diff / n, 4),
+    "summary_mismatch_rate": round(summary_diff / n, 4),
+    "latency": latency,
+}
+print(json.dumps(report, indent=2))
+if args.out:
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
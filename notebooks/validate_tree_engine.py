@@ -0,0 +1,137 @@
+"""
+Exactness check and benchmark for the NumPy tree engine (backend/tree_engine.py).
+
+Verifies that CompiledModel margins are bit-identical to
+Booster.predict(output_margin=True) on the reference sample, on synthetic
+rows placed exactly on / next to every split threshold, on unseen category
+values and on missing numeric values, and reports the largest PD difference
+against pipeline.predict_proba. Then times pipeline.predict_proba, the bare
+booster on pre-encoded features, and the native engine from a DataFrame and
+from dicts, for batch sizes from 1 to 100k rows (sample rows tiled with
+jittered numeric values).
+
+Exits with status 1 if any margin differs.
+
+Run from the project root:
+    python notebooks/validate_tree_engine.py [--sizes 1,10,100,1000,10000,100000] [--out report.json]
+"""
+import argparse, json, sys, time
+import joblib
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+sys.path.insert(0, "backend")
+from tree_engine import CompiledModel  # noqa: E402
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--data", default="data/raw/lendingclub_sample_5000.csv")
+parser.add_argument("--sizes", default="1,10,100,1000,10000,100000")
+parser.add_argument("--min-time", type=float, default=0.5, help="Seconds to spend timing each case")
+parser.add_argument("--out", default=None, help="Optional path to write the JSON report")
+args = parser.parse_args()
+
+model = joblib.load("backend/models/model.pkl")
+with open("backend/models/feature_meta.json") as f:
+    feature_order = json.load(f)["feature_order"]
+booster = model.named_steps["clf"].get_booster()
+pre = model.named_steps["pre"]
+
+t0 = time.perf_counter()
+compiled = CompiledModel.from_pipeline(model)
+compile_ms = (time.perf_counter() - t0) * 1000
+ensemble = compiled.ensemble
+print(f"Compiled {ensemble.n_trees} trees / {len(ensemble.value)} nodes, depth {ensemble.max_depth}, "
+      f"{ensemble.n_features} columns in {compile_ms:.1f} ms")
+
+# Same preprocessing as train_credit_model.py
+df = pd.read_csv(args.data)
+df["emp_length"] = df["emp_length"].astype(str).str.extract(r"(\d+)").fillna(0).astype(float)
+df = df[feature_order].reset_index(drop=True)
+
+def booster_margin(frame: pd.DataFrame) -> np.ndarray:
+    return booster.predict(xgb.DMatrix(pre.transform(frame)), output_margin=True)
+
+# ---- Exactness ----
+checks = {}
+
+def check(name: str, frame: pd.DataFrame) -> None:
+    ours, theirs = compiled.predict_margin(frame), booster_margin(frame)
+    encoded_equal = np.array_equal(compiled.encoder.transform(frame), pre.transform(frame).astype(np.float32), equal_nan=True)
+    checks[name] = {
+        "rows": len(frame),
+        "margin_mismatches": int(np.sum(ours != theirs)),
+        "encoding_identical": bool(encoded_equal),
+    }
+
+check("reference_sample", df)
+
+unseen = df.head(500).copy()
+unseen["state"] = "ZZ"
+unseen["purpose"] = "never_seen"
+check("unseen_categories", unseen)
+
+missing = df.head(500).copy()
+rng = np.random.default_rng(0)
+for column in ("dti", "revol_util", "emp_length"):
+    missing.loc[rng.random(len(missing)) < 0.3, column] = np.nan
+check("missing_numeric", missing)
+
+checks["split_thresholds"] = {"rows": 20000, "margin_mismatches": compiled.verify(model, 20000)}
+
+pd_diff = float(np.max(np.abs(compiled.predict_pd(df) - model.predict_proba(df)[:, 1])))
+exact = all(c["margin_mismatches"] == 0 for c in checks.values())
+for name, c in checks.items():
+    print(f"  {name:18s} rows={c['rows']:6d}  margin mismatches={c['margin_mismatches']}"
+          + (f"  encoding identical={c['encoding_identical']}" if "encoding_identical" in c else ""))
+print(f"  max |PD - predict_proba| on sample: {pd_diff:.3g}")
+
+# ---- Benchmark ----
+def tiled(n: int) -> pd.DataFrame:
+    frame = df.sample(n, replace=n > len(df), random_state=n).reset_index(drop=True)
+    jitter = np.random.default_rng(n).normal(1.0, 0.05, size=(n, 3))
+    frame["loan_amnt"] = (frame["loan_amnt"] * jitter[:, 0]).round()
+    frame["annual_inc"] = frame["annual_inc"] * jitter[:, 1]
+    frame["dti"] = frame["dti"] * jitter[:, 2]
+    return frame
+
+def per_call_s(fn, frame) -> float:
+    fn(frame)  # warm up
+    calls, start = 0, time.perf_counter()
+    while True:
+        fn(frame)
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= args.min_time and calls >= 3:
+            return elapsed / calls
+
+bench = []
+print(f"\n{'rows':>7s} {'pipeline':>11s} {'booster':>11s} {'native df':>11s} {'native rec':>11s} {'speedup':>8s}")
+for n in [int(s) for s in args.sizes.split(",")]:
+    frame = tiled(n)
+    records = frame.to_dict("records")
+    X = pre.transform(frame)
+    assert np.array_equal(compiled.predict_margin(frame), booster_margin(frame)), f"margin mismatch at {n} rows"
+    assert np.array_equal(compiled.encoder.transform_records(records), X.astype(np.float32)), f"encoding mismatch at {n} rows"
+    row = {
+        "rows": n,
+        "pipeline_ms": per_call_s(lambda f: model.predict_proba(f)[:, 1], frame) * 1000,
+        # XGBoost alone on pre-encoded features, for reference
+        "booster_ms": per_call_s(lambda x: booster.predict(xgb.DMatrix(x)), X) * 1000,
+        "native_df_ms": per_call_s(compiled.predict_pd, frame) * 1000,
+        "native_records_ms": per_call_s(compiled.predict_pd_records, records) * 1000,
+    }
+    row["speedup"] = row["pipeline_ms"] / min(row["native_df_ms"], row["native_records_ms"])
+    bench.append(row)
+    print(f"{n:7d} {row['pipeline_ms']:9.3f}ms {row['booster_ms']:9.3f}ms {row['native_df_ms']:9.3f}ms "
+          f"{row['native_records_ms']:9.3f}ms {row['speedup']:7.1f}x")
+
+if args.out:
+    with open(args.out, "w") as f:
+        json.dump({"compile_ms": compile_ms, "checks": checks, "max_pd_diff": pd_diff, "benchmark": bench}, f, indent=2)
+    print(f"\nWrote {args.out}")
+
+if not exact:
+    print("\nFAILED: margins differ from XGBoost")
+    sys.exit(1)
+print("\nAll margins bit-identical to XGBoost")
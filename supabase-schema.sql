@@ -258,3 +258,420 @@ CREATE TRIGGER trigger_update_portfolio_stats_on_insert
     FOR EACH ROW
     WHEN (NEW.user_id IS NOT NULL)
     EXECUTE FUNCTION public.update_portfolio_stats_on_application();
+
+-- ============================================================================
+-- Migration: compact SHAP explanations
+-- Explanations are stored as 11 float32 SHAP values (44 bytes, feature order
+-- loan_amnt, annual_inc, dti, emp_length, revol_util, fico, grade, term,
+-- purpose, home_ownership, state) plus the model version that produced them.
+-- The legacy verbose JSONB column is kept so existing rows remain readable.
+-- ============================================================================
+ALTER TABLE applications ADD COLUMN IF NOT EXISTS explanation JSONB;
+ALTER TABLE applications ADD COLUMN IF NOT EXISTS explanation_compact BYTEA;
+ALTER TABLE applications ADD COLUMN IF NOT EXISTS model_version TEXT;
+
+-- ============================================================================
+-- Migration: portfolio version for ETags (GET /portfolio, GET /portfolio/simulate)
+-- Every insert into or delete from applications bumps the user's
+-- portfolio_stats.version in the same transaction, so all backend workers see
+-- the same version for the same data, including after a delete whose stats
+-- refresh failed. Until this migration has run the backend sends no ETag.
+-- ============================================================================
+ALTER TABLE portfolio_stats ADD COLUMN IF NOT EXISTS version BIGINT NOT NULL DEFAULT 0;
+
+CREATE OR REPLACE FUNCTION public.bump_portfolio_version_on_insert()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE portfolio_stats SET version = version + 1
+    WHERE user_id IN (SELECT DISTINCT user_id FROM new_applications WHERE user_id IS NOT NULL);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+CREATE OR REPLACE FUNCTION public.bump_portfolio_version_on_delete()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE portfolio_stats SET version = version + 1
+    WHERE user_id IN (SELECT DISTINCT user_id FROM old_applications WHERE user_id IS NOT NULL);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- Triggers on the same event fire in name order: this runs after
+-- trigger_update_portfolio_stats_on_insert, which creates a new user's stats row
+DROP TRIGGER IF EXISTS trigger_update_portfolio_version_on_insert ON applications;
+CREATE TRIGGER trigger_update_portfolio_version_on_insert
+    AFTER INSERT ON applications
+    REFERENCING NEW TABLE AS new_applications
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION public.bump_portfolio_version_on_insert();
+
+DROP TRIGGER IF EXISTS trigger_update_portfolio_version_on_delete ON applications;
+CREATE TRIGGER trigger_update_portfolio_version_on_delete
+    AFTER DELETE ON applications
+    REFERENCING OLD TABLE AS old_applications
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION public.bump_portfolio_version_on_delete();
+
+-- ============================================================================
+-- Combined portfolio read: stats + one page of applications in one round-trip
+-- Used by the backend when PORTFOLIO_COMBINED_RPC=true. Runs with the caller's
+-- privileges, so RLS on applications still applies.
+-- ============================================================================
+CREATE OR REPLACE FUNCTION public.get_portfolio_page(
+    p_user_id UUID,
+    p_columns TEXT[],
+    p_limit INTEGER DEFAULT NULL,
+    p_offset INTEGER DEFAULT 0
+)
+RETURNS JSON AS $$
+DECLARE
+    v_stats JSON;
+    v_applications JSON;
+BEGIN
+    SELECT to_json(s) INTO v_stats
+    FROM (
+        SELECT total_applications, avg_pd, approval_rate, default_rate, grade_distribution, computed_at, version
+        FROM portfolio_stats
+        WHERE user_id = p_user_id
+        ORDER BY computed_at DESC
+        LIMIT 1
+    ) s;
+    
+    -- No cached stats yet: compute them (the next insert trigger will persist them)
+    IF v_stats IS NULL THEN
+        v_stats := public.compute_portfolio_stats(p_user_id);
+    END IF;
+    
+    -- Project each row down to the requested columns (LIMIT NULL = all rows)
+    SELECT COALESCE(json_agg(page.row_data ORDER BY page.created_at DESC), '[]'::json)
+    INTO v_applications
+    FROM (
+        SELECT
+            a.created_at,
+            (SELECT jsonb_object_agg(key, value) FROM jsonb_each(to_jsonb(a)) WHERE key = ANY(p_columns)) AS row_data
+        FROM applications a
+        WHERE a.user_id = p_user_id
+        ORDER BY a.created_at DESC
+        LIMIT p_limit OFFSET p_offset
+    ) page;
+    
+    RETURN json_build_object('stats', v_stats, 'applications', v_applications);
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+-- ============================================================================
+-- Migration: idempotency keys (optional, used when IDEMPOTENCY_DB_COLUMN=true)
+-- The Idempotency-Key sent to /score or /applications/save is stored with the
+-- row; the unique index makes a repeated insert with the same key fail instead
+-- of creating a duplicate application.
+-- ============================================================================
+ALTER TABLE applications ADD COLUMN IF NOT EXISTS idempotency_key TEXT;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_applications_user_idempotency_key
+    ON applications(user_id, idempotency_key)
+    WHERE idempotency_key IS NOT NULL;
+
+-- ============================================================================
+-- Migration: refresh portfolio stats once per INSERT statement
+-- A multi-row insert (POST /applications/save/bulk) previously recomputed the
+-- user's stats once per row. The statement-level trigger recomputes them once
+-- per affected user for the whole statement.
+-- ============================================================================
+CREATE OR REPLACE FUNCTION public.update_portfolio_stats_on_applications_insert()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_user_id UUID;
+BEGIN
+    FOR v_user_id IN
+        SELECT DISTINCT user_id FROM new_applications WHERE user_id IS NOT NULL
+    LOOP
+        PERFORM public.upsert_portfolio_stats(v_user_id);
+    END LOOP;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+DROP TRIGGER IF EXISTS trigger_update_portfolio_stats_on_insert ON applications;
+CREATE TRIGGER trigger_update_portfolio_stats_on_insert
+    AFTER INSERT ON applications
+    REFERENCING NEW TABLE AS new_applications
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION public.update_portfolio_stats_on_applications_insert();
+
+-- ============================================================================
+-- Migration: time-bucketed portfolio rollups (GET /portfolio/trends)
+-- One row per user, granularity (hour/day/month, UTC) and bucket with the
+-- application count, PD sum, approvals and grade histogram. Statement-level
+-- triggers add inserted rows and subtract deleted rows, so a date range is
+-- answered from pre-aggregated buckets instead of scanning applications.
+-- ============================================================================
+CREATE TABLE IF NOT EXISTS portfolio_rollups (
+    user_id UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+    granularity TEXT NOT NULL CHECK (granularity IN ('hour', 'day', 'month')),
+    bucket_start TIMESTAMP WITH TIME ZONE NOT NULL,
+    applications INTEGER NOT NULL DEFAULT 0,
+    pd_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    approvals INTEGER NOT NULL DEFAULT 0,
+    grade_a INTEGER NOT NULL DEFAULT 0,
+    grade_b INTEGER NOT NULL DEFAULT 0,
+    grade_c INTEGER NOT NULL DEFAULT 0,
+    grade_d INTEGER NOT NULL DEFAULT 0,
+    grade_e INTEGER NOT NULL DEFAULT 0,
+    grade_f INTEGER NOT NULL DEFAULT 0,
+    grade_g INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, granularity, bucket_start)
+);
+
+ALTER TABLE portfolio_rollups ENABLE ROW LEVEL SECURITY;
+
+-- Users can view their own rollups (written only by the triggers below)
+CREATE POLICY "Users can view own portfolio rollups" ON portfolio_rollups
+    FOR SELECT USING (auth.uid() = user_id);
+
+-- Add (p_sign = 1) or subtract (p_sign = -1) a set of applications, passed as JSON rows
+CREATE OR REPLACE FUNCTION public.apply_portfolio_rollups(p_rows JSON, p_sign INTEGER)
+RETURNS VOID AS $$
+BEGIN
+    INSERT INTO portfolio_rollups AS r (
+        user_id, granularity, bucket_start, applications, pd_sum, approvals,
+        grade_a, grade_b, grade_c, grade_d, grade_e, grade_f, grade_g
+    )
+    SELECT
+        a.user_id,
+        g.granularity,
+        date_trunc(g.granularity, a.created_at, 'UTC'),
+        p_sign * COUNT(*),
+        p_sign * SUM(a.pd),
+        p_sign * COUNT(*) FILTER (WHERE a.decision = 'approve'),
+        p_sign * COUNT(*) FILTER (WHERE a.risk_grade = 'A'),
+        p_sign * COUNT(*) FILTER (WHERE a.risk_grade = 'B'),
+        p_sign * COUNT(*) FILTER (WHERE a.risk_grade = 'C'),
+        p_sign * COUNT(*) FILTER (WHERE a.risk_grade = 'D'),
+        p_sign * COUNT(*) FILTER (WHERE a.risk_grade = 'E'),
+        p_sign * COUNT(*) FILTER (WHERE a.risk_grade = 'F'),
+        p_sign * COUNT(*) FILTER (WHERE a.risk_grade = 'G')
+    FROM json_to_recordset(p_rows) AS a(user_id UUID, created_at TIMESTAMPTZ, pd DOUBLE PRECISION, decision TEXT, risk_grade TEXT)
+    CROSS JOIN (VALUES ('hour'), ('day'), ('month')) AS g(granularity)
+    WHERE a.user_id IS NOT NULL
+    GROUP BY 1, 2, 3
+    ON CONFLICT (user_id, granularity, bucket_start) DO UPDATE SET
+        applications = r.applications + EXCLUDED.applications,
+        pd_sum = r.pd_sum + EXCLUDED.pd_sum,
+        approvals = r.approvals + EXCLUDED.approvals,
+        grade_a = r.grade_a + EXCLUDED.grade_a,
+        grade_b = r.grade_b + EXCLUDED.grade_b,
+        grade_c = r.grade_c + EXCLUDED.grade_c,
+        grade_d = r.grade_d + EXCLUDED.grade_d,
+        grade_e = r.grade_e + EXCLUDED.grade_e,
+        grade_f = r.grade_f + EXCLUDED.grade_f,
+        grade_g = r.grade_g + EXCLUDED.grade_g;
+    
+    IF p_sign < 0 THEN
+        DELETE FROM portfolio_rollups WHERE applications <= 0
+            AND user_id IN (SELECT a.user_id FROM json_to_recordset(p_rows) AS a(user_id UUID));
+    END IF;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+CREATE OR REPLACE FUNCTION public.update_portfolio_rollups_on_insert()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM public.apply_portfolio_rollups((SELECT json_agg(n) FROM new_applications n), 1);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+CREATE OR REPLACE FUNCTION public.update_portfolio_rollups_on_delete()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM public.apply_portfolio_rollups((SELECT json_agg(o) FROM old_applications o), -1);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+DROP TRIGGER IF EXISTS trigger_update_portfolio_rollups_on_insert ON applications;
+CREATE TRIGGER trigger_update_portfolio_rollups_on_insert
+    AFTER INSERT ON applications
+    REFERENCING NEW TABLE AS new_applications
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION public.update_portfolio_rollups_on_insert();
+
+DROP TRIGGER IF EXISTS trigger_update_portfolio_rollups_on_delete ON applications;
+CREATE TRIGGER trigger_update_portfolio_rollups_on_delete
+    AFTER DELETE ON applications
+    REFERENCING OLD TABLE AS old_applications
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION public.update_portfolio_rollups_on_delete();
+
+-- Backfill from existing applications (run once, before new writes arrive)
+TRUNCATE portfolio_rollups;
+SELECT public.apply_portfolio_rollups(
+    (SELECT json_agg(json_build_object(
+        'user_id', user_id, 'created_at', created_at, 'pd', pd, 'decision', decision, 'risk_grade', risk_grade
+    )) FROM applications),
+    1
+);
+
+-- ============================================================================
+-- Migration: incrementally maintained global feature importance
+-- (GET /portfolio/explanation)
+-- One row per user and risk grade with the number of explained applications
+-- and the running sums of their 11 aggregated SHAP values and absolute SHAP
+-- values (ORIGINAL_FEATURES order in backend/explain.py). Statement-level
+-- triggers add inserted rows and subtract deleted rows, so the portfolio-wide
+-- explanation is read from at most 7 rows instead of every explanation.
+-- ============================================================================
+CREATE TABLE IF NOT EXISTS portfolio_feature_importance (
+    user_id UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+    risk_grade TEXT NOT NULL,
+    explained INTEGER NOT NULL DEFAULT 0,
+    shap_sum DOUBLE PRECISION[] NOT NULL,
+    abs_shap_sum DOUBLE PRECISION[] NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (user_id, risk_grade)
+);
+
+ALTER TABLE portfolio_feature_importance ENABLE ROW LEVEL SECURITY;
+
+-- Users can view their own feature importance (written only by the triggers below)
+CREATE POLICY "Users can view own feature importance" ON portfolio_feature_importance
+    FOR SELECT USING (auth.uid() = user_id);
+
+-- Little-endian float32 at byte offset p_pos of p_bytes (explanation_compact encoding)
+CREATE OR REPLACE FUNCTION public.float4_from_bytes(p_bytes BYTEA, p_pos INTEGER)
+RETURNS DOUBLE PRECISION AS $$
+DECLARE
+    v_bits BIGINT := get_byte(p_bytes, p_pos)::BIGINT
+        | (get_byte(p_bytes, p_pos + 1)::BIGINT << 8)
+        | (get_byte(p_bytes, p_pos + 2)::BIGINT << 16)
+        | (get_byte(p_bytes, p_pos + 3)::BIGINT << 24);
+    v_sign DOUBLE PRECISION := CASE WHEN (v_bits >> 31) = 1 THEN -1 ELSE 1 END;
+    v_exponent INTEGER := ((v_bits >> 23) & 255)::INTEGER;
+    v_mantissa BIGINT := v_bits & 8388607;
+BEGIN
+    IF v_exponent = 255 THEN
+        RETURN NULL;  -- inf / NaN
+    ELSIF v_exponent = 0 THEN
+        RETURN v_sign * v_mantissa * power(2::DOUBLE PRECISION, -149);  -- zero / subnormal
+    END IF;
+    RETURN v_sign * (1 + v_mantissa / 8388608.0::DOUBLE PRECISION) * power(2::DOUBLE PRECISION, v_exponent - 127);
+END;
+$$ LANGUAGE plpgsql IMMUTABLE STRICT;
+
+-- The 11 aggregated SHAP values of an application, from explanation_compact
+-- (hex text as sent through JSON) or else from the legacy JSONB explanation;
+-- NULL if the application has no explanation
+CREATE OR REPLACE FUNCTION public.explanation_shap_vector(p_explanation JSONB, p_compact TEXT)
+RETURNS DOUBLE PRECISION[] AS $$
+DECLARE
+    v_features TEXT[] := ARRAY['loan_amnt', 'annual_inc', 'dti', 'emp_length', 'revol_util', 'fico',
+                               'grade', 'term', 'purpose', 'home_ownership', 'state'];
+    v_bytes BYTEA;
+BEGIN
+    IF p_compact IS NOT NULL THEN
+        v_bytes := decode(CASE WHEN left(p_compact, 2) = '\x' THEN substr(p_compact, 3) ELSE p_compact END, 'hex');
+        IF length(v_bytes) <> 4 * array_length(v_features, 1) THEN
+            RETURN NULL;
+        END IF;
+        RETURN ARRAY(
+            SELECT COALESCE(public.float4_from_bytes(v_bytes, 4 * (i - 1)), 0)
+            FROM generate_series(1, array_length(v_features, 1)) AS i
+            ORDER BY i
+        );
+    END IF;
+    IF p_explanation IS NULL OR jsonb_typeof(p_explanation -> 'top_features') <> 'array' THEN
+        RETURN NULL;
+    END IF;
+    -- Legacy explanations name features for display ("Loan Amnt")
+    RETURN ARRAY(
+        SELECT COALESCE((
+            SELECT (f ->> 'shap_value')::DOUBLE PRECISION
+            FROM jsonb_array_elements(p_explanation -> 'top_features') AS f
+            WHERE f ->> 'feature' = initcap(replace(feat, '_', ' '))
+            LIMIT 1
+        ), 0)
+        FROM unnest(v_features) WITH ORDINALITY AS u(feat, i)
+        ORDER BY i
+    );
+END;
+$$ LANGUAGE plpgsql IMMUTABLE;
+
+-- Add (p_sign = 1) or subtract (p_sign = -1) a set of applications, passed as JSON rows
+CREATE OR REPLACE FUNCTION public.apply_feature_importance(p_rows JSON, p_sign INTEGER)
+RETURNS VOID AS $$
+BEGIN
+    WITH vectors AS (
+        SELECT a.user_id, a.risk_grade, public.explanation_shap_vector(a.explanation, a.explanation_compact) AS v
+        FROM json_to_recordset(p_rows) AS a(user_id UUID, risk_grade TEXT, explanation JSONB, explanation_compact TEXT)
+        WHERE a.user_id IS NOT NULL AND a.risk_grade IS NOT NULL
+    ),
+    elements AS (
+        SELECT user_id, risk_grade, i, SUM(x) AS s, SUM(abs(x)) AS abs_s, COUNT(*) AS n
+        FROM vectors CROSS JOIN LATERAL unnest(v) WITH ORDINALITY AS u(x, i)
+        GROUP BY user_id, risk_grade, i
+    )
+    INSERT INTO portfolio_feature_importance AS r (user_id, risk_grade, explained, shap_sum, abs_shap_sum)
+    SELECT
+        user_id,
+        risk_grade,
+        p_sign * MAX(n),
+        array_agg(p_sign * s ORDER BY i),
+        array_agg(p_sign * abs_s ORDER BY i)
+    FROM elements
+    GROUP BY user_id, risk_grade
+    ON CONFLICT (user_id, risk_grade) DO UPDATE SET
+        explained = r.explained + EXCLUDED.explained,
+        shap_sum = ARRAY(
+            SELECT x + y FROM unnest(r.shap_sum, EXCLUDED.shap_sum) WITH ORDINALITY AS t(x, y, i) ORDER BY i
+        ),
+        abs_shap_sum = ARRAY(
+            SELECT x + y FROM unnest(r.abs_shap_sum, EXCLUDED.abs_shap_sum) WITH ORDINALITY AS t(x, y, i) ORDER BY i
+        ),
+        updated_at = NOW();
+    
+    IF p_sign < 0 THEN
+        DELETE FROM portfolio_feature_importance WHERE explained <= 0
+            AND user_id IN (SELECT a.user_id FROM json_to_recordset(p_rows) AS a(user_id UUID));
+    END IF;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+CREATE OR REPLACE FUNCTION public.update_feature_importance_on_insert()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM public.apply_feature_importance((SELECT json_agg(n) FROM new_applications n), 1);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+CREATE OR REPLACE FUNCTION public.update_feature_importance_on_delete()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM public.apply_feature_importance((SELECT json_agg(o) FROM old_applications o), -1);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+DROP TRIGGER IF EXISTS trigger_update_feature_importance_on_insert ON applications;
+CREATE TRIGGER trigger_update_feature_importance_on_insert
+    AFTER INSERT ON applications
+    REFERENCING NEW TABLE AS new_applications
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION public.update_feature_importance_on_insert();
+
+DROP TRIGGER IF EXISTS trigger_update_feature_importance_on_delete ON applications;
+CREATE TRIGGER trigger_update_feature_importance_on_delete
+    AFTER DELETE ON applications
+    REFERENCING OLD TABLE AS old_applications
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION public.update_feature_importance_on_delete();
+
+-- Backfill from existing applications (run once, before new writes arrive)
+TRUNCATE portfolio_feature_importance;
+SELECT public.apply_feature_importance(
+    (SELECT json_agg(json_build_object(
+        'user_id', user_id, 'risk_grade', risk_grade,
+        'explanation', explanation, 'explanation_compact', explanation_compact
+    )) FROM applications),
+    1
+);